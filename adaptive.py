@@ -0,0 +1,522 @@
+# adaptive.py - Adaptive Testing Module
+# This module contains AdaptiveSession, a quiz attempt that picks every next
+# question from the whole category pool to suit the student, instead of
+# asking the questions in a fixed order.
+#
+# Each question has item response theory (IRT) parameters:
+#     a - discrimination (how sharply it separates weaker and stronger students)
+#     b - difficulty (the ability at which it is most informative)
+#     c - guessing (chance of a correct answer by luck)
+# The student's ability is estimated after every answer (the expected value
+# of the ability given the answers so far, on a grid of ability values with a
+# standard normal prior), and the next question is the unused one with the
+# most information at that estimate.
+#
+# Selection stays fast on large pools (50k items). With numpy, the information
+# of every item at the exact estimate is computed in one vectorized pass over
+# the pool for every pick. Without numpy, for each point of the ability grid
+# the pool's items are ranked by information once, in one pass over flat
+# arrays of a, b and c, and the ranking is cached. Picking a question then
+# walks the cached ranking of the nearest grid point, skipping used items, and
+# compares the first few candidates at the exact estimate.
+#
+# Parameters come from a calibration file written by
+#     python adaptive.py calibrate          (from the item analysis, see item_analysis.py)
+# Questions without calibration get a = 1, b = 0 and c = 0.
+#
+# Usage:
+#     python adaptive.py calibrate --out item_parameters.json
+#     python adaptive.py benchmark --items 50000
+
+import argparse
+import json
+import math
+import os
+import time
+from array import array
+from heapq import nlargest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # Selection uses cached rankings instead (see ItemPool)
+
+from grading import answer_key_for
+from quiz_engine import NO_ANSWER, STEP_FINISHED, STEP_NEXT, STEP_UNANSWERED
+from sampling import FixedPaper
+
+# Scaling constant that makes the logistic curve close to the normal ogive
+D = 1.7
+
+# Ability grid used for estimates and cached rankings: -4.0 to 4.0 in steps of 0.1
+GRID_STEP = 0.1
+GRID = [round(-4.0 + GRID_STEP * k, 1) for k in range(81)]
+
+# Order in which rankings are computed ahead of time: from the middle of the
+# grid outwards, as every attempt starts at the prior's mean of 0
+WARM_ORDER = sorted(range(len(GRID)), key=lambda grid_index: abs(GRID[grid_index]))
+
+# Longest stretch spent computing rankings ahead of time in one go
+WARM_SLICE_SECONDS = 0.01
+
+# How many items of each cached ranking are kept
+RANKING_SIZE = 256
+
+# How many unused candidates from the ranking are compared at the exact estimate
+CANDIDATES = 8
+
+# Default calibration file, next to this module
+DEFAULT_PARAMETERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "item_parameters.json")
+
+# Questions answered by fewer students than this keep the default parameters
+MIN_CALIBRATION_RESPONSES = 30
+
+
+def probability_correct(theta, a, b, c):
+    """Chance that a student of ability theta answers an item correctly (3PL model)"""
+    return c + (1.0 - c) / (1.0 + math.exp(-D * a * (theta - b)))
+
+
+def item_information(theta, a, b, c):
+    """Fisher information of an item at ability theta (3PL model)"""
+    p = probability_correct(theta, a, b, c)
+    if p <= c or p >= 1.0:
+        return 0.0
+    return (D * a) ** 2 * ((p - c) / (1.0 - c)) ** 2 * (1.0 - p) / p
+
+
+class ItemPool:
+    """
+    IRT parameters of every question of a category, in flat arrays. With
+    numpy, selection is vectorized over the whole pool; without it, lazily
+    cached information rankings per ability grid point are used.
+    """
+
+    def __init__(self, a, b, c):
+        self.a = array("d", a)
+        self.b = array("d", b)
+        self.c = array("d", c)
+        self.rankings = {}
+
+        # numpy views of the same arrays (no copy), or None without numpy
+        self.vectors = None
+        if numpy is not None:
+            self.vectors = (numpy.frombuffer(self.a), numpy.frombuffer(self.b), numpy.frombuffer(self.c))
+
+    @classmethod
+    def uncalibrated(cls, size):
+        """Default parameters for a pool without calibration"""
+        return cls([1.0] * size, [0.0] * size, [0.0] * size)
+
+    def __len__(self):
+        return len(self.a)
+
+    def information_at(self, theta):
+        """Information of every item at ability theta (one pass over the arrays)"""
+        exp = math.exp
+        scale = D * D
+        information = []
+        append = information.append
+        for a, b, c in zip(self.a, self.b, self.c):
+            p = c + (1.0 - c) / (1.0 + exp(-D * a * (theta - b)))
+            if p <= c or p >= 1.0:
+                append(0.0)
+            else:
+                append(scale * a * a * ((p - c) / (1.0 - c)) ** 2 * (1.0 - p) / p)
+        return information
+
+    def information_vector(self, theta):
+        """Information of every item at ability theta as a numpy array (one vectorized pass)"""
+        a, b, c = self.vectors
+        with numpy.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            p = c + (1.0 - c) / (1.0 + numpy.exp(-D * a * (theta - b)))
+            information = (D * a) ** 2 * ((p - c) / (1.0 - c)) ** 2 * (1.0 - p) / p
+        # Same rule as item_information: no information where p is c or 1
+        information[(p <= c) | (p >= 1.0)] = 0.0
+        return information
+
+    def ranking(self, grid_index):
+        """Return the most informative items at a grid point, best first (cached)"""
+        ranked = self.rankings.get(grid_index)
+        if ranked is None:
+            information = self.information_at(GRID[grid_index])
+            ranked = array("I", nlargest(min(RANKING_SIZE, len(information)),
+                                         range(len(information)), key=information.__getitem__))
+            self.rankings[grid_index] = ranked
+        return ranked
+
+    def prepare(self):
+        """Compute the rankings of every grid point up front (nothing to do with numpy)"""
+        if self.vectors is not None:
+            return
+        for grid_index in range(len(GRID)):
+            self.ranking(grid_index)
+
+    def prepare_next(self):
+        """
+        Compute one missing ranking (see WARM_ORDER), so the rankings can be
+        built a slice at a time. Returns False once they are all cached (at
+        once with numpy, which needs no rankings).
+        """
+        if self.vectors is not None:
+            return False
+        for grid_index in WARM_ORDER:
+            if grid_index not in self.rankings:
+                self.ranking(grid_index)
+                return True
+        return False
+
+    def select(self, theta, used):
+        """Return the unused item with the most information at ability theta"""
+        if self.vectors is not None:
+            information = self.information_vector(theta)
+            if used:
+                information[list(used)] = -1.0
+            return int(numpy.argmax(information))
+        grid_index = min(max(int(round((theta - GRID[0]) / GRID_STEP)), 0), len(GRID) - 1)
+        candidates = []
+        for item in self.ranking(grid_index):
+            if item not in used:
+                candidates.append(item)
+                if len(candidates) == CANDIDATES:
+                    break
+        if not candidates:
+            # Every ranked item was used (a very long test): look at the whole pool
+            information = self.information_at(theta)
+            unused = [item for item in range(len(information)) if item not in used]
+            return max(unused, key=information.__getitem__)
+        return max(candidates, key=lambda item: item_information(theta, self.a[item],
+                                                                 self.b[item], self.c[item]))
+
+
+class AbilityEstimate:
+    """Posterior of a student's ability on the grid, updated one answer at a time"""
+
+    def __init__(self):
+        # Log of the standard normal prior at every grid point
+        self.log_posterior = [-0.5 * theta * theta for theta in GRID]
+        self.update_summary()
+
+    def add_answer(self, a, b, c, correct):
+        """Update the posterior with one answered item"""
+        for k, theta in enumerate(GRID):
+            p = probability_correct(theta, a, b, c)
+            p = min(max(p, 1e-12), 1.0 - 1e-12)
+            self.log_posterior[k] += math.log(p if correct else 1.0 - p)
+        self.update_summary()
+
+    def update_summary(self):
+        """Recompute the estimate (posterior mean) and its standard error"""
+        top = max(self.log_posterior)
+        weights = [math.exp(value - top) for value in self.log_posterior]
+        total = sum(weights)
+        mean = sum(weight * theta for weight, theta in zip(weights, GRID)) / total
+        variance = sum(weight * (theta - mean) ** 2 for weight, theta in zip(weights, GRID)) / total
+        self.theta = mean
+        self.standard_error = math.sqrt(variance)
+
+
+class AdaptivePaper(FixedPaper):
+    """The questions an adaptive session has picked so far (grows as it goes)"""
+
+    def __init__(self, pool, length):
+        super().__init__(pool, [])
+        self.length = length
+
+    def params(self):
+        """Everything needed to rebuild this paper, marked as adaptive"""
+        params = super().params()
+        params["adaptive"] = True
+        params["length"] = self.length
+        return params
+
+
+class AdaptiveSession:
+    """
+    One student's adaptive attempt at a category. Has the same attributes and
+    methods as quiz_engine.QuizSession, so QuizPage can drive it unchanged.
+
+    `pool` is the category's questions, `item_pool` their ItemPool and
+    `length` how many questions the student answers.
+    """
+
+    def __init__(self, pool, item_pool, length, answer_key=None):
+        if len(item_pool) != len(pool):
+            raise ValueError("the item parameters do not match the question pool")
+        self.pool = pool
+        self.item_pool = item_pool
+        self.total_questions = min(length, len(pool))
+
+        # Index of the correct choice for every question of the pool
+        if answer_key is None:
+            answer_key = answer_key_for(pool)
+        self.answer_key = answer_key
+
+        self.questions = AdaptivePaper(pool, self.total_questions)
+        self.restart_quiz()
+
+    def restart_quiz(self):
+        """Start again from the first question with a fresh ability estimate"""
+        self.current_question = 0
+        self.user_answers = [NO_ANSWER] * self.total_questions
+        self.finished = False
+        self.final_score = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.question_seconds = [0.0] * self.total_questions
+        self.question_shown_at = time.monotonic()
+
+        self.ability = AbilityEstimate()
+        self.used = set()
+        self.questions.pool_indexes[:] = []
+        self.pick_next_question()
+
+    def pick_next_question(self):
+        """Add the most informative unused question at the current estimate"""
+        item = self.item_pool.select(self.ability.theta, self.used)
+        self.used.add(item)
+        self.questions.pool_indexes.append(item)
+
+    def current(self):
+        """Return the question dict that is currently being shown"""
+        return self.questions[self.current_question]
+
+    def is_last_question(self):
+        """Return True if the current question is the last one"""
+        return self.current_question == self.total_questions - 1
+
+    def current_answer(self):
+        """Return the saved answer for the current question (or NO_ANSWER)"""
+        return self.user_answers[self.current_question]
+
+    def go_to_next_question(self, choice_index, seconds=None):
+        """
+        Save the answer, update the ability estimate and pick the next question.
+        Returns STEP_UNANSWERED, STEP_NEXT or STEP_FINISHED like QuizSession.
+        `seconds` overrides the measured time (used when resuming).
+        """
+        if self.finished:
+            return STEP_FINISHED
+        if choice_index == NO_ANSWER:
+            return STEP_UNANSWERED
+
+        self.user_answers[self.current_question] = choice_index
+        now = time.monotonic()
+        if seconds is None:
+            seconds = now - self.question_shown_at
+        self.question_seconds[self.current_question] += seconds
+        self.question_shown_at = now
+
+        return self.score_and_move_on(choice_index)
+
+    def skip_question(self):
+        """
+        Move on without an answer (the question's time limit ran out); it
+        counts as wrong for the ability estimate.
+        """
+        if self.finished:
+            return STEP_FINISHED
+        now = time.monotonic()
+        self.question_seconds[self.current_question] += now - self.question_shown_at
+        self.question_shown_at = now
+        return self.score_and_move_on(NO_ANSWER)
+
+    def score_and_move_on(self, choice_index):
+        """Update the ability estimate with the current answer, then pick the next question"""
+        item = self.questions.pool_indexes[self.current_question]
+        pool = self.item_pool
+        self.ability.add_answer(pool.a[item], pool.b[item], pool.c[item],
+                                choice_index == self.answer_key[item])
+
+        if self.is_last_question():
+            return self.finish()
+
+        self.current_question = self.current_question + 1
+        self.pick_next_question()
+        return STEP_NEXT
+
+    def finish(self):
+        """End the attempt now (after the last question or when the exam's time is up)"""
+        if not self.finished:
+            self.finished = True
+            self.finished_at = time.time()
+            self.final_score = self.calculate_final_score()
+        return STEP_FINISHED
+
+    def resume(self, answers, started_at):
+        """
+        Replay saved (choice, seconds) answers of an unfinished attempt (see
+        checkpoints.py). Selection is deterministic, so the same questions
+        are picked again.
+        """
+        for choice_index, seconds in answers:
+            if choice_index == NO_ANSWER:
+                # The question's time ran out
+                self.question_seconds[self.current_question] += seconds
+                self.score_and_move_on(NO_ANSWER)
+            else:
+                self.go_to_next_question(choice_index, seconds)
+        self.started_at = started_at
+        self.question_shown_at = time.monotonic()
+
+    def correct_choice(self, index):
+        """Return the index of the correct choice of the `index`th question asked"""
+        return self.answer_key[self.questions.pool_indexes[index]]
+
+    def calculate_final_score(self):
+        """Return the number of questions answered correctly"""
+        correct_answers = 0
+        for position, item in enumerate(self.questions.pool_indexes):
+            if self.user_answers[position] == self.answer_key[item]:
+                correct_answers = correct_answers + 1
+        return correct_answers
+
+
+def load_calibration(path=DEFAULT_PARAMETERS_PATH):
+    """Return the calibrated parameters per category from the calibration file ({} if there is none)"""
+    if path is None or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as parameters_file:
+        return json.load(parameters_file)["categories"]
+
+
+def make_item_pool(calibrated, category_index, questions):
+    """Return the ItemPool of one category: calibrated if the file matches it, else default parameters"""
+    rows = calibrated.get(str(category_index))
+    if rows is not None and len(rows) == len(questions):
+        return ItemPool(*zip(*rows))
+    return ItemPool.uncalibrated(len(questions))
+
+
+def load_item_pools(quiz_data, path=DEFAULT_PARAMETERS_PATH):
+    """
+    Return an ItemPool for every category of quiz_data, using the calibration
+    file if it exists and matches the category, else default parameters.
+    """
+    calibrated = load_calibration(path)
+    return [make_item_pool(calibrated, category_index, questions)
+            for category_index, questions in enumerate(quiz_data)]
+
+
+def prepare_item_pools(item_pools, seconds=WARM_SLICE_SECONDS):
+    """
+    Compute missing rankings of the item pools for about `seconds` (at least
+    one ranking). Returns True if some are still missing, so the caller can
+    come back for the next slice without blocking the UI for long.
+    """
+    started = time.perf_counter()
+    for item_pool in item_pools:
+        while item_pool.prepare_next():
+            if time.perf_counter() - started >= seconds:
+                return True
+    return False
+
+
+def normal_quantile(p):
+    """Inverse of the standard normal distribution (bisection, good to 1e-9)"""
+    low, high = -8.0, 8.0
+    while high - low > 1e-9:
+        middle = (low + high) / 2
+        if 0.5 * math.erfc(-middle / math.sqrt(2)) < p:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def calibrate(analysis):
+    """
+    Estimate IRT parameters from classical item statistics (item_analysis.py)
+    with the usual approximations: a = r / sqrt(1 - r^2), b = -z(p) / r,
+    where p is the p-value and r the point-biserial correlation. The guessing
+    parameter is left at 0. Returns {category index: [[a, b, c], ...]}.
+    """
+    categories = {}
+    for category_index, questions in enumerate(analysis.quiz_data):
+        rows = []
+        for question_index in range(len(questions)):
+            stats = analysis.items.get((category_index, question_index))
+            a, b = 1.0, 0.0
+            if stats is not None and stats.responses >= MIN_CALIBRATION_RESPONSES:
+                r = stats.point_biserial()
+                p = min(max(stats.p_value(), 0.01), 0.99)
+                if r is not None and r > 0.05:
+                    r = min(r, 0.95)
+                    a = min(max(r / math.sqrt(1 - r * r), 0.2), 3.0)
+                    b = min(max(-normal_quantile(p) / r, -4.0), 4.0)
+                else:
+                    b = min(max(-normal_quantile(p), -4.0), 4.0)
+            rows.append([round(a, 4), round(b, 4), 0.0])
+        categories[str(category_index)] = rows
+    return categories
+
+
+def benchmark_selection(item_count=50000, length=30, students=20):
+    """Time picking questions for simulated students on a large random pool"""
+    import random
+    from compact_questions import synthetic_quiz_data
+
+    rng = random.Random(7)
+    pool = synthetic_quiz_data(item_count, 1)[0]
+    item_pool = ItemPool([rng.uniform(0.5, 2.0) for i in range(item_count)],
+                         [rng.gauss(0.0, 1.2) for i in range(item_count)],
+                         [0.0] * item_count)
+    answer_key = answer_key_for(pool)
+
+    before = time.perf_counter()
+    item_pool.prepare()
+    prepare_seconds = time.perf_counter() - before
+
+    timings = []
+    for student in range(students):
+        true_theta = rng.gauss(0.0, 1.0)
+        session = AdaptiveSession(pool, item_pool, length, answer_key)
+        while not session.finished:
+            item = session.questions.pool_indexes[session.current_question]
+            correct = rng.random() < probability_correct(true_theta, item_pool.a[item],
+                                                         item_pool.b[item], item_pool.c[item])
+            choice = answer_key[item] if correct else (answer_key[item] + 1) % len(pool[item]["choices"])
+            start = time.perf_counter()
+            session.go_to_next_question(choice)
+            timings.append(time.perf_counter() - start)
+
+    from benchmark import latency_summary
+    results = {"items": item_count, "test_length": length, "students": students,
+               "prepare_all_grid_seconds": prepare_seconds}
+    for key, value in latency_summary(timings).items():
+        results["next_question_" + key] = value
+    return results
+
+
+def main():
+    """Calibrate item parameters or benchmark item selection"""
+    parser = argparse.ArgumentParser(description="Adaptive testing tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    calibrate_parser = subparsers.add_parser("calibrate", help="estimate IRT parameters from the item analysis")
+    calibrate_parser.add_argument("--bank", default=None, help="question bank file")
+    calibrate_parser.add_argument("--state", default=None, help="item analysis state file")
+    calibrate_parser.add_argument("--out", default=DEFAULT_PARAMETERS_PATH)
+
+    benchmark = subparsers.add_parser("benchmark", help="time item selection on a large pool")
+    benchmark.add_argument("--items", type=int, default=50000)
+    benchmark.add_argument("--length", type=int, default=30)
+
+    args = parser.parse_args()
+
+    if args.command == "calibrate":
+        from item_analysis import DEFAULT_STATE_PATH, ItemAnalysis
+        from question_bank import load_quiz_data
+        analysis = ItemAnalysis(load_quiz_data(args.bank), args.state or DEFAULT_STATE_PATH)
+        temp_path = args.out + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as parameters_file:
+            json.dump({"categories": calibrate(analysis)}, parameters_file)
+        os.replace(temp_path, args.out)
+        print("Wrote item parameters to", args.out)
+    elif args.command == "benchmark":
+        from benchmark import print_results
+        print_results("Adaptive item selection", benchmark_selection(args.items, args.length))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,26 @@
 # app.py - Main Application Controller Module
-# This module contains the App class and quiz data (works with login_app.py)
+# This module contains the App class, the one window of the application.
+# The login page (login_app.py), main menu and quiz pages are frames inside it.
+# The quiz data itself lives in quiz_data.py or in a question bank file.
 
 import tkinter as tk
-from quiz_components import MainMenu, QuizPage
+from collections import OrderedDict
+from adaptive import (DEFAULT_PARAMETERS_PATH, AdaptiveSession, load_calibration, load_item_pools, make_item_pool,
+                      prepare_item_pools)
+from assets import set_window_icon
+from checkpoints import DEFAULT_CHECKPOINT_DIR, CheckpointStore
+from compact_questions import compact_quiz_data, update_compact_quiz_data
+from grading import answer_key_for
+from leaderboard import Leaderboards, board_key, leaderboard_state_path
+from question_bank import BANK_CHECK_SECONDS, BankFormatError, BankWatcher, QuestionBank, diff_banks, load_quiz_data
+from quiz_data import QUIZ_PAGES
+from quiz_engine import QuizSession
+from results_log import DEFAULT_LOG_PATH, ResultLog, make_attempt_record
+from roster import load_roster
+from sampling import SampledPaper, new_paper_seed, rebuild_paper
+from timers import TimerWheel, TkTimerDriver
+from login_app import LoginPage
+from quiz_components import LeaderboardPage, MainMenu, QuizPage
 
 
 class App(tk.Tk):
@@ -11,306 +29,474 @@ class App(tk.Tk):
     This class manages the quiz data and handles navigation between different pages.
     """
 
-    def __init__(self):
+    def __init__(self, lazy_pages=True, max_cached_pages=None, bank_path=None,
+                 results_log_path=DEFAULT_LOG_PATH, fsync_results=True, start_page="MainMenu",
+                 paper_size=None, checkpoint_dir=DEFAULT_CHECKPOINT_DIR, roster_path=None,
+                 adaptive_length=None, item_parameters_path=DEFAULT_PARAMETERS_PATH,
+                 exam_minutes=None, question_seconds=None, watch_bank=True, question_model="dicts",
+                 instrumentation=None):
+        """
+        Create the main window.
+
+        Parameters:
+        - lazy_pages: If True, pages are only built the first time they are shown
+        - max_cached_pages: If set, quiz pages that have not been shown recently
+          are destroyed once more than this many of them exist (they are rebuilt
+          from their factory if shown again). None means never evict.
+        - bank_path: Question bank file to load (see question_bank.py). If None,
+          questions.qbk next to this file is used when it exists.
+        - results_log_path: Log file that every finished attempt is appended to
+          (see results_log.py). None disables result logging.
+        - fsync_results: If True, results are fsync'ed to disk when committed
+        - start_page: The first page to show ("LoginPage" when started from login)
+        - paper_size: If set, each quiz attempt gets this many random questions
+          from its category, with shuffled choices (see sampling.py)
+        - checkpoint_dir: Directory where unfinished attempts are checkpointed
+          after every answer, so they can be resumed after a crash (see
+          checkpoints.py). None disables checkpoints.
+        - roster_path: Roster index that student IDs are checked against at
+          login (see roster.py). If None, roster.idx next to this file is used
+          when it exists; without a roster any student may log in.
+        - adaptive_length: If set, quizzes are adaptive: each student answers
+          this many questions, each picked from the whole category to suit
+          their estimated ability (see adaptive.py)
+        - item_parameters_path: Calibration file with the IRT parameters used
+          by adaptive quizzes
+        - exam_minutes: If set, each attempt is submitted automatically once
+          this many minutes have passed since it started
+        - question_seconds: If set, a question that is not answered within
+          this many seconds is left unanswered and the quiz moves on
+        - watch_bank: If True and the questions come from a bank file, the
+          file is checked every few seconds and reloaded when it has been
+          rewritten (see reload_bank)
+        - question_model: How the questions are held in memory: "dicts" (as
+          loaded), "slots" or "columnar" (compact models for large banks,
+          see compact_questions.py)
+        - instrumentation: If given, an instrumentation.Instrumentation that is
+          installed before any page is built, so the callbacks that buttons
+          bind when a page is built are the timed ones
+        """
         super().__init__()
+        if instrumentation is not None:
+            instrumentation.install(self)
         self.geometry("600x600")
         self.title("Greenwich University Project - Quiz")
+        set_window_icon(self)
+        self.start_page = start_page
+        self.paper_size = paper_size
+        self.adaptive_length = adaptive_length
+        self.item_parameters_path = item_parameters_path
+
+        # IRT parameters per category, loaded the first time an adaptive quiz
+        # starts or when warm_item_pools first runs
+        self.item_pools = None
+        self.warming_item_pools = False
+
+        # Timed exams: the clocks of every quiz page share one timer wheel,
+        # advanced by a single after() loop (see timers.py)
+        self.exam_seconds = exam_minutes * 60 if exam_minutes is not None else None
+        self.question_seconds = question_seconds
+        self.timer_wheel = TimerWheel()
+        self.timer_driver = TkTimerDriver(self, self.timer_wheel)
+        if self.exam_seconds is not None or self.question_seconds is not None:
+            self.timer_driver.start()
+
+        # Page construction settings
+        self.lazy_pages = lazy_pages
+        self.max_cached_pages = max_cached_pages
 
-        # Student data storage (will be set by login app)
+        # Student data storage (set by the login page)
         self.student_data = {}
 
-        # ===== QUIZ DATA (3 categories) =====
-        # Category 0 -> Software Quiz
-        # Category 1 -> System/Patterns Quiz
-        # Category 2 -> Algorithm/Data Structures Quiz
-        self.quiz_data = [
-            [
-                {
-                    "question": "What are the characteristics of software?",
-                    "choices": [
-                        "Software is developed or engineered; it is not manufactured in the classical sense.",
-                        "Software doesn't wear out.",
-                        "Software can be custom built or custom build.",
-                        "All mentioned above",
-                    ],
-                    "answer": "All mentioned above",
-                },
-                {
-                    "question": "Compilers, Editors software come under which type of software?",
-                    "choices": [
-                        "System software",
-                        "Application software",
-                        "Scientific software",
-                        "None of the above",
-                    ],
-                    "answer": "System software",
-                },
-                {
-                    "question": "Software Engineering is defined as a systematic, disciplined and quantifiable approach for the development, operation and maintenance of software.",
-                    "choices": [
-                        "True",
-                        "False",
-                    ],
-                    "answer": "True",
-                },
-                {
-                    "question": "Software consists of ______ .",
-                    "choices": [
-                        "Set of instructions + operating procedures",
-                        "Programs + hardware manuals",
-                        "Programs + documentation + operating procedures",
-                        "Set of programs",
-                    ],
-                    "answer": "Programs + documentation + operating procedures",
-                },
-                {
-                    "question": "RAD Software process model stands for _____",
-                    "choices": [
-                        "Rapid Application Development.",
-                        "Relative Application Development.",
-                        "Rapid Application Design.",
-                        "Recent Application Development.",
-                    ],
-                    "answer": "Rapid Application Development.",
-                },
-                {
-                    "question": "Software project management comprises of a number of activities, which contains_________.",
-                    "choices": [
-                        "Project planning",
-                        "Scope management",
-                        "Project estimation",
-                        "All mentioned above",
-                    ],
-                    "answer": "All mentioned above",
-                },
-                {
-                    "question": "COCOMO stands for ______ .",
-                    "choices": [
-                        "Consumed Cost Model",
-                        "Constructive Cost Model",
-                        "Common Control Model",
-                        "Composition Cost Model",
-                    ],
-                    "answer": "Constructive Cost Model",
-                },
-                {
-                    "question": "Which of the following is not defined in a good Software Requirement Specification(SRS) document?",
-                    "choices": [
-                        "Functional Requirement.",
-                        "Nonfunctional Requirement.",
-                        "Goals of implementation.",
-                        "Algorithm for software implementation.",
-                    ],
-                    "answer": "Algorithm for software implementation.",
-                },
-                {
-                    "question": "What is the simplest model of software development paradigm?",
-                    "choices": [
-                        "Spiral model",
-                        "Big Bang model",
-                        "V-model",
-                        "Waterfall model",
-                    ],
-                    "answer": "Waterfall model",
-                },
-                {
-                    "question": "Which design identifies the software as a system with many components interacting with each other?",
-                    "choices": [
-                        "High-level design",
-                        "Architectural design",
-                        "Detailed design",
-                        "Efficiently design",
-                    ],
-                    "answer": "Architectural design",
-                },
-            ],
-            [
-                {
-                    "question": "The extent to which one component depends on other components?",
-                    "choices": [
-                        "Cohesion",
-                        "Concern",
-                        "Coupling",
-                        "Crossover",
-                    ],
-                    "answer": "Coupling",
-                },
-                {
-                    "question": "Given classes A and B, which of the following is not a common type of coupling in object-oriented software?",
-                    "choices": [
-                        "A is a direct or an indirect subclass of B",
-                        "A method parameter or local variable in A references B",
-                        "A has an instance variable that refers to B",
-                        "None of the above",
-                    ],
-                    "answer": "None of the above",
-                },
-                {
-                    "question": "All else being equal, which is more desirable?",
-                    "choices": [
-                        "Higher/tighter coupling",
-                        "Lower/looser coupling",
-                        "None of the above is more desirable than the others",
-                    ],
-                    "answer": "Lower/looser coupling",
-                },
-                {
-                    "question": "Which of the following is true about design patterns?",
-                    "choices": [
-                        "Represent the best practices used by experienced object-oriented software developers",
-                        "Solutions to general problems that developers commonly face during software development",
-                        "Obtained by trial and error of numerous software developers over a substantial period of time",
-                        "All of the above",
-                    ],
-                    "answer": "All of the above",
-                },
-                {
-                    "question": "Which pattern automatically notifies dependent objects when a subject object is modified?",
-                    "choices": [
-                        "Adapter",
-                        "Observer",
-                        "Mediator",
-                        "Memento",
-                    ],
-                    "answer": "Observer",
-                },
-                {
-                    "question": "Which pattern encapsulates how a set of objects interact?",
-                    "choices": [
-                        "Adapter",
-                        "Observer",
-                        "Mediator",
-                        "Memento",
-                    ],
-                    "answer": "Mediator",
-                },
-                {
-                    "question": "Which of the following are true about the Mediator Pattern?",
-                    "choices": [
-                        "Promotes loose coupling by keeping objects from referring to each other explicitly.",
-                        "Allows you to vary the interaction between objects independently.",
-                        "Uses indirection to keep objects from directly referring to each other.",
-                        "All of the above.",
-                    ],
-                    "answer": "All of the above.",
-                },
-            ],
-            [
-                {
-                    "question": "Process of inserting an element in stack is called ____________",
-                    "choices": ["Create", "Push", "Evaluation", "Pop"],
-                    "answer": "Push",
-                },
-                {
-                    "question": "Process of removing an element from stack is called ____________",
-                    "choices": ["Create", "Push", "Evaluation", "Pop"],
-                    "answer": "Pop",
-                },
-                {
-                    "question": "In a stack, if a user tries to remove an element from an empty stack it is called _________",
-                    "choices": [
-                        "Underflow",
-                        "Empty collection",
-                        "Overflow",
-                        "Garbage Collection",
-                    ],
-                    "answer": "Underflow",
-                },
-                {
-                    "question": "Pushing an element into stack already having five elements and stack size of 5, then stack becomes ___________",
-                    "choices": [
-                        "Underflow",
-                        "Empty collection",
-                        "Overflow",
-                        "Garbage Collection",
-                    ],
-                    "answer": "Overflow",
-                },
-                {
-                    "question": "RAD Software process model stands for _____",
-                    "choices": [
-                        "Rapid Application Development.",
-                        "Relative Application Development.",
-                        "Rapid Application Design.",
-                        "Recent Application Development.",
-                    ],
-                    "answer": "Rapid Application Development.",
-                },
-                {
-                    "question": "Entries in a stack are 'ordered'. What is the meaning of this statement?",
-                    "choices": [
-                        "A collection of stacks is sortable",
-                        "Stack entries may be compared with the '<' operation",
-                        "The entries are stored in a linked list",
-                        "There is a Sequential entry that is one by one",
-                    ],
-                    "answer": "There is a Sequential entry that is one by one",
-                },
-                {
-                    "question": "The data structure required to check whether an expression contains a balanced parenthesis is?.",
-                    "choices": ["Stack", "Queue", "Array", "Tree"],
-                    "answer": "Stack",
-                },
-                {
-                    "question": "The postfix form of A*B+C/D is?",
-                    "choices": ["*AB/CD+", "AB*CD/+", "A*BC+/D", "ABCD+/*"],
-                    "answer": "AB*CD/+",
-                },
-                {
-                    "question": "A linear list of elements in which deletion can be done from one end (front) and insertion can take place only at the other end (rear) is known as _____________",
-                    "choices": ["Queue", "Stack", "Tree", "Linked list"],
-                    "answer": "Queue",
-                },
-                {
-                    "question": "Circular Queue is also known as ________",
-                    "choices": ["Ring Buffer", "Square Buffer", "Rectangle Buffer", "Curve Buffer"],
-                    "answer": "Ring Buffer",
-                },
-            ],
-        ]
+        # Enrolled students (memory-mapped, so opening it reads almost nothing)
+        self.roster = load_roster(roster_path)
+
+        # ===== QUIZ DATA =====
+        # Loaded from a question bank file if one exists, otherwise the
+        # built-in questions from quiz_data.py are used.
+        # Each category only gets decoded when a quiz page asks for it.
+        # With a compact question model, every question is read once into
+        # it and the pages, sessions and grading all use the compact copy.
+        self.question_model = question_model
+        self.question_source = load_quiz_data(bank_path)
+        self.quiz_data = compact_quiz_data(self.question_source, question_model)
+
+        # Index of the correct choice for every question, per category.
+        # Built-in questions are validated here, so a typo in an answer stops
+        # the app at startup instead of making a question unanswerable.
+        # Bank files store keys that were validated when the bank was built.
+        self.answer_keys = [answer_key_for(questions) for questions in self.quiz_data]
+
+        # Bumped every time the bank is reloaded; quiz pages remember the
+        # version their attempt was started with
+        self.bank_version = 0
+        self.bank_watcher = None
+
+        # Bank files replaced by a reload, by version, kept open while a quiz
+        # page's attempt still uses their questions (see close_unused_banks)
+        self.retired_banks = {}
+        if watch_bank and isinstance(self.question_source, QuestionBank):
+            self.bank_watcher = BankWatcher(self.question_source.path)
+            self.timer_wheel.schedule(BANK_CHECK_SECONDS, self.check_bank)
+            self.timer_driver.start()
+
+        # Adaptive quizzes: the item pools are loaded and ranked in slices
+        # while the student logs in, so no first question waits for a ranking
+        if adaptive_length is not None:
+            self.start_warming_item_pools()
+
+        # Finished attempts are appended to the results log. Opening it
+        # recovers the log, cutting off a record torn by a crash.
+        self.results_log = None
+        if results_log_path is not None:
+            self.results_log = ResultLog(results_log_path, fsync=fsync_results)
+
+        # Best attempts per category, loaded from their state file and brought
+        # up to date with the attempts logged since it was saved. Without a
+        # results log they only cover this run.
+        self.results_log_path = results_log_path
+        if results_log_path is not None:
+            self.leaderboards = Leaderboards(state_path=leaderboard_state_path(results_log_path))
+            self.leaderboards.update_from_log(results_log_path)
+        else:
+            self.leaderboards = Leaderboards(state_path=None)
+
+        # Unfinished attempts are checkpointed after every answer
+        self.checkpoints = None
+        if checkpoint_dir is not None:
+            self.checkpoints = CheckpointStore(checkpoint_dir)
 
         self.setup_ui()
 
     def setup_ui(self):
-        """Set up the user interface with container and frames"""
+        """Set up the user interface with container and page factories"""
         # ====== Container for pages ======
-        container = tk.Frame(self)
-        container.pack(fill="both", expand=True)
-        container.grid_rowconfigure(0, weight=1)
-        container.grid_columnconfigure(0, weight=1)
-
-        self.frames = {}
-
-        # Create Main Menu
-        main = MainMenu(parent=container, controller=self)
-        self.frames["MainMenu"] = main
-        main.grid(row=0, column=0, sticky="nsew")
-
-        # Create three quiz pages, each bound to its category index
-        pages = [
-            ("SoftwareQuiz", "Software Quiz", 0),
-            ("LogicDesignQuiz", "Logic and Design Quiz", 1),
-            ("AlgorithmQuiz", "Algorithm Quiz", 2),
-        ]
-        for key, title, idx in pages:
-            frame = QuizPage(parent=container, controller=self, category_index=idx, title=title)
-            self.frames[key] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
+        self.container = tk.Frame(self)
+        self.container.pack(fill="both", expand=True)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
 
-        self.show_frame("MainMenu")
+        # Pages that have been built so far, most recently shown last
+        self.frames = OrderedDict()
+
+        # Functions that build each page when it is first needed
+        self.page_factories = {}
+
+        # Pages that are never evicted (login and menu are shown all the time)
+        self.pinned_pages = {"LoginPage", "MainMenu"}
+
+        # Register Login Page and Main Menu
+        self.register_page("LoginPage",
+                           lambda parent: LoginPage(parent=parent, controller=self))
+        self.register_page("MainMenu",
+                           lambda parent: MainMenu(parent=parent, controller=self))
+
+        # Register the quiz pages (see quiz_data.QUIZ_PAGES), each bound to its category index
+        for key, title, idx in QUIZ_PAGES:
+            self.register_page(key, lambda parent, idx=idx, title=title: QuizPage(
+                parent=parent, controller=self, category_index=idx, title=title))
+
+        self.register_page("LeaderboardPage",
+                           lambda parent: LeaderboardPage(parent=parent, controller=self))
+
+        # Without lazy pages, build everything up front like before
+        if not self.lazy_pages:
+            for page_name in self.page_factories:
+                self.get_frame(page_name)
+
+        self.show_frame(self.start_page)
+
+    def register_page(self, page_name, factory):
+        """
+        Register a function that builds a page.
+        The factory is called with the page container as its only argument.
+        """
+        self.page_factories[page_name] = factory
+
+    def get_frame(self, page_name):
+        """Return the frame for a page, building it first if needed"""
+        frame = self.frames.get(page_name)
+        if frame is None:
+            frame = self.page_factories[page_name](self.container)
+            frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[page_name] = frame
+        return frame
 
     def show_frame(self, page_name: str):
         """Show the specified frame/page"""
-        frame = self.frames[page_name]
+        frame = self.get_frame(page_name)
         frame.tkraise()
 
+        # Let the page update itself (for example the menu's student details)
+        if hasattr(frame, "on_show"):
+            frame.on_show()
+
+        # Remember that this page was used most recently
+        self.frames.move_to_end(page_name)
+        self.evict_unused_pages()
+
+        # Pages removed by the eviction (or by login/logout just before) may
+        # have held the last attempt on an old bank file
+        self.close_unused_banks()
+
+    def login(self, student_data):
+        """
+        Store the logged-in student and show the main menu.
+        If the student has an unfinished attempt (for example after a crash),
+        its quiz page is shown instead, at the question they had reached.
+        """
+        self.student_data = student_data
+        self.show_frame("MainMenu")
+
+        if self.checkpoints is not None:
+            unfinished = self.checkpoints.unfinished(student_data["id"])
+            page_names = {idx: key for key, title, idx in QUIZ_PAGES}
+            for category_index in unfinished:
+                if category_index in page_names:
+                    # A page built before login (lazy_pages=False) holds a
+                    # fresh attempt, so build it again from the checkpoint
+                    page_name = page_names[category_index]
+                    if page_name in self.frames:
+                        self.frames.pop(page_name).destroy()
+                    self.show_frame(page_name)
+                    break
+
+    def logout(self):
+        """Forget the student, drop their quiz pages and go back to the login page"""
+        self.student_data = {}
+
+        # Quiz pages hold the student's answers, so the next student gets new ones
+        for page_name in list(self.frames):
+            if page_name not in self.pinned_pages:
+                self.frames.pop(page_name).destroy()
+
+        self.get_frame("LoginPage").clear_form()
+        self.show_frame("LoginPage")
+
+    def record_attempt(self, category_index, session):
+        """
+        Append a finished attempt to the results log and the leaderboards.
+        The write happens on the log's writer thread, so the window does not
+        wait for the disk; returns the log's Future (or None without a log).
+        """
+        self.discard_checkpoint(category_index)
+        record = make_attempt_record(self.student_data, category_index, session)
+        self.leaderboards.add_attempt(record)
+        if self.results_log is None:
+            return None
+        return self.results_log.append(record)
+
+    def leaderboard_rows(self, category_index, k=100):
+        """Return the rendered top k rows of a category's leaderboard"""
+        return self.leaderboards.view(board_key(category_index), k)
+
+    def item_pool(self, category_index):
+        """Return the IRT parameters (adaptive.ItemPool) of a category"""
+        if self.item_pools is None:
+            self.item_pools = load_item_pools(self.quiz_data, self.item_parameters_path)
+        return self.item_pools[category_index]
+
+    def start_warming_item_pools(self):
+        """Have the timer wheel compute the item pools' rankings (see warm_item_pools)"""
+        if not self.warming_item_pools:
+            self.warming_item_pools = True
+            self.timer_wheel.schedule(0, self.warm_item_pools)
+            self.timer_driver.start()
+
+    def warm_item_pools(self):
+        """
+        Timer callback: load the item pools if needed, then compute their
+        missing rankings for a short slice and come back on the next tick
+        until every ranking is cached.
+        """
+        if self.item_pools is None:
+            self.item_pools = load_item_pools(self.quiz_data, self.item_parameters_path)
+        if prepare_item_pools(self.item_pools):
+            self.timer_wheel.schedule(0, self.warm_item_pools)
+        else:
+            self.warming_item_pools = False
+
+    def new_session(self, category_index):
+        """
+        Start a new attempt at a category: adaptive if adaptive_length is set,
+        on a random paper if paper_size is set, otherwise all the questions.
+        """
+        questions = self.quiz_data[category_index]
+        if self.adaptive_length is not None:
+            return AdaptiveSession(questions, self.item_pool(category_index), self.adaptive_length,
+                                   self.answer_keys[category_index])
+        if self.paper_size is not None and self.paper_size < len(questions):
+            return QuizSession(SampledPaper(questions, self.paper_size, new_paper_seed()))
+        return QuizSession(questions, self.answer_keys[category_index])
+
+    def rebuild_session(self, category_index, paper_params):
+        """
+        Start an attempt on the same paper as an earlier one (described by its
+        params, or None for all the questions). Raises ValueError if the
+        questions have changed so that the paper cannot be rebuilt.
+        """
+        questions = self.quiz_data[category_index]
+        if paper_params is None:
+            return QuizSession(questions, self.answer_keys[category_index])
+        if paper_params.get("adaptive"):
+            if paper_params["pool_size"] != len(questions):
+                raise ValueError("the pool has changed size since the attempt started")
+            return AdaptiveSession(questions, self.item_pool(category_index), paper_params["length"],
+                                   self.answer_keys[category_index])
+        return QuizSession(rebuild_paper(questions, paper_params))
+
+    def restore_session(self, category_index):
+        """
+        Return the logged-in student's unfinished session for a category,
+        rebuilt from its checkpoint, or None if there is nothing to resume.
+        """
+        if self.checkpoints is None or "id" not in self.student_data:
+            return None
+        return self.checkpoints.restore(self.student_data["id"], category_index,
+                                        lambda paper_params: self.rebuild_session(category_index, paper_params))
+
+    def checkpoint_answer(self, category_index, session, question_index):
+        """Checkpoint the answer just given (the write happens on a background thread)"""
+        if self.checkpoints is None or "id" not in self.student_data:
+            return
+        self.checkpoints.save_answer(self.student_data["id"], category_index, session, question_index)
+
+    def discard_checkpoint(self, category_index):
+        """Forget the checkpoint of an attempt that was finished or restarted"""
+        if self.checkpoints is None or "id" not in self.student_data:
+            return
+        self.checkpoints.discard(self.student_data["id"], category_index)
+
+    def check_bank(self):
+        """Timer callback: reload the bank if its file was rewritten"""
+        self.timer_wheel.schedule(BANK_CHECK_SECONDS, self.check_bank)
+        stat = self.bank_watcher.changed()
+        if stat is None:
+            return
+        try:
+            self.reload_bank()
+        except (OSError, BankFormatError):
+            # Not a complete bank (yet); keep the old one and look again later
+            return
+        self.bank_watcher.mark_loaded(stat)
+
+    def reload_bank(self):
+        """
+        Open the rewritten bank file and apply what changed.
+        Only the changed categories get new answer keys and item pools, and
+        only their quiz pages are told; pages in the middle of an attempt
+        keep the questions they started with (the old file stays mapped
+        until the last of them is done, see close_unused_banks). Returns
+        {category index: [changed question indexes]}.
+        With a compact question model only the changed categories of the
+        compact copy are rebuilt (an attempt under way keeps its old copy).
+        """
+        new_bank = QuestionBank(self.question_source.path)
+        changes = diff_banks(self.question_source, new_bank)
+        if not changes:
+            # Same questions: keep the mapped file that the pages already use
+            new_bank.close()
+            return changes
+        self.retired_banks[self.bank_version] = self.question_source
+        self.question_source = new_bank
+        self.bank_version = self.bank_version + 1
+        self.quiz_data = update_compact_quiz_data(self.quiz_data, new_bank, changes, self.question_model)
+
+        category_count = len(new_bank)
+        del self.answer_keys[category_count:]
+        if self.item_pools is not None:
+            del self.item_pools[category_count:]
+            calibrated = load_calibration(self.item_parameters_path)
+        for category_index in sorted(changes):
+            if category_index >= category_count:
+                continue
+            questions = self.quiz_data[category_index]
+            answer_key = answer_key_for(questions)
+            if category_index < len(self.answer_keys):
+                self.answer_keys[category_index] = answer_key
+            else:
+                self.answer_keys.append(answer_key)
+            if self.item_pools is not None:
+                item_pool = make_item_pool(calibrated, category_index, questions)
+                if category_index < len(self.item_pools):
+                    self.item_pools[category_index] = item_pool
+                else:
+                    self.item_pools.append(item_pool)
+        if self.item_pools is not None:
+            self.start_warming_item_pools()
+
+        # Quiz pages of changed categories pick up the new questions if no attempt is under way
+        for key, title, idx in QUIZ_PAGES:
+            frame = self.frames.get(key)
+            if idx in changes and frame is not None:
+                frame.refresh_questions()
+        self.close_unused_banks()
+        return changes
+
+    def close_unused_banks(self):
+        """
+        Close the retired bank files that no quiz page's attempt uses any
+        more. Called after a reload, whenever a page switches to a new
+        attempt and whenever pages are removed.
+        """
+        if not self.retired_banks:
+            return
+        versions_in_use = set()
+        if self.question_model == "dicts":
+            # Compact copies hold their own questions, so with a compact
+            # model no page refers to a bank file
+            for key, title, idx in QUIZ_PAGES:
+                frame = self.frames.get(key)
+                if frame is not None:
+                    versions_in_use.add(frame.bank_version)
+        for version in list(self.retired_banks):
+            if version not in versions_in_use:
+                self.retired_banks.pop(version).close()
+
+    def destroy(self):
+        """Close the window, making sure queued results and checkpoints are written first"""
+        self.timer_driver.stop()
+        if self.results_log is not None:
+            self.results_log.close()
+            # Read what other running apps logged since startup too (this
+            # window's own attempts are read again, which changes nothing),
+            # so the saved offset only skips attempts that are on the boards
+            self.leaderboards.update_from_log(self.results_log_path)
+            self.leaderboards.save_state()
+        if self.checkpoints is not None:
+            self.checkpoints.close()
+        if self.roster is not None:
+            self.roster.close()
+        super().destroy()
+
+        # The pages are gone, so no attempt reads the bank files any more
+        for bank in self.retired_banks.values():
+            bank.close()
+        self.retired_banks = {}
+        if isinstance(self.question_source, QuestionBank):
+            self.question_source.close()
+
+    def evict_unused_pages(self):
+        """Destroy the least recently shown pages if too many are alive"""
+        if self.max_cached_pages is None:
+            return
+
+        # Only unpinned pages count towards the limit
+        evictable = [name for name in self.frames if name not in self.pinned_pages]
+
+        # The last page in the list is the one on screen, so never remove it
+        while len(evictable) > max(self.max_cached_pages, 1):
+            page_name = evictable.pop(0)
+            self.frames.pop(page_name).destroy()
+
 
-def create_app():
+def create_app(**options):
     """
     Factory function to create and return an App instance.
     This can be called from other modules to create the application.
+    Any keyword options are passed on to App (for example lazy_pages=False).
     """
-    return App()
+    return App(**options)
 
 
 # If this module is run directly, create and run the app
@@ -0,0 +1,99 @@
+# assets.py - Image Asset Cache Module
+# This module loads the images used by the windows (like the university logo).
+#
+# Assets are looked up next to this file instead of at a fixed absolute path.
+# Scaled images are cached in two places:
+#   - on disk, in .asset_cache/, under a name made from the SHA-1 of the
+#     original file and the scale factor, so the full-size image only has to
+#     be decoded and subsampled once (and again only if the file changes)
+#   - in memory, per Tk interpreter, so every window that shows the logo
+#     shares one PhotoImage instead of decoding it again
+
+import hashlib
+import os
+import tkinter as tk
+
+# Folder the asset files are in (the folder of this module)
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Folder for the pre-scaled copies
+CACHE_DIR = os.path.join(ASSET_DIR, ".asset_cache")
+
+LOGO_FILE = "greenwich_logo.png"
+ICON_FILE = "greenwich_logo.ico"
+
+# The logo is shown at a third of its original size
+LOGO_SUBSAMPLE = 3
+
+
+def asset_path(name):
+    """Return the full path of an asset file"""
+    return os.path.join(ASSET_DIR, name)
+
+
+def file_digest(path):
+    """Return the SHA-1 hex digest of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as asset_file:
+        for block in iter(lambda: asset_file.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scaled_cache_path(path, subsample):
+    """Return where the pre-scaled copy of an image is cached on disk"""
+    return os.path.join(CACHE_DIR, file_digest(path) + "-" + str(subsample) + ".png")
+
+
+def load_scaled_image(master, name, subsample):
+    """
+    Return a PhotoImage of asset `name` shrunk by `subsample` (every n-th pixel).
+
+    The image is shared by all windows of the same Tk root. Raises
+    tk.TclError or OSError if the asset cannot be loaded, so callers can fall
+    back to text.
+    """
+    root = master.nametowidget(".")
+    if not hasattr(root, "asset_images"):
+        root.asset_images = {}
+    key = (name, subsample)
+    image = root.asset_images.get(key)
+    if image is not None:
+        return image
+
+    path = asset_path(name)
+    cached_path = scaled_cache_path(path, subsample)
+    if os.path.exists(cached_path):
+        # Only the small image has to be decoded
+        image = tk.PhotoImage(master=root, file=cached_path)
+    else:
+        original = tk.PhotoImage(master=root, file=path)
+        image = original.subsample(subsample, subsample)
+        save_scaled_copy(image, cached_path)
+
+    root.asset_images[key] = image
+    return image
+
+
+def save_scaled_copy(image, cached_path):
+    """Write a scaled image to the disk cache (failures only cost speed)"""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temp_path = cached_path + ".tmp"
+        image.write(temp_path, format="png")
+        os.replace(temp_path, cached_path)
+    except (OSError, tk.TclError):
+        pass
+
+
+def load_logo(master):
+    """Return the shared, pre-scaled university logo"""
+    return load_scaled_image(master, LOGO_FILE, LOGO_SUBSAMPLE)
+
+
+def set_window_icon(window):
+    """Set the window icon if the icon file can be used on this platform"""
+    try:
+        window.iconbitmap(asset_path(ICON_FILE))
+    except tk.TclError:
+        pass
@@ -0,0 +1,665 @@
+# benchmark.py - Benchmark Module
+# This module contains small benchmarks for the quiz application.
+# Each benchmark is a function that returns a dictionary of results,
+# and the command line below lets you run them one at a time.
+#
+# Usage:
+#     python benchmark.py transitions --count 100000
+#     python benchmark.py startup --runs 20
+#     python benchmark.py grading --students 20000
+#     python benchmark.py sessions --students 1000 --backend engine
+#     python benchmark.py results-log --attempts 20000 --threads 200
+#     python benchmark.py login --count 200
+#     python benchmark.py timers --sessions 10000
+#     python benchmark.py review --questions 500
+#
+# Benchmarks that build tkinter windows need a display (on a server you can
+# run them under Xvfb, e.g. "xvfb-run python benchmark.py transitions").
+# tkinter is only imported by the benchmarks that need it, so the helpers
+# below can be used by headless tools too.
+
+import argparse
+import resource
+import time
+
+
+def percentile(sorted_values, fraction):
+    """Return the value at the given fraction (0.0 - 1.0) of a sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = int(round(fraction * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def latency_summary(samples):
+    """Turn a list of latencies (in seconds) into a summary in milliseconds"""
+    samples = sorted(samples)
+    total = sum(samples)
+    return {
+        "count": len(samples),
+        "mean_ms": (total / len(samples)) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "max_ms": (samples[-1] * 1000) if samples else 0.0,
+    }
+
+
+def peak_memory_kb():
+    """Return the peak resident memory of this process in kilobytes"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def tcl_command_count(widget):
+    """Count the Tcl commands that exist in the widget's interpreter"""
+    return len(widget.tk.splitlist(widget.tk.call("info", "commands")))
+
+
+def benchmark_question_transitions(count=100000, pooled=True):
+    """
+    Click through quiz questions `count` times and measure each transition.
+
+    A transition is either "Next" (moving to the next question) or "Restart"
+    (after the last question), which are the two paths that rebuild the
+    answer choices. Widget and Tcl object counts are sampled at the end so
+    pooled and non-pooled modes can be compared.
+    """
+    from app import create_app
+
+    app = create_app(results_log_path=None, checkpoint_dir=None)
+    app.withdraw()
+    try:
+        page = app.get_frame("SoftwareQuiz")
+        page.pooled_choices = pooled
+        page.restart_quiz()
+        app.update_idletasks()
+
+        start_commands = tcl_command_count(app)
+        latencies = []
+        started = time.perf_counter()
+        for i in range(count):
+            before = time.perf_counter()
+            if page.current_question == page.total_questions - 1:
+                page.restart_quiz()
+            else:
+                page.selected_answer.set(0)
+                page.go_to_next_question()
+            latencies.append(time.perf_counter() - before)
+            # Let Tk process pending geometry work, as the real event loop would
+            if i % 100 == 0:
+                app.update_idletasks()
+        elapsed = time.perf_counter() - started
+
+        results = latency_summary(latencies)
+        results["mode"] = "pooled" if pooled else "rebuild"
+        results["transitions_per_second"] = count / elapsed if elapsed else 0.0
+        results["choice_widgets"] = len(page.choices_container.winfo_children())
+        results["tcl_commands_start"] = start_commands
+        results["tcl_commands_end"] = tcl_command_count(app)
+        results["peak_memory_kb"] = peak_memory_kb()
+        return results
+    finally:
+        app.destroy()
+
+
+def benchmark_startup(runs=20, lazy_pages=True):
+    """
+    Measure how long it takes to create the application window.
+
+    Each run creates the App, lets Tk finish its idle work (so geometry is
+    computed like on a real launch) and destroys it again. Running with
+    lazy_pages=False gives the old "build every page at startup" numbers.
+    """
+    import tracemalloc
+    from app import create_app
+
+    latencies = []
+    built_pages = 0
+    peak_python_kb = 0
+    for i in range(runs):
+        tracemalloc.start()
+        before = time.perf_counter()
+        app = create_app(lazy_pages=lazy_pages, results_log_path=None, checkpoint_dir=None)
+        app.update_idletasks()
+        latencies.append(time.perf_counter() - before)
+        peak_python_kb = max(peak_python_kb, tracemalloc.get_traced_memory()[1] // 1024)
+        tracemalloc.stop()
+        built_pages = len(app.frames)
+        app.destroy()
+
+    results = latency_summary(latencies)
+    results["mode"] = "lazy" if lazy_pages else "eager"
+    results["pages_built_at_startup"] = built_pages
+    results["peak_python_memory_kb"] = peak_python_kb
+    return results
+
+
+def random_submissions(questions, student_count, seed=0):
+    """Make random answer lists (like QuizSession.user_answers) for testing"""
+    import random
+
+    rng = random.Random(seed)
+    choice_counts = [len(question["choices"]) for question in questions]
+    return [[rng.randrange(count) for count in choice_counts] for i in range(student_count)]
+
+
+def benchmark_batch_grading(student_count=20000, category_index=0, repeat=50):
+    """
+    Compare grading every student with QuizSession.calculate_final_score
+    against grading the whole batch with grading.grade_batch.
+
+    To get a bank of realistic size the category is repeated `repeat` times.
+    """
+    from grading import compile_answer_key, grade_batch, pack_submissions
+    from quiz_data import QUIZ_DATA
+    from quiz_engine import QuizSession
+
+    questions = list(QUIZ_DATA[category_index]) * repeat
+    submissions = random_submissions(questions, student_count)
+
+    # Per-student approach: one session per student, scored one by one
+    answer_key = compile_answer_key(questions)
+    before = time.perf_counter()
+    loop_totals = []
+    for answers in submissions:
+        session = QuizSession(questions, answer_key)
+        session.user_answers = answers
+        loop_totals.append(session.calculate_final_score())
+    loop_seconds = time.perf_counter() - before
+
+    # Batch approach: pack once, grade all columns
+    before = time.perf_counter()
+    matrix = pack_submissions(submissions, len(questions))
+    packed_seconds = time.perf_counter() - before
+    before = time.perf_counter()
+    grades = grade_batch(answer_key, matrix)
+    batch_seconds = time.perf_counter() - before
+
+    return {
+        "students": student_count,
+        "questions": len(questions),
+        "loop_seconds": loop_seconds,
+        "pack_seconds": packed_seconds,
+        "batch_seconds": batch_seconds,
+        "speedup_excluding_pack": loop_seconds / batch_seconds if batch_seconds else 0.0,
+        "results_match": grades.totals == loop_totals,
+    }
+
+
+def step_timer(latencies, step_name, function):
+    """Wrap `function` so each call's duration is added to latencies[step_name]"""
+    samples = latencies.setdefault(step_name, [])
+
+    def timed(*args, **kwargs):
+        before = time.perf_counter()
+        result = function(*args, **kwargs)
+        samples.append(time.perf_counter() - before)
+        return result
+    return timed
+
+
+def simulate_engine_student(number, quiz_data, answer_keys, latencies):
+    """
+    One student through the headless engine: login, pick a category,
+    answer every question, finish. Each step does what QuizPage does
+    around the engine call, minus the widgets.
+    """
+    from quiz_engine import STEP_FINISHED, QuizSession
+    from students import make_student_data
+
+    login = step_timer(latencies, "login", make_student_data)
+    login("Student " + str(number), "student" + str(number) + "@example.ac.uk", str(number))
+
+    category_index = number % len(quiz_data)
+    select = step_timer(latencies, "select_category", QuizSession)
+    session = select(quiz_data[category_index], answer_keys[category_index])
+
+    def show_current_question():
+        question = session.current()
+        return question["question"], list(question["choices"]), session.current_answer()
+
+    show = step_timer(latencies, "show_current_question", show_current_question)
+    next_question = step_timer(latencies, "go_to_next_question", session.go_to_next_question)
+    score = step_timer(latencies, "calculate_final_score", session.calculate_final_score)
+
+    while True:
+        text, choices, previous_answer = show()
+        if next_question(number % len(choices)) == STEP_FINISHED:
+            break
+    return score()
+
+
+def simulate_tk_student(app, number, latencies):
+    """
+    One student through the real tkinter pages: the same calls the buttons
+    make. Needs a display (for example Xvfb).
+    """
+    from quiz_data import QUIZ_PAGES
+    from students import make_student_data
+
+    login = step_timer(latencies, "login", make_student_data)
+    app.student_data = login("Student " + str(number),
+                             "student" + str(number) + "@example.ac.uk", str(number))
+
+    page_name = QUIZ_PAGES[number % len(QUIZ_PAGES)][0]
+    step_timer(latencies, "select_category", app.show_frame)(page_name)
+    page = app.get_frame(page_name)
+
+    # Time the page's own methods while this student uses it
+    # (the final score is calculated by the page's session when it finishes)
+    page.show_current_question = step_timer(latencies, "show_current_question",
+                                            page.show_current_question)
+    page.session.calculate_final_score = step_timer(latencies, "calculate_final_score",
+                                                    page.session.calculate_final_score)
+    next_question = step_timer(latencies, "go_to_next_question", page.go_to_next_question)
+    try:
+        page.show_current_question()
+        while True:
+            page.selected_answer.set(number % len(page.radio_buttons))
+            next_question()
+            app.update_idletasks()
+            if page.session.finished:
+                break
+        return page.session.final_score
+    finally:
+        # Put the real methods back and leave the page fresh for the next student
+        del page.show_current_question
+        del page.session.calculate_final_score
+        page.go_back_to_menu()
+
+
+def benchmark_sessions(student_count=1000, backend="engine", repeat=1):
+    """
+    Simulate `student_count` students doing login -> category selection ->
+    answering every question -> finish, one after another.
+
+    backend="engine" uses quiz_engine.QuizSession directly (no display
+    needed); backend="tk" drives the real QuizPage widgets. `repeat` makes
+    every category that many times longer, to see how results scale as the
+    bank grows. Reports throughput, per-step latency percentiles and peak
+    memory.
+    """
+    import tracemalloc
+    from grading import answer_key_for
+    from question_bank import load_quiz_data
+
+    latencies = {}
+    tracemalloc.start()
+    before = time.perf_counter()
+
+    if backend == "engine":
+        quiz_data = [list(questions) * repeat for questions in load_quiz_data()]
+        answer_keys = [answer_key_for(questions) for questions in quiz_data]
+        for number in range(student_count):
+            simulate_engine_student(number, quiz_data, answer_keys, latencies)
+    else:
+        from app import create_app
+        app = create_app(results_log_path=None, checkpoint_dir=None)
+        app.withdraw()
+        if repeat > 1:
+            app.quiz_data = [list(questions) * repeat for questions in app.quiz_data]
+            app.answer_keys = [answer_key * repeat for answer_key in app.answer_keys]
+        try:
+            for number in range(student_count):
+                simulate_tk_student(app, number, latencies)
+        finally:
+            app.destroy()
+
+    elapsed = time.perf_counter() - before
+    peak_python_kb = tracemalloc.get_traced_memory()[1] // 1024
+    tracemalloc.stop()
+
+    results = {
+        "backend": backend,
+        "students": student_count,
+        "seconds": elapsed,
+        "students_per_second": student_count / elapsed if elapsed else 0.0,
+    }
+    for step_name, samples in latencies.items():
+        summary = latency_summary(samples)
+        results[step_name + "_p50_ms"] = summary["p50_ms"]
+        results[step_name + "_p95_ms"] = summary["p95_ms"]
+        results[step_name + "_p99_ms"] = summary["p99_ms"]
+    results["peak_python_memory_kb"] = peak_python_kb
+    results["peak_memory_kb"] = peak_memory_kb()
+    return results
+
+
+def benchmark_results_log(attempt_count=20000, thread_count=200, fsync=True, max_batch=1000):
+    """
+    Many sessions finishing at the same moment: `thread_count` threads each
+    append attempts to a fresh results log and wait for every commit.
+    Run with max_batch=1 to see the cost without group commit.
+    """
+    import os
+    import tempfile
+    import threading
+    from results_log import ResultLog
+
+    record = {
+        "student": {"name": "Student", "email": "student@example.ac.uk", "id": "000000000"},
+        "category": 0,
+        "answers": [1, 2, 0, 3, 1, 2, 0, 3, 1, 2],
+        "score": 4,
+        "total": 10,
+        "started_at": time.time(),
+        "finished_at": time.time(),
+        "question_seconds": [4.2] * 10,
+    }
+    per_thread = attempt_count // thread_count
+    latencies = []
+
+    def finish_attempts(results_log):
+        samples = []
+        for i in range(per_thread):
+            before = time.perf_counter()
+            results_log.append(record).result()
+            samples.append(time.perf_counter() - before)
+        latencies.extend(samples)
+
+    with tempfile.TemporaryDirectory() as directory:
+        results_log = ResultLog(os.path.join(directory, "results.wal"), fsync=fsync, max_batch=max_batch)
+        threads = [threading.Thread(target=finish_attempts, args=(results_log,)) for i in range(thread_count)]
+        before = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - before
+        results_log.close()
+
+    results = latency_summary(latencies)
+    results["fsync"] = fsync
+    results["max_batch"] = max_batch
+    results["attempts_per_second"] = len(latencies) / elapsed if elapsed else 0.0
+    return results
+
+
+def benchmark_login_transitions(count=200):
+    """
+    Measure login -> quiz and logout -> login page switches in the single
+    app window, and compare them with the old approach of destroying the
+    login window and creating a new Tk root for the quiz.
+    """
+    import tkinter as tk
+    from app import create_app
+
+    student_data = {"name": "Student", "email": "student@example.ac.uk", "id": "000000001"}
+
+    app = create_app(start_page="LoginPage", results_log_path=None, checkpoint_dir=None)
+    app.withdraw()
+    login_latencies = []
+    logout_latencies = []
+    try:
+        app.update_idletasks()
+        for i in range(count):
+            before = time.perf_counter()
+            app.login(student_data)
+            app.show_frame("SoftwareQuiz")
+            app.update_idletasks()
+            login_latencies.append(time.perf_counter() - before)
+
+            before = time.perf_counter()
+            app.logout()
+            app.update_idletasks()
+            logout_latencies.append(time.perf_counter() - before)
+    finally:
+        app.destroy()
+
+    # Old approach: tear down the login root and build a whole new window
+    rebuild_latencies = []
+    for i in range(max(count // 10, 1)):
+        login_window = tk.Tk()
+        login_window.withdraw()
+        login_window.update_idletasks()
+        before = time.perf_counter()
+        login_window.destroy()
+        quiz_app = create_app(results_log_path=None, checkpoint_dir=None)
+        quiz_app.withdraw()
+        quiz_app.login(student_data)
+        quiz_app.show_frame("SoftwareQuiz")
+        quiz_app.update_idletasks()
+        rebuild_latencies.append(time.perf_counter() - before)
+        quiz_app.destroy()
+
+    login_summary = latency_summary(login_latencies)
+    logout_summary = latency_summary(logout_latencies)
+    rebuild_summary = latency_summary(rebuild_latencies)
+    return {
+        "transitions": count,
+        "login_to_quiz_p50_ms": login_summary["p50_ms"],
+        "login_to_quiz_p99_ms": login_summary["p99_ms"],
+        "logout_to_login_p50_ms": logout_summary["p50_ms"],
+        "logout_to_login_p99_ms": logout_summary["p99_ms"],
+        "new_root_rebuild_p50_ms": rebuild_summary["p50_ms"],
+        "new_root_rebuild_p99_ms": rebuild_summary["p99_ms"],
+    }
+
+
+def benchmark_review(question_count=500, steps=2000):
+    """
+    Scroll through the end-of-quiz review of a long exam and measure the
+    latency of each scroll step and the number of Tcl commands (widgets)
+    the review list creates.
+    """
+    import random
+    import tkinter as tk
+    from grading import compile_answer_key
+    from quiz_data import QUIZ_DATA
+    from quiz_engine import QuizSession
+    from review import ReviewList
+
+    questions = (list(QUIZ_DATA[0]) * (question_count // len(QUIZ_DATA[0]) + 1))[:question_count]
+    session = QuizSession(questions, compile_answer_key(questions))
+    session.user_answers = random_submissions(questions, 1)[0]
+
+    root = tk.Tk()
+    root.withdraw()
+    rng = random.Random(3)
+    latencies = []
+    try:
+        commands_before = tcl_command_count(root)
+        review_list = ReviewList(root)
+        review_list.pack(fill="both", expand=True)
+        review_list.show(session)
+        root.update_idletasks()
+        for step in range(steps):
+            before = time.perf_counter()
+            if step % 10 == 0:
+                review_list.yview("moveto", rng.random())
+            else:
+                review_list.scroll_rows(rng.choice((-1, 1)))
+            root.update_idletasks()
+            latencies.append(time.perf_counter() - before)
+        commands = tcl_command_count(root) - commands_before
+        rows = len(review_list.rows)
+    finally:
+        root.destroy()
+
+    results = {"questions": question_count, "scroll_steps": steps, "row_widgets": rows,
+               "tcl_commands": commands}
+    results.update(latency_summary(latencies))
+    return results
+
+
+def benchmark_timers(session_count=10000, simulated_seconds=600, exam_seconds=1800, question_seconds=30):
+    """
+    `session_count` headless timed sessions share one TimerWheel, each with
+    an exam deadline, a per-question limit and a once-a-second countdown tick.
+    Simulated students answer after random delays (some run out of time) on
+    a long paper, so every session stays active for the whole run.
+    Time is simulated, so the run measures only the CPU spent by the wheel
+    and its callbacks; CPU per simulated second should stay flat from the
+    first minute to the last, and cancelled timers must not pile up.
+    """
+    import random
+    from grading import answer_key_for
+    from quiz_data import QUIZ_DATA
+    from quiz_engine import STEP_FINISHED, QuizSession
+    from timers import ExamClock, TimerWheel
+
+    now = [0.0]
+    wheel = TimerWheel(clock=lambda: now[0])
+    rng = random.Random(0)
+    papers = [list(questions) * 20 for questions in QUIZ_DATA]
+    answer_keys = [answer_key_for(questions) for questions in papers]
+
+    def answer(clock):
+        # A student picks a choice; the next answer comes after another delay
+        session = clock.session
+        if session.finished:
+            return
+        step = session.go_to_next_question(rng.randrange(4))
+        if step == STEP_FINISHED:
+            clock.stop()
+        else:
+            clock.question_started()
+            wheel.schedule(rng.uniform(5, 40), answer, clock)
+
+    clocks = []
+    for number in range(session_count):
+        category = number % len(papers)
+        session = QuizSession(papers[category], answer_keys[category])
+        clock = ExamClock(wheel, session, exam_seconds, question_seconds,
+                          on_change=lambda event: None, show_countdown=True)
+        clock.start()
+        clocks.append(clock)
+        wheel.schedule(rng.uniform(5, 40), answer, clock)
+
+    cpu_per_second = []
+    fired_per_second = []
+    peak_timers = 0
+    ticks_per_second = int(round(1 / wheel.tick_seconds))
+    for second in range(simulated_seconds):
+        fired = 0
+        before = time.process_time()
+        for tick in range(ticks_per_second):
+            now[0] = now[0] + wheel.tick_seconds
+            fired = fired + wheel.advance()
+        cpu_per_second.append(time.process_time() - before)
+        fired_per_second.append(fired)
+        peak_timers = max(peak_timers, len(wheel))
+
+    # Entries still held by the slots, including cancelled timers not yet dropped
+    slot_entries = sum(len(slot) for slot in wheel.slots)
+
+    # Idle wheel: as many long timers, nothing due during the measured ticks
+    idle_wheel = TimerWheel(clock=lambda: now[0])
+    for number in range(session_count):
+        idle_wheel.schedule(3600 + number % 600, answer, None)
+    idle_ticks = 600
+    before = time.process_time()
+    for tick in range(idle_ticks):
+        now[0] = now[0] + idle_wheel.tick_seconds
+        idle_wheel.advance()
+    idle_tick_ms = (time.process_time() - before) / idle_ticks * 1000
+
+    minute = min(60, simulated_seconds)
+    first_fired = sum(fired_per_second[:minute])
+    last_fired = sum(fired_per_second[-minute:])
+    return {
+        "sessions": session_count,
+        "active_sessions_at_end": sum(1 for clock in clocks if not clock.session.finished),
+        "peak_timers": peak_timers,
+        "slot_entries_at_end": slot_entries,
+        "timers_fired": sum(fired_per_second),
+        "first_minute_cpu_ms_per_s": sum(cpu_per_second[:minute]) / minute * 1000,
+        "last_minute_cpu_ms_per_s": sum(cpu_per_second[-minute:]) / minute * 1000,
+        "max_cpu_ms_per_s": max(cpu_per_second) * 1000,
+        "first_minute_us_per_timer": sum(cpu_per_second[:minute]) / first_fired * 1000000 if first_fired else 0.0,
+        "last_minute_us_per_timer": sum(cpu_per_second[-minute:]) / last_fired * 1000000 if last_fired else 0.0,
+        "idle_tick_ms": idle_tick_ms,
+    }
+
+
+def print_results(name, results):
+    """Print a benchmark result dictionary in a readable way"""
+    print("=" * 50)
+    print(name)
+    print("=" * 50)
+    for key, value in results.items():
+        if isinstance(value, float):
+            print(f"{key:>28}: {value:.4f}")
+        else:
+            print(f"{key:>28}: {value}")
+
+
+def main():
+    """Parse the command line and run the chosen benchmark"""
+    import tkinter as tk
+
+    parser = argparse.ArgumentParser(description="Quiz application benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    transitions = subparsers.add_parser("transitions",
+                                        help="question transition latency and widget counts")
+    transitions.add_argument("--count", type=int, default=100000)
+    transitions.add_argument("--mode", choices=["pooled", "rebuild", "both"], default="both")
+
+    startup = subparsers.add_parser("startup", help="application startup time, lazy vs eager pages")
+    startup.add_argument("--runs", type=int, default=20)
+
+    grading = subparsers.add_parser("grading", help="batch grading vs per-student loop")
+    grading.add_argument("--students", type=int, default=20000)
+    grading.add_argument("--repeat", type=int, default=50,
+                         help="repeat the category this many times to make a longer exam")
+
+    sessions = subparsers.add_parser("sessions",
+                                     help="simulated students from login to final score")
+    sessions.add_argument("--students", type=int, default=1000)
+    sessions.add_argument("--backend", choices=["engine", "tk"], default="engine")
+    sessions.add_argument("--repeat", type=int, default=1,
+                          help="repeat every category this many times to simulate a bigger bank")
+
+    results_log = subparsers.add_parser("results-log",
+                                        help="results log throughput when many attempts finish at once")
+    results_log.add_argument("--attempts", type=int, default=20000)
+    results_log.add_argument("--threads", type=int, default=200)
+    results_log.add_argument("--no-fsync", action="store_true")
+
+    login = subparsers.add_parser("login", help="login/logout page switch latency in the single window")
+    login.add_argument("--count", type=int, default=200)
+
+    timers = subparsers.add_parser("timers", help="CPU of one timer wheel driving many timed sessions")
+    timers.add_argument("--sessions", type=int, default=10000)
+    timers.add_argument("--seconds", type=int, default=600, help="simulated seconds")
+
+    review = subparsers.add_parser("review", help="scrolling the end-of-quiz review of a long exam")
+    review.add_argument("--questions", type=int, default=500)
+    review.add_argument("--steps", type=int, default=2000)
+
+    args = parser.parse_args()
+
+    try:
+        if args.benchmark == "transitions":
+            modes = ["pooled", "rebuild"] if args.mode == "both" else [args.mode]
+            for mode in modes:
+                results = benchmark_question_transitions(args.count, pooled=(mode == "pooled"))
+                print_results("Question transitions (" + mode + ")", results)
+        elif args.benchmark == "startup":
+            for lazy_pages in (False, True):
+                results = benchmark_startup(args.runs, lazy_pages=lazy_pages)
+                print_results("Startup (" + results["mode"] + " pages)", results)
+        elif args.benchmark == "grading":
+            results = benchmark_batch_grading(args.students, repeat=args.repeat)
+            print_results("Batch grading", results)
+        elif args.benchmark == "sessions":
+            results = benchmark_sessions(args.students, args.backend, args.repeat)
+            print_results("Student sessions (" + args.backend + ")", results)
+        elif args.benchmark == "results-log":
+            for max_batch in (1, 1000):
+                results = benchmark_results_log(args.attempts, args.threads,
+                                                fsync=not args.no_fsync, max_batch=max_batch)
+                print_results("Results log (max_batch=" + str(max_batch) + ")", results)
+        elif args.benchmark == "timers":
+            print_results("Timer wheel", benchmark_timers(args.sessions, args.seconds))
+        elif args.benchmark == "review":
+            print_results("Review list", benchmark_review(args.questions, args.steps))
+        elif args.benchmark == "login":
+            print_results("Login and logout transitions", benchmark_login_transitions(args.count))
+    except tk.TclError as error:
+        print("Could not start tkinter (is a display available?):", error)
+
+
+if __name__ == "__main__":
+    main()
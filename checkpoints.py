@@ -0,0 +1,217 @@
+# checkpoints.py - Session Checkpoint Module
+# This module saves the state of every unfinished quiz attempt after each
+# answer, so a crash or power cut does not make the student start over. On
+# the next login with the same student ID the attempt continues at the exact
+# question, with the answers given so far.
+#
+# There is one small file per student and category:
+#     length of the header (u16), JSON header, then one 10-byte record per answer
+# The header (category, number of questions, start time, a checksum of the
+# answer key and the sampled paper's seed, if any) is written when the first
+# question is answered, to a temporary file that is then moved into place.
+# Every later answer appends one fixed-size record:
+#     question index (u32), chosen choice (i16, -1 if its time ran out), seconds spent (f32)
+# A record torn by a crash is simply shorter than 10 bytes and is ignored.
+#
+# The window never waits for the disk: the Tk thread only packs 10 bytes and
+# queues them, and one writer thread does the writes (and fsyncs).
+
+import hashlib
+import json
+import os
+import queue
+import struct
+import threading
+import zlib
+
+HEADER_LENGTH = struct.Struct("<H")
+ANSWER_RECORD = struct.Struct("<Ihf")
+
+# Default checkpoint directory, next to this module
+DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".checkpoints")
+
+
+def student_prefix(student_id):
+    """Return the file name prefix for a student (their ID is not used as a file name directly)"""
+    return hashlib.sha1(student_id.encode("utf-8")).hexdigest()[:16] + "-"
+
+
+def key_checksum(answer_key):
+    """Checksum of an answer key, to notice when the questions have changed"""
+    return zlib.crc32(bytes(answer_key))
+
+
+def encode_header(category_index, session):
+    """Return the header bytes for a session's checkpoint file"""
+    paper = None
+    if hasattr(session.questions, "params"):
+        paper = session.questions.params()
+    header = json.dumps({
+        "category": category_index,
+        "total": session.total_questions,
+        "started_at": session.started_at,
+        "key_crc": key_checksum(session.answer_key),
+        "paper": paper,
+    }, separators=(",", ":")).encode("utf-8")
+    return HEADER_LENGTH.pack(len(header)) + header
+
+
+def read_checkpoint(path):
+    """
+    Return (header dict, list of (question index, choice, seconds)) from a
+    checkpoint file, or None if it is missing or unreadable. Answers stop at
+    the first torn or out-of-order record.
+    """
+    try:
+        with open(path, "rb") as checkpoint_file:
+            data = checkpoint_file.read()
+        (header_length,) = HEADER_LENGTH.unpack_from(data, 0)
+        header_end = HEADER_LENGTH.size + header_length
+        header = json.loads(data[HEADER_LENGTH.size:header_end])
+    except (OSError, struct.error, ValueError):
+        return None
+
+    answers = []
+    offset = header_end
+    while offset + ANSWER_RECORD.size <= len(data):
+        question_index, choice, seconds = ANSWER_RECORD.unpack_from(data, offset)
+        if question_index != len(answers) or choice < -1:
+            break
+        answers.append((question_index, choice, seconds))
+        offset = offset + ANSWER_RECORD.size
+    return header, answers
+
+
+class CheckpointStore:
+    """
+    Checkpoint files of unfinished attempts, written by a background thread.
+
+    Parameters:
+    - directory: where the checkpoint files are kept
+    - fsync: if True every write is fsync'ed (survives a power cut)
+    """
+
+    def __init__(self, directory=DEFAULT_CHECKPOINT_DIR, fsync=True):
+        self.directory = directory
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+
+        # Operations for the writer thread: (kind, path, data)
+        self.pending = queue.Queue()
+        self.closed = False
+        self.writer = threading.Thread(target=self.write_loop, name="checkpoint-writer", daemon=True)
+        self.writer.start()
+
+    def path_for(self, student_id, category_index):
+        """Return the checkpoint file of a student's attempt at a category"""
+        return os.path.join(self.directory, student_prefix(student_id) + str(category_index) + ".ckpt")
+
+    def save_answer(self, student_id, category_index, session, question_index):
+        """
+        Checkpoint the answer just given to `question_index` (called after
+        QuizSession.go_to_next_question). Only queues the write.
+        """
+        record = ANSWER_RECORD.pack(question_index, session.user_answers[question_index],
+                                    session.question_seconds[question_index])
+        path = self.path_for(student_id, category_index)
+        if question_index == 0:
+            # First answer of the attempt: start a new file with the header
+            self.pending.put(("replace", path, encode_header(category_index, session) + record))
+        else:
+            self.pending.put(("append", path, record))
+
+    def discard(self, student_id, category_index):
+        """Remove the checkpoint of an attempt (finished or restarted)"""
+        self.pending.put(("delete", self.path_for(student_id, category_index), None))
+
+    def write_loop(self):
+        """Writer thread: carry out queued operations in order until closed"""
+        while True:
+            item = self.pending.get()
+            try:
+                if item is None:
+                    return
+                self.apply(*item)
+            except OSError as error:
+                # A failed checkpoint must never stop the quiz
+                print("Checkpoint write failed:", error)
+            finally:
+                self.pending.task_done()
+
+    def apply(self, kind, path, data):
+        """Carry out one queued operation"""
+        if kind == "delete":
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        if kind == "replace":
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as checkpoint_file:
+                checkpoint_file.write(data)
+                checkpoint_file.flush()
+                if self.fsync:
+                    os.fsync(checkpoint_file.fileno())
+            os.replace(temp_path, path)
+            return
+        with open(path, "ab") as checkpoint_file:
+            checkpoint_file.write(data)
+            checkpoint_file.flush()
+            if self.fsync:
+                os.fsync(checkpoint_file.fileno())
+
+    def flush(self):
+        """Wait until every queued operation has been written"""
+        self.pending.join()
+
+    def unfinished(self, student_id):
+        """Return the category indexes with a checkpoint for this student, most recent first"""
+        self.flush()
+        prefix = student_prefix(student_id)
+        found = []
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith(".ckpt"):
+                path = os.path.join(self.directory, name)
+                found.append((os.path.getmtime(path), int(name[len(prefix):-len(".ckpt")])))
+        found.sort(reverse=True)
+        return [category_index for modified, category_index in found]
+
+    def restore(self, student_id, category_index, session_factory):
+        """
+        Rebuild the unfinished attempt of a student at a category.
+
+        session_factory(paper_params) must return a new session for the
+        category, on the same paper if paper_params is not None (see
+        App.rebuild_session); it may raise ValueError if it cannot.
+        Returns the restored session, or None if there is no usable
+        checkpoint (a checkpoint that no longer matches the questions is removed).
+        """
+        self.flush()
+        path = self.path_for(student_id, category_index)
+        checkpoint = read_checkpoint(path)
+        if checkpoint is None:
+            return None
+        header, answers = checkpoint
+
+        try:
+            session = session_factory(header["paper"])
+        except (KeyError, ValueError):
+            session = None
+        if (session is None or not answers or header["category"] != category_index
+                or header["total"] != session.total_questions
+                or header["key_crc"] != key_checksum(session.answer_key)
+                or len(answers) >= session.total_questions):
+            self.discard(student_id, category_index)
+            return None
+
+        session.resume([(choice, seconds) for question_index, choice, seconds in answers],
+                       header["started_at"])
+        return session
+
+    def close(self):
+        """Write everything still queued and stop the writer thread"""
+        if self.closed:
+            return
+        self.closed = True
+        self.pending.put(None)
+        self.writer.join()
+
@@ -0,0 +1,614 @@
+# collusion.py - Collusion Detection Module
+# This module looks for pairs of students whose answers are suspiciously
+# alike - above all, who picked the same wrong choices on many questions.
+#
+# Comparing every pair of students is O(n^2): 200 million pairs for a cohort
+# of 20,000. Instead it works in three steps:
+#
+#   1. Encode: each attempt in the results log (results_log.py) becomes a few
+#      big-integer bitsets over the questions of its category's pool (bit q is
+#      question q): which questions were answered, which were right, and one
+#      bitset per choice with the questions where that choice was picked
+#      wrongly. Sampled and adaptive papers are mapped back to pool questions
+#      and original choices first, like item_analysis.py does.
+#   2. Find candidates with locality-sensitive hashing: a MinHash signature of
+#      each student's set of (question, wrong choice) picks (leaving out the
+#      distractors most students fall for) is cut into bands,
+#      and only students that share a whole band are compared. Pairs with
+#      similar wrong answers share a band with high probability; unrelated
+#      pairs almost never do.
+#   3. Score the candidates exactly: AND-ing the bitsets and counting bits
+#      compares all questions at once (in C), and a binomial tail gives the
+#      chance of that many matching wrong answers happening by coincidence,
+#      given how popular each distractor is.
+#
+# Steps 2 and 3 run in a pool of worker processes, one per core by default.
+#
+# Usage:
+#     python collusion.py report --out collusion_report.csv
+#     python collusion.py benchmark --students 20000
+
+import argparse
+import csv
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from grading import answer_key_for
+from question_bank import load_quiz_data
+from results_log import DEFAULT_LOG_PATH, read_records
+from sampling import rebuild_paper
+
+# MinHash settings: SIGNATURE_SIZE hash functions, cut into BANDS bands of
+# ROWS_PER_BAND values. Pairs are compared if any band matches, which happens
+# for about 80% of pairs with a Jaccard similarity of 0.6 and almost all
+# pairs above 0.75, but for only 0.02% of pairs at 0.1.
+SIGNATURE_SIZE = 100
+BANDS = 20
+ROWS_PER_BAND = SIGNATURE_SIZE // BANDS
+HASH_SEED = 2024
+HASH_PRIME = (1 << 61) - 1
+
+# Students with fewer wrong answers than this are not compared (nothing to copy)
+MIN_WRONG = 4
+
+# Wrong picks made by at least this share of the students who got the
+# question wrong are left out of the signatures. They say little about
+# copying, and weak students share so many of them that they would make
+# most of the candidate pairs.
+LSH_MAX_CHANCE = 0.5
+
+# A band bucket holding more students than this is a pattern shared by a
+# large group (for example one very popular distractor), not a pair; it is
+# counted in the summary instead of comparing everyone in it
+MAX_BUCKET_SIZE = 500
+
+# A pair is flagged if it shares at least FLAG_MIN_MATCHING identical wrong
+# answers and that many matches by chance is less likely than FLAG_P_VALUE
+FLAG_MIN_MATCHING = 5
+FLAG_P_VALUE = 1e-6
+
+# A cohort of n students has n(n-1)/2 pairs, so even a p-value of 1e-6 will
+# turn up by coincidence in a large cohort. Each flagged pair also gets the
+# number of pairs expected to look at least this alike by chance (p-value
+# times the number of pairs); pairs below STRONG_EXPECTED are "strong".
+STRONG_EXPECTED = 0.05
+
+# Pairs with fewer matches than this many standard deviations above the
+# number expected by chance are not tested exactly (they cannot reach
+# FLAG_P_VALUE); this keeps the exact test to a handful of pairs
+SCREEN_Z = 3.0
+
+# Distractor popularities are kept between MIN_CHANCE and 1 - MIN_CHANCE,
+# and grouped into CHANCE_LEVELS levels for the screen
+MIN_CHANCE = 0.01
+CHANCE_LEVELS = 8
+
+# Candidate pairs scored per task sent to a worker
+PAIRS_PER_TASK = 20000
+
+
+class AnswerVector:
+    """One attempt encoded as bitsets over the questions of its category's pool"""
+
+    __slots__ = ("student_id", "name", "answered", "correct", "wrong", "wrong_any", "wrong_count", "tokens")
+
+    def __init__(self, student_id, name):
+        self.student_id = student_id
+        self.name = name
+        self.answered = 0  # Bit q set: question q was answered
+        self.correct = 0  # Bit q set: question q was answered correctly
+        self.wrong = []  # wrong[c] has bit q set if choice c was picked wrongly on question q
+        self.wrong_any = 0  # Bit q set: question q was answered wrongly
+        self.wrong_count = 0
+        self.tokens = []  # One number per wrong pick: question << 8 | choice
+
+    def add_answer(self, question_index, choice_index, correct_index):
+        """Add one answer (original choice index in the pool, or -1)"""
+        if choice_index < 0:
+            return
+        bit = 1 << question_index
+        self.answered |= bit
+        if choice_index == correct_index:
+            self.correct |= bit
+            return
+        while len(self.wrong) <= choice_index:
+            self.wrong.append(0)
+        self.wrong[choice_index] |= bit
+        self.wrong_any |= bit
+        self.wrong_count += 1
+        self.tokens.append(question_index << 8 | choice_index)
+
+
+def encode_attempt(record, pool, answer_key, choice_counts=None):
+    """
+    Encode one results log record as an AnswerVector.
+    choice_counts: optional dict {pool index: number of choices} used as a
+    cache, so a sampled paper's choice order does not decode its questions
+    from the bank for every attempt.
+    """
+    student = record.get("student") or {}
+    vector = AnswerVector(student.get("id", ""), student.get("name", ""))
+    paper = None
+    if record.get("paper"):
+        paper = rebuild_paper(pool, record["paper"])
+    for position, shown_choice in enumerate(record["answers"]):
+        if paper is not None:
+            question_index = paper.pool_index(position)
+            if shown_choice < 0:
+                chosen = -1
+            else:
+                choice_count = None
+                if choice_counts is not None:
+                    choice_count = choice_counts.get(question_index)
+                    if choice_count is None:
+                        choice_count = len(pool[question_index]["choices"])
+                        choice_counts[question_index] = choice_count
+                chosen = paper.choice_order(position, choice_count)[shown_choice]
+        else:
+            question_index = position
+            chosen = shown_choice
+        vector.add_answer(question_index, chosen, answer_key[question_index])
+    return vector
+
+
+def load_attempts(quiz_data, log_path=DEFAULT_LOG_PATH):
+    """Read the results log and return {category index: [AnswerVector, ...]}"""
+    answer_keys = {}
+    choice_counts = {}
+    vectors_by_category = {}
+    for offset, record in read_records(log_path):
+        category_index = record.get("category")
+        if category_index is None or category_index >= len(quiz_data) or not record.get("answers"):
+            continue
+        pool = quiz_data[category_index]
+        if category_index not in answer_keys:
+            answer_keys[category_index] = answer_key_for(pool)
+            choice_counts[category_index] = {}
+        try:
+            vector = encode_attempt(record, pool, answer_keys[category_index], choice_counts[category_index])
+        except (IndexError, ValueError):
+            # The bank has changed since the attempt: its paper no longer fits
+            continue
+        vectors_by_category.setdefault(category_index, []).append(vector)
+    return vectors_by_category
+
+
+class DistractorChances:
+    """
+    How popular each distractor of a category is: for every (question, wrong
+    choice) token, the share of the question's wrong answers that picked it.
+    That is the chance that another student who got the question wrong
+    picked the same choice, so a match on a rare distractor counts for much
+    more than a match on the one everybody falls for.
+    """
+
+    def __init__(self, vectors):
+        counts = {}
+        for vector in vectors:
+            for token in vector.tokens:
+                counts[token] = counts.get(token, 0) + 1
+        wrong_totals = {}
+        for token, count in counts.items():
+            wrong_totals[token >> 8] = wrong_totals.get(token >> 8, 0) + count
+
+        # Never 0 or 1, so the test stays defined
+        self.chances = {}
+        for token, count in counts.items():
+            chance = count / wrong_totals[token >> 8]
+            self.chances[token] = min(max(chance, MIN_CHANCE), 1 - MIN_CHANCE)
+
+    def chance(self, question_index, choice_index):
+        """Share of the wrong answers to a question that picked this choice"""
+        return self.chances.get(question_index << 8 | choice_index, MIN_CHANCE)
+
+    def student_levels(self, vector):
+        """
+        Group one student's wrong picks by how popular they are: returns
+        (chance, bitset of questions) per level, with the chance rounded down
+        to the level's lower edge. With these the expected number of matches
+        of a pair takes a few AND and bit counts instead of a loop.
+        """
+        masks = [0] * CHANCE_LEVELS
+        for token in vector.tokens:
+            level = min(int(self.chances[token] * CHANCE_LEVELS), CHANCE_LEVELS - 1)
+            masks[level] |= 1 << (token >> 8)
+        return [(max(level / CHANCE_LEVELS, MIN_CHANCE), mask) for level, mask in enumerate(masks) if mask]
+
+
+def poisson_binomial_tail(chances, k):
+    """
+    Return P(X >= k) where X is the number of successes of independent
+    events with the given chances. Works out P(fewer than n - k + 1
+    failures) instead when that is the shorter sum (suspicious pairs match
+    on nearly every question). Either way only positive terms are added, so
+    tiny tails do not vanish in rounding.
+    """
+    n = len(chances)
+    if k <= 0:
+        return 1.0
+    if k > n:
+        return 0.0
+    if n - k < k:
+        # At most n - k failures: keep P(failures == j) for j <= n - k
+        limit = n - k
+        counts = [1.0] + [0.0] * limit
+        for chance in chances:
+            for j in range(limit, 0, -1):
+                counts[j] = counts[j] * chance + counts[j - 1] * (1 - chance)
+            counts[0] = counts[0] * chance
+        return min(sum(counts), 1.0)
+
+    # Counts of k or more successes are kept in one absorbing state
+    below = [1.0] + [0.0] * (k - 1)  # P(X == j) for j < k so far
+    tail = 0.0
+    for chance in chances:
+        tail += below[k - 1] * chance
+        for j in range(k - 1, 0, -1):
+            below[j] = below[j] * (1 - chance) + below[j - 1] * chance
+        below[0] = below[0] * (1 - chance)
+    return min(tail, 1.0)
+
+
+def score_pair(first, second, chances, first_levels, second_levels):
+    """
+    Compare two AnswerVectors exactly (`chances` is the category's
+    DistractorChances, the levels come from its student_levels). Returns
+    (shared questions, both wrong, matching wrong, identical answers, p-value).
+
+    On a question both got wrong, the chance of a match is taken as the
+    average popularity of the two picks. The p-value is the chance of at
+    least that many matches on those questions. It is only worked out
+    exactly for pairs at least SCREEN_Z standard deviations above the
+    expected number of matches; for the others (nowhere near suspicious)
+    it is returned as 1.0.
+    """
+    shared = (first.answered & second.answered).bit_count()
+    both_wrong_bits = first.wrong_any & second.wrong_any
+    both_wrong = both_wrong_bits.bit_count()
+    matching_wrong = 0
+    for first_bits, second_bits in zip(first.wrong, second.wrong):
+        matching_wrong += (first_bits & second_bits).bit_count()
+    identical = matching_wrong + (first.correct & second.correct).bit_count()
+
+    p_value = 1.0
+    if matching_wrong >= FLAG_MIN_MATCHING:
+        # Expected matches from the levels (rounded down, so the screen lets
+        # through a little more than it needs to; the variance of the average
+        # of two chances is at least the average of their variances)
+        mean = 0.0
+        variance = 0.0
+        for chance, mask in first_levels + second_levels:
+            count = (both_wrong_bits & mask).bit_count()
+            mean += count * chance / 2
+            variance += count * chance * (1 - chance) / 2
+        if matching_wrong - mean >= SCREEN_Z * math.sqrt(variance):
+            first_choices = {token >> 8: token & 255 for token in first.tokens}
+            second_choices = {token >> 8: token & 255 for token in second.tokens}
+            question_chances = []
+            while both_wrong_bits:
+                lowest = both_wrong_bits & -both_wrong_bits
+                question_index = lowest.bit_length() - 1
+                question_chances.append((chances.chance(question_index, first_choices[question_index])
+                                         + chances.chance(question_index, second_choices[question_index])) / 2)
+                both_wrong_bits ^= lowest
+            p_value = poisson_binomial_tail(question_chances, matching_wrong)
+    return shared, both_wrong, matching_wrong, identical, p_value
+
+
+# ===== Hashing =====
+# The coefficients are fixed (seeded), so every worker process computes the
+# same signatures
+
+def hash_coefficients(count=SIGNATURE_SIZE, seed=HASH_SEED):
+    """Return (a, b) pairs for the hash functions (a * x + b) mod HASH_PRIME"""
+    rng = random.Random(seed)
+    return [(rng.randrange(1, HASH_PRIME), rng.randrange(HASH_PRIME)) for i in range(count)]
+
+
+HASH_COEFFICIENTS = hash_coefficients()
+
+# token -> tuple of its SIGNATURE_SIZE hash values (per process)
+TOKEN_HASHES = {}
+
+
+def token_hashes(token):
+    """Return the hash values of one token, computing them the first time"""
+    hashes = TOKEN_HASHES.get(token)
+    if hashes is None:
+        hashes = tuple((a * token + b) % HASH_PRIME for a, b in HASH_COEFFICIENTS)
+        TOKEN_HASHES[token] = hashes
+    return hashes
+
+
+def minhash_signature(tokens):
+    """MinHash signature of a set of tokens: the smallest value of each hash function"""
+    return tuple(map(min, *[token_hashes(token) for token in tokens]))
+
+
+# ===== Worker processes =====
+# Each worker gets the encoded attempts once, when it starts; tasks then only
+# name a category and a range of students or a list of pairs.
+
+WORKER_VECTORS = None
+WORKER_DISTRACTOR_CHANCES = None
+WORKER_LEVELS = {}  # category index -> student_levels of each student (filled in as needed)
+
+
+def init_worker(vectors_by_category, distractor_chances):
+    """Worker initializer: keep the encoded attempts for the tasks"""
+    global WORKER_VECTORS, WORKER_DISTRACTOR_CHANCES
+    WORKER_VECTORS = vectors_by_category
+    WORKER_DISTRACTOR_CHANCES = distractor_chances
+    WORKER_LEVELS.clear()
+
+
+def signature_task(category_index, student_indexes):
+    """
+    Return the MinHash signatures of some students of a category, made from
+    their wrong picks that are not too popular (None for a student with
+    fewer than two of those)
+    """
+    vectors = WORKER_VECTORS[category_index]
+    chances = WORKER_DISTRACTOR_CHANCES[category_index].chances
+    signatures = []
+    for student_index in student_indexes:
+        tokens = [token for token in vectors[student_index].tokens if chances[token] < LSH_MAX_CHANCE]
+        signatures.append(minhash_signature(tokens) if len(tokens) >= 2 else None)
+    return signatures
+
+
+def score_task(category_index, pairs):
+    """Score a list of candidate pairs; returns the flagged ones"""
+    vectors = WORKER_VECTORS[category_index]
+    chances = WORKER_DISTRACTOR_CHANCES[category_index]
+    levels = WORKER_LEVELS.get(category_index)
+    if levels is None:
+        levels = [None] * len(vectors)
+        WORKER_LEVELS[category_index] = levels
+    flagged = []
+    for first_index, second_index in pairs:
+        first = vectors[first_index]
+        second = vectors[second_index]
+        for student_index in (first_index, second_index):
+            if levels[student_index] is None:
+                levels[student_index] = chances.student_levels(vectors[student_index])
+        shared, both_wrong, matching_wrong, identical, p_value = score_pair(
+            first, second, chances, levels[first_index], levels[second_index])
+        if matching_wrong >= FLAG_MIN_MATCHING and p_value < FLAG_P_VALUE:
+            flagged.append({
+                "category": category_index,
+                "student_a": first.student_id,
+                "name_a": first.name,
+                "student_b": second.student_id,
+                "name_b": second.name,
+                "shared_questions": shared,
+                "both_wrong": both_wrong,
+                "matching_wrong": matching_wrong,
+                "identical_answers": identical,
+                "p_value": p_value,
+            })
+    return flagged
+
+
+def candidate_pairs(vectors, signatures, summary):
+    """Band the signatures and return the set of (i, j) pairs that share a band"""
+    pairs = set()
+    for band in range(BANDS):
+        start = band * ROWS_PER_BAND
+        buckets = {}
+        for student_index, signature in signatures:
+            buckets.setdefault(signature[start:start + ROWS_PER_BAND], []).append(student_index)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            if len(members) > MAX_BUCKET_SIZE:
+                summary["large_buckets"] += 1
+                continue
+            for position, first_index in enumerate(members):
+                first_id = vectors[first_index].student_id
+                for second_index in members[position + 1:]:
+                    # Two attempts by the same student are not collusion
+                    if vectors[second_index].student_id != first_id:
+                        pairs.add((first_index, second_index))
+    return pairs
+
+
+class SerialExecutor:
+    """Runs tasks in this process (workers=1), with the same map() as a process pool"""
+
+    def __init__(self, vectors_by_category, distractor_chances):
+        init_worker(vectors_by_category, distractor_chances)
+
+    def map(self, function, *iterables):
+        return map(function, *iterables)
+
+    def shutdown(self):
+        pass
+
+
+def find_collusion(vectors_by_category, workers=None):
+    """
+    Look for suspicious pairs in every category.
+    Returns (flagged pairs sorted by p-value, summary dict).
+    workers: number of processes (default: one per core; 1 runs everything here)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    distractor_chances = {category_index: DistractorChances(vectors)
+                     for category_index, vectors in vectors_by_category.items()}
+    summary = {"attempts": 0, "compared_attempts": 0, "candidate_pairs": 0, "large_buckets": 0,
+               "flagged_pairs": 0, "strong_pairs": 0}
+
+    if workers > 1:
+        executor = ProcessPoolExecutor(workers, initializer=init_worker,
+                                       initargs=(vectors_by_category, distractor_chances))
+    else:
+        executor = SerialExecutor(vectors_by_category, distractor_chances)
+
+    flagged = []
+    try:
+        for category_index, vectors in vectors_by_category.items():
+            summary["attempts"] += len(vectors)
+
+            # Signatures, computed in chunks by the workers
+            compared = [i for i, vector in enumerate(vectors) if vector.wrong_count >= MIN_WRONG]
+            summary["compared_attempts"] += len(compared)
+            chunk = max(len(compared) // (workers * 4), 1)
+            tasks = [compared[start:start + chunk] for start in range(0, len(compared), chunk)]
+            signatures = []
+            for student_indexes, chunk_signatures in zip(
+                    tasks, executor.map(signature_task, [category_index] * len(tasks), tasks)):
+                for student_index, signature in zip(student_indexes, chunk_signatures):
+                    if signature is not None:
+                        signatures.append((student_index, signature))
+
+            # Candidates from the bands, scored exactly by the workers
+            pairs = list(candidate_pairs(vectors, signatures, summary))
+            summary["candidate_pairs"] += len(pairs)
+            tasks = [pairs[start:start + PAIRS_PER_TASK] for start in range(0, len(pairs), PAIRS_PER_TASK)]
+            all_pairs = len(vectors) * (len(vectors) - 1) // 2
+            for chunk_flagged in executor.map(score_task, [category_index] * len(tasks), tasks):
+                for row in chunk_flagged:
+                    row["expected_by_chance"] = row["p_value"] * all_pairs
+                    if row["expected_by_chance"] < STRONG_EXPECTED:
+                        summary["strong_pairs"] += 1
+                flagged.extend(chunk_flagged)
+    finally:
+        executor.shutdown()
+
+    flagged.sort(key=lambda row: (row["p_value"], -row["matching_wrong"]))
+    summary["flagged_pairs"] = len(flagged)
+    return flagged, summary
+
+
+def write_report(rows, path):
+    """Write the flagged pairs as CSV"""
+    fields = ["category", "student_a", "name_a", "student_b", "name_b", "shared_questions",
+              "both_wrong", "matching_wrong", "identical_answers", "p_value", "expected_by_chance"]
+    with open(path, "w", newline="", encoding="utf-8") as report_file:
+        writer = csv.DictWriter(report_file, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            row = dict(row)
+            row["p_value"] = format(row["p_value"], ".3g")
+            row["expected_by_chance"] = format(row["expected_by_chance"], ".3g")
+            writer.writerow(row)
+
+
+def synthetic_cohort(student_count, question_count=60, choice_count=4, copier_pairs=50, seed=11):
+    """
+    Make encoded attempts for a simulated cohort: students of varying ability
+    answer questions of varying difficulty, with some distractors much more
+    popular than others. `copier_pairs` students copy about 90% of another
+    student's answers. Returns (vectors, set of planted (i, j) pairs).
+    """
+    rng = random.Random(seed)
+    difficulties = [rng.gauss(0, 1) for i in range(question_count)]
+    distractor_weights = [[rng.random() ** 2 for c in range(choice_count - 1)] for i in range(question_count)]
+    answer_key = [rng.randrange(choice_count) for i in range(question_count)]
+
+    answer_lists = []
+    for student in range(student_count):
+        ability = rng.gauss(0, 1)
+        answers = []
+        for question_index in range(question_count):
+            if rng.random() < 1 / (1 + math.exp(difficulties[question_index] - ability)):
+                answers.append(answer_key[question_index])
+            else:
+                wrong = [c for c in range(choice_count) if c != answer_key[question_index]]
+                answers.append(rng.choices(wrong, distractor_weights[question_index])[0])
+        answer_lists.append(answers)
+
+    planted = set()
+    for pair in range(copier_pairs):
+        source, copier = rng.sample(range(student_count), 2)
+        answer_lists[copier] = [answer if rng.random() < 0.9 else answer_lists[copier][q]
+                                for q, answer in enumerate(answer_lists[source])]
+        planted.add((min(source, copier), max(source, copier)))
+
+    vectors = []
+    for student, answers in enumerate(answer_lists):
+        vector = AnswerVector(str(student), "Student " + str(student))
+        for question_index, choice_index in enumerate(answers):
+            vector.add_answer(question_index, choice_index, answer_key[question_index])
+        vectors.append(vector)
+    return vectors, planted
+
+
+def benchmark_collusion(student_count=20000, question_count=60, workers=None):
+    """Time the analysis of a simulated cohort and check that the planted pairs are found"""
+    import time
+
+    vectors, planted = synthetic_cohort(student_count, question_count)
+    before = time.perf_counter()
+    flagged, summary = find_collusion({0: vectors}, workers)
+    seconds = time.perf_counter() - before
+
+    def pairs_of(rows):
+        pairs = {(int(row["student_a"]), int(row["student_b"])) for row in rows}
+        return {(min(pair), max(pair)) for pair in pairs}
+    found = pairs_of(flagged)
+    strong = pairs_of([row for row in flagged if row["expected_by_chance"] < STRONG_EXPECTED])
+
+    # What comparing every pair would cost, from the time of one exact comparison
+    chances = DistractorChances(vectors)
+    sample = [(random.randrange(student_count), random.randrange(student_count)) for i in range(20000)]
+    levels = [chances.student_levels(vector) for vector in vectors]
+    sample_before = time.perf_counter()
+    for first_index, second_index in sample:
+        score_pair(vectors[first_index], vectors[second_index], chances, levels[first_index], levels[second_index])
+    per_pair = (time.perf_counter() - sample_before) / len(sample)
+
+    results = dict(summary)
+    results.update({
+        "workers": workers or os.cpu_count(),
+        "seconds": seconds,
+        "planted_pairs": len(planted),
+        "planted_found": len(found & planted),
+        "other_flagged": len(found - planted),
+        "planted_strong": len(strong & planted),
+        "other_strong": len(strong - planted),
+        "all_pairs": student_count * (student_count - 1) // 2,
+        "all_pairs_estimated_seconds": per_pair * student_count * (student_count - 1) / 2,
+    })
+    return results
+
+
+def main():
+    """Write a collusion report from the results log, or run the benchmark"""
+    parser = argparse.ArgumentParser(description="Find suspiciously similar answer patterns")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    report = subparsers.add_parser("report", help="analyse the results log and write a CSV of flagged pairs")
+    report.add_argument("--bank", default=None, help="question bank file")
+    report.add_argument("--log", default=DEFAULT_LOG_PATH)
+    report.add_argument("--out", default="collusion_report.csv")
+
+    benchmark = subparsers.add_parser("benchmark", help="analyse a simulated cohort with planted copiers")
+    benchmark.add_argument("--students", type=int, default=20000)
+    benchmark.add_argument("--questions", type=int, default=60)
+
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        from benchmark import print_results
+        print_results("Collusion detection", benchmark_collusion(args.students, args.questions, args.workers))
+        return
+
+    vectors_by_category = load_attempts(load_quiz_data(args.bank), args.log)
+    flagged, summary = find_collusion(vectors_by_category, args.workers)
+    write_report(flagged, args.out)
+    print("Compared", summary["compared_attempts"], "of", summary["attempts"], "attempts;",
+          summary["candidate_pairs"], "candidate pairs,", len(flagged), "flagged,",
+          summary["strong_pairs"], "strong. Wrote", args.out)
+    for row in flagged[:10]:
+        print("  category", row["category"], "-", row["student_a"], "and", row["student_b"] + ":",
+              row["matching_wrong"], "of", row["both_wrong"], "wrong answers match (p = "
+              + format(row["p_value"], ".2g") + ")")
+
+
+if __name__ == "__main__":
+    main()
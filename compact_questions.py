@@ -0,0 +1,323 @@
+# compact_questions.py - Compact Question Model Module
+# This module contains two memory-friendly ways to hold large question banks
+# (for example 500k questions in practice mode):
+#
+#   - Question: a small __slots__ class with the question text, a tuple of
+#     choices and the index of the correct choice (no duplicate answer string
+#     and no per-question dict)
+#   - ColumnarBank: the whole bank in a few flat arrays. Every distinct string
+#     is stored once in one string table (a single str plus an array of
+#     offsets), and questions are rows of integers pointing into it.
+#
+# Both can be used where the app expects question dicts: question["question"],
+# question["choices"] and question["answer"] work, and each category has an
+# answer_key() for grading.
+#
+# The app picks one with App(question_model="columnar") or
+# python main.py --question-model columnar.
+#
+# Usage:
+#     python compact_questions.py benchmark --questions 500000
+
+import argparse
+from array import array
+
+from grading import answer_index
+
+# Ways the app can hold its questions (see compact_quiz_data)
+QUESTION_MODELS = ("dicts", "slots", "columnar")
+
+
+class Question:
+    """
+    One question with __slots__ instead of a dict.
+    `choices` is a tuple of strings and `answer_index` the position of the
+    correct choice in it.
+    """
+
+    __slots__ = ("question", "choices", "answer_index")
+
+    def __init__(self, question, choices, answer_index):
+        self.question = question
+        self.choices = choices
+        self.answer_index = answer_index
+
+    @classmethod
+    def from_dict(cls, question):
+        """Make a Question from a question dict (checks the answer is a choice)"""
+        return cls(question["question"], tuple(question["choices"]), answer_index(question))
+
+    @property
+    def answer(self):
+        """The text of the correct choice"""
+        return self.choices[self.answer_index]
+
+    def __getitem__(self, key):
+        """Allow question["question"], question["choices"], question["answer"] like a dict"""
+        if key == "question":
+            return self.question
+        if key == "choices":
+            return self.choices
+        if key == "answer":
+            return self.choices[self.answer_index]
+        raise KeyError(key)
+
+    def to_dict(self):
+        """Return the question as a plain dict"""
+        return {"question": self.question, "choices": list(self.choices), "answer": self.answer}
+
+
+class QuestionList(list):
+    """A category of Question objects with a precomputed answer key"""
+
+    def answer_key(self):
+        """Return the answer key (correct choice index per question) as bytes"""
+        return bytes(question.answer_index for question in self)
+
+
+def slotted_quiz_data(quiz_data):
+    """Convert categories of question dicts into categories of Question objects"""
+    return [QuestionList(Question.from_dict(question) for question in questions)
+            for questions in quiz_data]
+
+
+class StringTable:
+    """
+    Many strings stored as one str plus an array of offsets.
+    Identical strings are only stored once while the table is being built.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.offsets = array("I", [0])
+        self.ids = {}
+        self.text = None
+
+    def add(self, text):
+        """Add a string (if new) and return its id"""
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = len(self.offsets) - 1
+            self.ids[text] = string_id
+            self.parts.append(text)
+            self.offsets.append(self.offsets[-1] + len(text))
+        return string_id
+
+    def freeze(self):
+        """Join the strings into one str and drop the build-time lookups"""
+        self.text = "".join(self.parts)
+        self.parts = None
+        self.ids = None
+
+    def get(self, string_id):
+        """Return the string with the given id"""
+        return self.text[self.offsets[string_id]:self.offsets[string_id + 1]]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+class ColumnarCategory:
+    """
+    One category of a ColumnarBank. Behaves like a read-only list of
+    questions; each Question is built from the arrays when it is accessed.
+    """
+
+    def __init__(self, bank, first, count):
+        self.bank = bank
+        self.first = first
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index = index + self.count
+        if index < 0 or index >= self.count:
+            raise IndexError("question index out of range")
+        return self.bank.question(self.first + index)
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.bank.question(self.first + index)
+
+    def answer_key(self):
+        """Return the answer key (correct choice index per question) as bytes"""
+        return bytes(self.bank.answer_indexes[self.first:self.first + self.count])
+
+
+class ColumnarBank:
+    """
+    A whole question bank in flat arrays:
+
+    - strings: StringTable with every distinct question and choice text
+    - question_text: string id of each question's text
+    - choice_starts: for question q, its choices are choice_ids[choice_starts[q]:choice_starts[q + 1]]
+    - choice_ids: string ids of all choices, question after question
+    - answer_indexes: index of the correct choice of each question (bytes)
+    - category_starts: category c holds questions category_starts[c] to category_starts[c + 1] - 1
+    """
+
+    def __init__(self):
+        self.strings = StringTable()
+        self.question_text = array("I")
+        self.choice_starts = array("I", [0])
+        self.choice_ids = array("I")
+        self.answer_indexes = bytearray()
+        self.category_starts = array("I", [0])
+
+    @classmethod
+    def from_quiz_data(cls, quiz_data):
+        """Build a bank from categories of question dicts (or Question objects)"""
+        bank = cls()
+        for questions in quiz_data:
+            for question in questions:
+                bank.add_question(question)
+            bank.end_category()
+        bank.strings.freeze()
+        return bank
+
+    def add_question(self, question):
+        """Append one question to the category being built"""
+        self.answer_indexes.append(answer_index(question))
+        self.question_text.append(self.strings.add(question["question"]))
+        for choice in question["choices"]:
+            self.choice_ids.append(self.strings.add(choice))
+        self.choice_starts.append(len(self.choice_ids))
+
+    def end_category(self):
+        """Close the category being built"""
+        self.category_starts.append(len(self.question_text))
+
+    def question(self, question_index):
+        """Build the Question object for a question number (across all categories)"""
+        start = self.choice_starts[question_index]
+        end = self.choice_starts[question_index + 1]
+        choices = tuple(self.strings.get(string_id) for string_id in self.choice_ids[start:end])
+        return Question(self.strings.get(self.question_text[question_index]), choices,
+                        self.answer_indexes[question_index])
+
+    def __len__(self):
+        return len(self.category_starts) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index = index + len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("category index out of range")
+        first = self.category_starts[index]
+        return ColumnarCategory(self, first, self.category_starts[index + 1] - first)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+def compact_quiz_data(quiz_data, question_model="dicts"):
+    """
+    Return the quiz data in the chosen question model:
+
+    - "dicts": unchanged (bank file categories decode questions as dicts)
+    - "slots": every category becomes a QuestionList of Question objects
+    - "columnar": the whole bank becomes one ColumnarBank
+
+    The compact models read every question once, so they suit practice mode
+    with large banks, where questions are looked at again and again.
+    """
+    if question_model == "dicts":
+        return quiz_data
+    if question_model == "slots":
+        return slotted_quiz_data(quiz_data)
+    if question_model == "columnar":
+        return ColumnarBank.from_quiz_data(quiz_data)
+    raise ValueError("unknown question model " + repr(question_model) + " (expected one of "
+                     + ", ".join(QUESTION_MODELS) + ")")
+
+
+def update_compact_quiz_data(compact_data, new_bank, changed, question_model="dicts"):
+    """
+    Return compact_data (made by compact_quiz_data) brought up to date with a
+    reloaded bank. Only the categories listed in `changed` are converted;
+    every other category is reused as it is, so the cost follows the size of
+    the change, not of the bank. For the columnar model the changed
+    categories go into a small ColumnarBank of their own, and the result is
+    a list of categories from either bank.
+    """
+    if question_model == "dicts":
+        return new_bank
+    changed = [index for index in sorted(changed) if index < len(new_bank)]
+    converted = compact_quiz_data([new_bank[index] for index in changed], question_model)
+    by_index = dict(zip(changed, converted))
+    return [by_index[index] if index in by_index else compact_data[index] for index in range(len(new_bank))]
+
+
+def synthetic_quiz_data(question_count, category_count=3):
+    """
+    Make a large bank from the built-in questions. Every copy gets its own
+    question text (like a real bank) while choice texts repeat, as common
+    choices such as "All of the above" do.
+    """
+    from quiz_data import QUIZ_DATA
+
+    templates = [question for questions in QUIZ_DATA for question in questions]
+    quiz_data = [[] for i in range(category_count)]
+    for number in range(question_count):
+        template = templates[number % len(templates)]
+        quiz_data[number % category_count].append({
+            "question": template["question"] + " (#" + str(number) + ")",
+            "choices": [(choice + ".")[:-1] for choice in template["choices"]],
+            "answer": (template["answer"] + ".")[:-1],
+        })
+    return quiz_data
+
+
+def benchmark_memory(question_count=500000):
+    """
+    Compare the memory used by the same bank as dicts of lists, as
+    Question objects and as a ColumnarBank (measured with tracemalloc).
+    """
+    import gc
+    import time
+    import tracemalloc
+    from grading import answer_key_for
+
+    results = {"questions": question_count}
+    for layout in QUESTION_MODELS:
+        gc.collect()
+        tracemalloc.start()
+        before = time.perf_counter()
+        quiz_data = synthetic_quiz_data(question_count)
+        quiz_data = compact_quiz_data(quiz_data, layout)
+        build_seconds = time.perf_counter() - before
+        gc.collect()
+        current_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        # Grading needs only the answer key, whatever the layout
+        answer_keys = [answer_key_for(questions) for questions in quiz_data]
+
+        results[layout + "_mb"] = current_bytes / (1024 * 1024)
+        results[layout + "_bytes_per_question"] = current_bytes / question_count
+        results[layout + "_build_seconds"] = build_seconds
+        results[layout + "_key_length"] = sum(len(answer_key) for answer_key in answer_keys)
+        del quiz_data
+    return results
+
+
+def main():
+    """Run the memory benchmark"""
+    parser = argparse.ArgumentParser(description="Compact question model tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    benchmark = subparsers.add_parser("benchmark", help="memory of dicts vs slots vs columnar")
+    benchmark.add_argument("--questions", type=int, default=500000)
+    args = parser.parse_args()
+
+    from benchmark import print_results
+    print_results("Question memory layouts", benchmark_memory(args.questions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# grading.py - Batch Grading Module
+# This module grades many answer sheets for one category at once.
+#
+# Each category's answer key is compiled into a bytes object holding the
+# index of the correct choice for every question. Submissions are packed into
+# one bytes matrix (one row per student, one byte per question), and grading
+# works on whole columns at a time:
+#   - matrix[q::question_count] pulls out question q for every student
+#   - bytes.translate turns that column into 1 (correct) / 0 (wrong) bytes
+#   - the 0/1 columns are added up as big integers, so every byte acts as a
+#     separate counter for one student (no per-student Python loop)
+# All of these run in C, so grading tens of thousands of sheets takes a few
+# milliseconds per question instead of a Python loop over every answer.
+
+# Byte used for "no answer" in packed matrices
+UNANSWERED_BYTE = 255
+
+# Per-byte counters overflow after 255, so totals are flushed this often
+COLUMNS_PER_FLUSH = 255
+
+
+class AnswerKeyError(ValueError):
+    """Raised when a question's answer cannot be turned into a choice index"""
+
+
+def answer_index(question):
+    """
+    Return the index of the correct choice of one question.
+    Raises AnswerKeyError if the answer is not exactly one of the choices.
+    """
+    choices = question["choices"]
+    if len(choices) >= UNANSWERED_BYTE:
+        raise AnswerKeyError("question has too many choices (" + str(len(choices)) + "): "
+                             + repr(question["question"]))
+    matches = choices.count(question["answer"])
+    if matches == 0:
+        raise AnswerKeyError("answer " + repr(question["answer"]) + " is not one of the choices of "
+                             + repr(question["question"]))
+    if matches > 1:
+        raise AnswerKeyError("answer " + repr(question["answer"]) + " appears more than once in "
+                             + repr(question["question"]))
+    return choices.index(question["answer"])
+
+
+def compile_answer_key(questions):
+    """
+    Return a bytes object with the index of the correct choice for each question.
+    Every question is checked; if any answer does not match exactly one of its
+    choices, an AnswerKeyError listing all problems is raised.
+    """
+    key = bytearray()
+    problems = []
+    question_index = 0
+    for question in questions:
+        try:
+            key.append(answer_index(question))
+        except AnswerKeyError as error:
+            problems.append("question " + str(question_index) + ": " + str(error))
+        question_index = question_index + 1
+
+    if problems:
+        raise AnswerKeyError("invalid answer key:\n  " + "\n  ".join(problems))
+    return bytes(key)
+
+
+def answer_key_for(questions):
+    """
+    Return the answer key of a category.
+    Question bank categories already store a compiled key, so it is read
+    directly; plain lists of question dicts are compiled (and validated).
+    """
+    if hasattr(questions, "answer_key"):
+        return questions.answer_key()
+    return compile_answer_key(questions)
+
+
+def pack_submissions(submissions, question_count):
+    """
+    Pack a list of answer lists (like QuizSession.user_answers) into one bytes
+    matrix with a row of `question_count` bytes per student.
+    Unanswered questions (-1) are stored as UNANSWERED_BYTE.
+    """
+    rows = []
+    for answers in submissions:
+        if len(answers) != question_count:
+            raise ValueError("expected " + str(question_count) + " answers, got " + str(len(answers)))
+        # "No answer" is -1, and -1 & 255 == UNANSWERED_BYTE
+        rows.append(bytes(map(UNANSWERED_BYTE.__and__, answers)))
+    return b"".join(rows)
+
+
+def correctness_table(correct_choice):
+    """Return a bytes.translate table mapping correct_choice to 1 and everything else to 0"""
+    table = bytearray(256)
+    table[correct_choice] = 1
+    return bytes(table)
+
+
+# One translate table per possible correct choice, built once
+CORRECTNESS_TABLES = [correctness_table(choice) for choice in range(UNANSWERED_BYTE)]
+
+
+class BatchGrades:
+    """
+    Result of grading a batch of submissions.
+
+    - totals: list with the number of correct answers for each student
+    - correct_by_question: one bytes column per question, with 1 for every
+      student that answered it correctly and 0 otherwise
+    - correct_counts: how many students got each question right
+    """
+
+    def __init__(self, totals, correct_by_question):
+        self.totals = totals
+        self.correct_by_question = correct_by_question
+        self.correct_counts = [column.count(1) for column in correct_by_question]
+
+    def student_correctness(self, student_index):
+        """Return a list of True/False (one per question) for one student"""
+        return [column[student_index] == 1 for column in self.correct_by_question]
+
+
+def grade_batch(answer_key, matrix):
+    """
+    Grade a packed submission matrix (see pack_submissions) against an answer
+    key (see compile_answer_key). Returns a BatchGrades.
+    """
+    question_count = len(answer_key)
+    if question_count == 0:
+        return BatchGrades([], [])
+    if len(matrix) % question_count != 0:
+        raise ValueError("matrix size is not a multiple of the number of questions")
+    student_count = len(matrix) // question_count
+
+    totals = [0] * student_count
+    correct_by_question = []
+
+    # Each byte of `lanes` counts correct answers for one student
+    lanes = 0
+    columns_in_lanes = 0
+    for question_index in range(question_count):
+        column = matrix[question_index::question_count]
+        correct = column.translate(CORRECTNESS_TABLES[answer_key[question_index]])
+        correct_by_question.append(correct)
+
+        lanes = lanes + int.from_bytes(correct, "little")
+        columns_in_lanes = columns_in_lanes + 1
+        if columns_in_lanes == COLUMNS_PER_FLUSH:
+            totals = add_lanes(totals, lanes, student_count)
+            lanes = 0
+            columns_in_lanes = 0
+
+    totals = add_lanes(totals, lanes, student_count)
+    return BatchGrades(totals, correct_by_question)
+
+
+def add_lanes(totals, lanes, student_count):
+    """Add the per-byte counters packed in `lanes` to the totals list"""
+    if lanes == 0:
+        return totals
+    return list(map(int.__add__, totals, lanes.to_bytes(student_count, "little")))
+
+
+def grade_submissions(questions, submissions):
+    """Convenience wrapper: get the key, pack the answers and grade them"""
+    answer_key = answer_key_for(questions)
+    return grade_batch(answer_key, pack_submissions(submissions, len(answer_key)))
@@ -0,0 +1,747 @@
+# importers.py - Question Importers Module
+# This module turns question exports from other systems into a question bank
+# file (question_bank.py) that the app can load. It reads three formats:
+#
+#   - Moodle XML (.xml): multichoice (one correct answer) and truefalse
+#     questions; <question type="category"> entries set the category
+#   - GIFT (.gift, .txt): multiple choice ({=right ~wrong}) and true/false
+#     ({T} / {F}) questions; "$CATEGORY: name" lines set the category
+#   - JSONL (.jsonl, .ndjson): one JSON object per line with "question",
+#     "choices", "answer" (the answer text or its index) and "category"
+#
+# Other question types (essay, matching, numerical, ...) are skipped and counted.
+#
+# Exports can be hundreds of MB, so files are never loaded whole. Every file
+# is cut into chunks of a few MB that are parsed in parallel by a pool of
+# worker processes, one per core by default. A chunk starts at the first
+# question that begins inside it (the next line for JSONL, the next blank
+# line for GIFT, the next <question> tag for Moodle XML) and is parsed as a
+# stream: Moodle XML goes through an incremental XML parser that throws each
+# question away once it is read. Workers check every question's answer and
+# write the encoded records, grouped by category, to a temporary spill file
+# next to the output. When every chunk is done, the main process copies the
+# records category by category into a BankWriter. A worker holds at most one
+# chunk's records and the main process a few bytes per question, whatever
+# the size of the files.
+#
+# A question belongs to the category set most recently before it in the file
+# ("Default" if none was set). Categories are numbered in the order they are
+# first seen; --categories puts the named ones first, so they become the
+# categories of the app's quiz pages (see quiz_data.QUIZ_PAGES).
+#
+# Usage:
+#     python importers.py import moodle_export.xml more.gift --out questions.qbk
+#     python importers.py import export.xml --categories "Software,Logic,Algorithms"
+#     python importers.py benchmark --questions 1000000 --format moodle
+
+import argparse
+import html
+import itertools
+import json
+import mmap
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+from grading import AnswerKeyError, answer_index
+from question_bank import DEFAULT_BANK_PATH, BankWriter, QuestionBank
+
+# File extension -> format
+FORMATS = {".xml": "moodle", ".gift": "gift", ".txt": "gift", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+# Bytes of input per worker task, and bytes passed to the XML parser at once
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+READ_BLOCK = 1024 * 1024
+
+# How far past a Moodle chunk boundary to look for the end of a CDATA section
+# (no single CDATA section in question text is expected to be longer), and
+# how far from the end of a Moodle file to look for </quiz>
+CDATA_SYNC_WINDOW = 1024 * 1024
+QUIZ_END_SEARCH = 64 * 1024
+
+# Category of questions that come before any category is set
+DEFAULT_CATEGORY = "Default"
+
+# Problem messages kept per chunk (the rest are only counted)
+MAX_PROBLEMS = 10
+
+# What the parsers yield: (CATEGORY, name), (QUESTION, dict), (SKIPPED, question
+# type) for questions of a type the app cannot show, or (PROBLEM, message) for
+# broken entries
+CATEGORY = "category"
+QUESTION = "question"
+SKIPPED = "skipped"
+PROBLEM = "problem"
+
+UTF8_BOM = b"\xef\xbb\xbf"
+
+MOODLE_QUESTION_TAG = b'<question type="'
+MOODLE_QUIZ_END = b"</quiz>"
+CDATA_START = b"<![CDATA["
+CDATA_END = b"]]>"
+COMMENT_START = b"<!--"
+COMMENT_END = b"-->"
+
+BLOCK_TAG_PATTERN = re.compile(r"<\s*/?\s*(?:p|br|div|li|tr|h\d)\b[^>]*>", re.IGNORECASE)
+TAG_PATTERN = re.compile(r"<[^>]*>")
+GIFT_ESCAPE_PATTERN = re.compile(r"\\(.)")
+GIFT_ANSWER_PATTERN = re.compile(r"\\(.)|([=~#])|([^\\=~#]+)", re.DOTALL)
+GIFT_FORMAT_PATTERN = re.compile(r"^\[(html|moodle|plain|markdown)\]", re.IGNORECASE)
+
+
+class QuestionImportError(ValueError):
+    """Raised when a file cannot be imported (unknown format or broken file)"""
+
+
+def detect_format(path):
+    """Return the format of a file from its extension"""
+    file_format = FORMATS.get(os.path.splitext(path)[1].lower())
+    if file_format is None:
+        raise QuestionImportError("unknown question file type: " + path
+                                  + " (expected " + ", ".join(sorted(FORMATS)) + ")")
+    return file_format
+
+
+def category_name(path):
+    """Turn a Moodle/GIFT category path ("$course$/top/Software") into a name ("Software")"""
+    parts = [part.strip() for part in path.split("/") if part.strip()]
+    if parts and parts[0].startswith("$") and parts[0].endswith("$"):
+        parts = parts[1:]
+    if parts and parts[0].lower() == "top":
+        parts = parts[1:]
+    return "/".join(parts) or DEFAULT_CATEGORY
+
+
+def html_to_text(text, is_html=True):
+    """Turn a bit of HTML (as used in Moodle question text) into plain text on one line"""
+    if is_html and ("<" in text or "&" in text):
+        text = html.unescape(TAG_PATTERN.sub("", BLOCK_TAG_PATTERN.sub(" ", text)))
+    return " ".join(text.split())
+
+
+# ===== READING CHUNKS =====
+
+def lines_from(source, start):
+    """
+    Yield (position, line) for every line that starts at or after `start`
+    (a line cut by `start` belongs to the chunk before).
+    """
+    position = start
+    if start > 0:
+        source.seek(start - 1)
+        position = start - 1 + len(source.readline())
+    else:
+        source.seek(0)
+    for line in source:
+        if position == 0 and line.startswith(UTF8_BOM):
+            line = line[len(UTF8_BOM):]
+        yield position, line
+        position = position + len(line)
+
+
+# ===== JSONL =====
+
+def parse_jsonl(path, start, end):
+    """Yield the questions on the lines that start in [start, end)"""
+    last_category = None
+    with open(path, "rb") as source:
+        for position, line in lines_from(source, start):
+            if position >= end:
+                break
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                category = str(item.get("category") or DEFAULT_CATEGORY)
+                question = {"question": item["question"], "choices": item["choices"], "answer": item["answer"]}
+            except (ValueError, KeyError, TypeError, AttributeError):
+                yield PROBLEM, path + ": line at byte " + str(position) + " is not a question object"
+                continue
+            choices = question["choices"]
+            if not isinstance(question["question"], str) or not isinstance(choices, list) \
+                    or not all(isinstance(choice, str) for choice in choices):
+                yield PROBLEM, path + ": line at byte " + str(position) + " is not a question object"
+                continue
+            # The answer may be given as the index of the correct choice
+            answer = question["answer"]
+            if isinstance(answer, int) and not isinstance(answer, bool) and 0 <= answer < len(choices):
+                question["answer"] = choices[answer]
+            if category != last_category:
+                yield CATEGORY, category
+                last_category = category
+            yield QUESTION, question
+
+
+# ===== GIFT =====
+
+def gift_blocks(path, start, end):
+    """
+    Yield the questions (lists of non-comment lines) of a GIFT file that
+    belong to the chunk [start, end). Questions are separated by blank lines,
+    and a question belongs to the chunk its preceding blank line is in, so
+    the last question of a chunk is read past `end`.
+    """
+    block = []
+    owned = start == 0
+    with open(path, "rb") as source:
+        for position, line in lines_from(source, start):
+            text = line.decode("utf-8", "replace").strip()
+            if not text:
+                if block and owned:
+                    yield block
+                block = []
+                if position >= end:
+                    return
+                owned = True
+            elif owned and not text.startswith("//"):
+                block.append(text)
+    if block and owned:
+        yield block
+
+
+def gift_unescape(text):
+    """Remove GIFT escapes (\\~ \\= \\# \\{ \\} \\: \\\\) and turn \\n into a new line"""
+    return GIFT_ESCAPE_PATTERN.sub(lambda match: "\n" if match.group(1) == "n" else match.group(1), text)
+
+
+def find_unescaped(text, char, start=0):
+    """Return the position of the first `char` in text that is not escaped with a backslash, or -1"""
+    index = text.find(char, start)
+    while index >= 0:
+        # An odd number of backslashes before it means the char is escaped
+        backslashes = 0
+        while index - backslashes > start and text[index - backslashes - 1] == "\\":
+            backslashes = backslashes + 1
+        if backslashes % 2 == 0:
+            return index
+        index = text.find(char, index + 1)
+    return -1
+
+
+def gift_answers(body):
+    """
+    Split the inside of a GIFT answer block ("=right ~wrong#feedback ~%50%half")
+    into a list of [marker, text, weight] with marker "=" or "~".
+    """
+    answers = []
+    current = None
+    in_feedback = False
+    for match in GIFT_ANSWER_PATTERN.finditer(body):
+        escaped, marker, text = match.groups()
+        if marker == "#":
+            in_feedback = True
+        elif marker is not None:
+            current = [marker, [], None]
+            answers.append(current)
+            in_feedback = False
+        elif current is not None and not in_feedback:
+            if escaped is not None:
+                text = "\n" if escaped == "n" else escaped
+            current[1].append(text)
+
+    for answer in answers:
+        text = "".join(answer[1]).strip()
+        # "~%50%text" gives the answer a weight
+        if text.startswith("%"):
+            weight_end = text.find("%", 1)
+            if weight_end > 0:
+                try:
+                    answer[2] = float(text[1:weight_end])
+                except ValueError:
+                    pass
+                text = text[weight_end + 1:].strip()
+        answer[1] = text
+    return answers
+
+
+def gift_question(text):
+    """Turn the text of one GIFT question into (QUESTION, dict) or (SKIPPED, reason)"""
+    # "::title::" and "[html]" at the start are not part of the question
+    if text.startswith("::"):
+        title_end = text.find("::", 2)
+        if title_end > 0:
+            text = text[title_end + 2:].lstrip()
+    text_format = GIFT_FORMAT_PATTERN.match(text)
+    if text_format:
+        text = text[text_format.end():]
+    is_html = text_format is not None and text_format.group(1).lower() == "html"
+
+    open_brace = find_unescaped(text, "{")
+    close_brace = find_unescaped(text, "}", open_brace + 1) if open_brace >= 0 else -1
+    if open_brace < 0 or close_brace < 0:
+        return SKIPPED, "description"
+
+    # Text after the answers makes a fill-in-the-blank question
+    question_text = gift_unescape(text[:open_brace]).strip()
+    after = gift_unescape(text[close_brace + 1:]).strip()
+    if after:
+        question_text = question_text + " _____ " + after
+    question_text = html_to_text(question_text, is_html)
+
+    body = text[open_brace + 1:close_brace].strip()
+    if not body:
+        return SKIPPED, "essay"
+    if body.startswith("#"):
+        return SKIPPED, "numerical"
+
+    feedback = find_unescaped(body, "#")
+    true_false = (body[:feedback] if feedback >= 0 else body).strip().upper()
+    if true_false in ("T", "TRUE", "F", "FALSE"):
+        answer = "True" if true_false.startswith("T") else "False"
+        return QUESTION, {"question": question_text, "choices": ["True", "False"], "answer": answer}
+
+    answers = gift_answers(body)
+    if any(marker == "=" and "->" in choice for marker, choice, weight in answers):
+        return SKIPPED, "matching"
+    if not any(marker == "~" for marker, choice, weight in answers):
+        return SKIPPED, "shortanswer"
+    correct = [choice for marker, choice, weight in answers if marker == "=" or weight == 100]
+    if len(correct) != 1:
+        return SKIPPED, "multichoice (no single correct answer)"
+
+    choices = [html_to_text(choice, is_html) for marker, choice, weight in answers]
+    answer = html_to_text(correct[0], is_html)
+    return QUESTION, {"question": question_text, "choices": choices, "answer": answer}
+
+
+def parse_gift(path, start, end):
+    """Yield the categories and questions of the GIFT questions in a chunk"""
+    for block in gift_blocks(path, start, end):
+        question_lines = []
+        for line in block:
+            if line.startswith("$CATEGORY:"):
+                yield CATEGORY, category_name(line[len("$CATEGORY:"):])
+            else:
+                question_lines.append(line)
+        if question_lines:
+            yield gift_question("\n".join(question_lines))
+
+
+# ===== MOODLE XML =====
+
+def moodle_chunk_start(data, position, limit):
+    """
+    Return where the Moodle XML chunk starting near `position` begins: the
+    position of a <question> tag at or after it that is a real tag, not text
+    inside a CDATA section or a comment (question text can quote XML), or
+    `limit` if there is none. The chunk before ends at the same place, as
+    both ask with the same position.
+    """
+    # Outside CDATA "]]>" cannot appear, so after the first one the position
+    # is certainly outside a CDATA section
+    cdata_end = data.find(CDATA_END, position, min(position + CDATA_SYNC_WINDOW, limit))
+    if cdata_end >= 0:
+        position = cdata_end + len(CDATA_END)
+    return next_question_tag(data, position, limit)
+
+
+def next_question_tag(data, position, limit):
+    """
+    Return the position of the first <question> tag at or after `position`
+    (which must be outside CDATA and comments), skipping CDATA sections and
+    comments on the way, or `limit` if there is none.
+    """
+    while position < limit:
+        tag = data.find(MOODLE_QUESTION_TAG, position, limit)
+        if tag < 0:
+            return limit
+        cdata = data.find(CDATA_START, position, tag)
+        comment = data.find(COMMENT_START, position, tag)
+        if cdata < 0 and comment < 0:
+            return tag
+        if comment < 0 or 0 <= cdata < comment:
+            section_end = data.find(CDATA_END, cdata + len(CDATA_START), limit)
+        else:
+            section_end = data.find(COMMENT_END, comment + len(COMMENT_START), limit)
+        if section_end < 0:
+            return limit
+        position = section_end + 3
+    return limit
+
+
+def moodle_elements(data, path, first, stop):
+    """
+    Yield the <question> elements between two positions of a Moodle XML file,
+    parsed as the bytes are read. Each element is emptied once it has been
+    used, so a chunk only keeps a small empty element per question.
+    """
+    parser = ElementTree.XMLPullParser(events=("end",))
+    blocks = (data[start:min(start + READ_BLOCK, stop)] for start in range(first, stop, READ_BLOCK))
+    try:
+        for block in itertools.chain([b"<quiz>"], blocks, [b"</quiz>"]):
+            parser.feed(block)
+            for event, element in parser.read_events():
+                if element.tag == "question":
+                    yield element
+                    element.clear()
+        parser.close()
+    except ElementTree.ParseError as error:
+        raise QuestionImportError(path + ": broken XML in the questions after byte " + str(first)
+                                  + ": " + str(error))
+
+
+def moodle_text(element):
+    """Return the <text> of a Moodle element as plain text (its format attribute says if it is HTML)"""
+    if element is None:
+        return ""
+    return html_to_text(element.findtext("text", ""), element.get("format", "html") == "html")
+
+
+def moodle_question(element):
+    """Turn one Moodle <question> element into (CATEGORY, name), (QUESTION, dict) or (SKIPPED, reason)"""
+    question_type = element.get("type", "")
+    if question_type == "category":
+        return CATEGORY, category_name(element.findtext("category/text", ""))
+    if question_type not in ("multichoice", "truefalse"):
+        return SKIPPED, question_type
+    if question_type == "multichoice" and element.findtext("single", "true").strip().lower() not in ("true", "1"):
+        return SKIPPED, "multichoice (several answers)"
+
+    choices = []
+    correct = []
+    for answer in element.findall("answer"):
+        choice = moodle_text(answer)
+        if question_type == "truefalse":
+            choice = choice.capitalize()
+        choices.append(choice)
+        try:
+            fraction = float(answer.get("fraction", "0"))
+        except ValueError:
+            fraction = 0.0
+        if fraction >= 100:
+            correct.append(choice)
+    if len(correct) != 1:
+        return SKIPPED, question_type + " (no single correct answer)"
+    return QUESTION, {"question": moodle_text(element.find("questiontext")),
+                      "choices": choices, "answer": correct[0]}
+
+
+def parse_moodle(path, start, end):
+    """Yield the categories and questions of the <question> elements in the chunk [start, end)"""
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as source:
+        data = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        # The questions stop at </quiz>, near the end of the file
+        quiz_end = data.rfind(MOODLE_QUIZ_END, max(len(data) - QUIZ_END_SEARCH, 0))
+        if quiz_end < 0:
+            quiz_end = len(data)
+
+        # The start of the file is outside CDATA, so the first chunk needs no sync
+        if start == 0:
+            first = next_question_tag(data, 0, quiz_end)
+        else:
+            first = moodle_chunk_start(data, start, quiz_end)
+        stop = moodle_chunk_start(data, end, quiz_end) if end < quiz_end else quiz_end
+        if first >= stop:
+            return
+        for element in moodle_elements(data, path, first, stop):
+            yield moodle_question(element)
+    finally:
+        data.close()
+
+
+PARSERS = {"moodle": parse_moodle, "gift": parse_gift, "jsonl": parse_jsonl}
+
+
+# ===== IMPORTING =====
+
+def import_chunk(task):
+    """
+    Worker task: parse one chunk of a file, check every question's answer and
+    write the encoded questions to a spill file, grouped by category, one line
+    per question:
+        answer index <tab> JSON record
+
+    Returns a dict with the chunk's category names (by local number; None
+    stands for the category set before the chunk) and where each one's
+    questions are in the spill file, the category set at the end of the
+    chunk, counts of imported, skipped and invalid questions, and the first
+    few problem messages.
+    """
+    path, file_format, start, end, spill_path = task
+    current = DEFAULT_CATEGORY if start == 0 else None
+    numbers = {}
+    names = []
+    groups = []  # Spill lines of each category, by local number
+    result = {"start": start, "spill_path": spill_path, "categories": names, "segments": [],
+              "last_category": None, "imported": 0, "skipped": {}, "invalid": 0, "problems": []}
+
+    for kind, value in PARSERS[file_format](path, start, end):
+        if kind == CATEGORY:
+            current = value
+            result["last_category"] = value
+            continue
+        if kind == SKIPPED:
+            result["skipped"][value] = result["skipped"].get(value, 0) + 1
+            continue
+        if kind == QUESTION:
+            try:
+                answer = answer_index(value)
+            except AnswerKeyError as error:
+                kind, value = PROBLEM, path + ": " + str(error)
+        if kind == PROBLEM:
+            result["invalid"] = result["invalid"] + 1
+            if len(result["problems"]) < MAX_PROBLEMS:
+                result["problems"].append(value)
+            continue
+
+        number = numbers.get(current)
+        if number is None:
+            number = len(names)
+            numbers[current] = number
+            names.append(current)
+            groups.append([])
+        record = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        groups[number].append(b"%d\t" % answer + record + b"\n")
+        result["imported"] = result["imported"] + 1
+
+    # Each category's questions become one stretch of the spill file
+    with open(spill_path, "wb") as spill:
+        for lines in groups:
+            segment_start = spill.tell()
+            spill.writelines(lines)
+            result["segments"].append((segment_start, spill.tell(), len(lines)))
+    return result
+
+
+def plan_chunks(paths, chunk_size, spill_dir, file_format=None):
+    """Cut every file into worker tasks of about chunk_size bytes"""
+    tasks = []
+    for path in paths:
+        path_format = file_format or detect_format(path)
+        size = os.path.getsize(path)
+        for start in range(0, max(size, 1), chunk_size):
+            spill_path = os.path.join(spill_dir, "chunk" + str(len(tasks)) + ".spill")
+            tasks.append((path, path_format, start, min(start + chunk_size, size), spill_path))
+    return tasks
+
+
+def import_files(paths, out_path=DEFAULT_BANK_PATH, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 first_categories=(), file_format=None):
+    """
+    Import question files into one bank file.
+
+    Parameters:
+    - paths: Moodle XML, GIFT or JSONL files (the format comes from the extension
+      unless file_format is given)
+    - out_path: bank file to write (replaced when the import is complete)
+    - workers: number of processes (default: one per core; 1 runs everything here)
+    - chunk_size: bytes of input per worker task
+    - first_categories: category names to put first, in this order
+
+    Returns a summary dict with the imported categories as (name, question count).
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    spill_dir = tempfile.mkdtemp(prefix="import-", dir=out_dir)
+    tasks = plan_chunks(paths, chunk_size, spill_dir, file_format)
+    summary = {"files": len(paths), "chunks": len(tasks), "imported": 0, "skipped": {}, "invalid": 0,
+               "problems": []}
+
+    # Category name -> category number, and the spill file stretches of every category
+    category_numbers = {}
+    for name in first_categories:
+        category_numbers.setdefault(name, len(category_numbers))
+    parts = {}
+
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        results = executor.map(import_chunk, tasks) if executor is not None else map(import_chunk, tasks)
+        current = None
+        for result in results:
+            # Chunks come back in file order; each file starts with no category
+            if result["start"] == 0:
+                current = None
+            for name, segment in zip(result["categories"], result["segments"]):
+                if name is None:
+                    name = current or DEFAULT_CATEGORY
+                if name not in category_numbers:
+                    category_numbers[name] = len(category_numbers)
+                parts.setdefault(category_numbers[name], []).append((result["spill_path"],) + segment)
+            if result["last_category"] is not None:
+                current = result["last_category"]
+
+            summary["imported"] = summary["imported"] + result["imported"]
+            summary["invalid"] = summary["invalid"] + result["invalid"]
+            for reason, count in result["skipped"].items():
+                summary["skipped"][reason] = summary["skipped"].get(reason, 0) + count
+            summary["problems"].extend(result["problems"][:MAX_PROBLEMS - len(summary["problems"])])
+
+        # A category can get questions from any chunk, so the bank is written
+        # once every chunk is parsed: category by category, chunks in file order
+        with BankWriter(out_path) as writer:
+            for number in sorted(parts):
+                writer.start_category()
+                for spill_path, start, end, count in parts[number]:
+                    with open(spill_path, "rb") as spill:
+                        spill.seek(start)
+                        lines = spill.read(end - start).split(b"\n")
+                    for line in lines[:-1]:
+                        answer, record = line.split(b"\t", 1)
+                        writer.add_record(record, int(answer))
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    # Categories without questions are not written, so later ones move up
+    summary["categories"] = [(name, sum(part[3] for part in parts[number]))
+                             for name, number in sorted(category_numbers.items(), key=lambda item: item[1])
+                             if number in parts]
+    summary["missing_categories"] = [name for name in first_categories if category_numbers[name] not in parts]
+    return summary
+
+
+# ===== BENCHMARK =====
+
+def synthetic_questions(question_count, category_count=10, block_size=1000, seed=7):
+    """Yield (category name, question dict) for made-up questions, changing category every block_size"""
+    import random
+
+    rng = random.Random(seed)
+    for number in range(question_count):
+        category = "Category " + str((number // block_size) % category_count)
+        left = rng.randrange(1000)
+        right = rng.randrange(1000)
+        choices = [str(left + right + offset) for offset in (0, 1, -1, 10)]
+        rng.shuffle(choices)
+        yield category, {"question": "Question " + str(number) + ": what is " + str(left) + " + " + str(right)
+                                     + "? Work it out without a calculator & pick one answer.",
+                         "choices": choices, "answer": str(left + right)}
+
+
+def write_synthetic_file(path, file_format, question_count):
+    """Write made-up questions to a Moodle XML, GIFT or JSONL file"""
+    from xml.sax.saxutils import escape
+
+    with open(path, "w", encoding="utf-8") as out:
+        if file_format == "moodle":
+            out.write('<?xml version="1.0" encoding="UTF-8"?>\n<quiz>\n')
+        last_category = None
+        for number, (category, question) in enumerate(synthetic_questions(question_count)):
+            if file_format == "jsonl":
+                item = {"category": category}
+                item.update(question)
+                out.write(json.dumps(item) + "\n")
+                continue
+            if file_format == "gift":
+                if category != last_category:
+                    out.write("$CATEGORY: $course$/top/" + category + "\n\n")
+                answers = " ".join(("=" if choice == question["answer"] else "~") + choice
+                                   for choice in question["choices"])
+                out.write("::Q" + str(number) + ":: " + question["question"] + " {" + answers + "}\n\n")
+            else:
+                if category != last_category:
+                    out.write('  <question type="category">\n    <category><text>$course$/top/' + category
+                              + "</text></category>\n  </question>\n")
+                out.write('  <question type="multichoice">\n    <name><text>Q' + str(number) + "</text></name>\n"
+                          '    <questiontext format="html"><text><![CDATA[<p>' + question["question"]
+                          + "</p>]]></text></questiontext>\n    <single>true</single>\n")
+                for choice in question["choices"]:
+                    fraction = "100" if choice == question["answer"] else "0"
+                    out.write('    <answer fraction="' + fraction + '" format="html"><text>' + escape(choice)
+                              + "</text><feedback><text></text></feedback></answer>\n")
+                out.write("  </question>\n")
+            last_category = category
+        if file_format == "moodle":
+            out.write("</quiz>\n")
+
+
+def benchmark_import(question_count=1000000, file_format="moodle", workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Import a made-up file of question_count questions, with one process and with `workers`"""
+    import resource
+    import time
+    from benchmark import peak_memory_kb
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    extension = {"moodle": ".xml", "gift": ".gift", "jsonl": ".jsonl"}[file_format]
+    work_dir = tempfile.mkdtemp(prefix="import-benchmark-")
+    try:
+        source_path = os.path.join(work_dir, "questions" + extension)
+        out_path = os.path.join(work_dir, "questions.qbk")
+        write_synthetic_file(source_path, file_format, question_count)
+        input_mb = os.path.getsize(source_path) / (1024 * 1024)
+
+        results = {"format": file_format, "questions": question_count, "input_mb": input_mb}
+        for worker_count in sorted(set([1, workers])):
+            before = time.perf_counter()
+            summary = import_files([source_path], out_path, worker_count, chunk_size)
+            seconds = time.perf_counter() - before
+
+            bank = QuestionBank(out_path)
+            imported = sum(len(category) for category in bank)
+            bank.close()
+            if imported != question_count or summary["imported"] != question_count:
+                raise QuestionImportError("benchmark imported " + str(imported) + " of "
+                                          + str(question_count) + " questions")
+            label = "workers_" + str(worker_count) + "_"
+            results[label + "seconds"] = seconds
+            results[label + "questions_per_second"] = question_count / seconds
+            results[label + "mb_per_second"] = input_mb / seconds
+        results["categories"] = len(summary["categories"])
+        results["bank_mb"] = os.path.getsize(out_path) / (1024 * 1024)
+        results["peak_memory_kb"] = peak_memory_kb()
+        results["worker_peak_memory_kb"] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    """Import question files into a bank file, or run the benchmark"""
+    parser = argparse.ArgumentParser(description="Import Moodle XML, GIFT and JSONL questions into a bank file")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument("--chunk-mb", type=int, default=DEFAULT_CHUNK_SIZE // (1024 * 1024),
+                        help="MB of input per worker task")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="import question files into a bank file")
+    import_parser.add_argument("paths", nargs="+")
+    import_parser.add_argument("--out", default=DEFAULT_BANK_PATH)
+    import_parser.add_argument("--format", choices=sorted(PARSERS), default=None,
+                               help="format of all files (default: from the file extension)")
+    import_parser.add_argument("--categories", default="",
+                               help="comma-separated category names to put first, e.g. for the quiz pages")
+
+    benchmark = subparsers.add_parser("benchmark", help="import a made-up file of many questions")
+    benchmark.add_argument("--questions", type=int, default=1000000)
+    benchmark.add_argument("--format", choices=sorted(PARSERS), default="moodle")
+
+    args = parser.parse_args()
+    chunk_size = args.chunk_mb * 1024 * 1024
+
+    if args.command == "benchmark":
+        from benchmark import print_results
+        print_results("Question import (" + args.format + ")",
+                      benchmark_import(args.questions, args.format, args.workers, chunk_size))
+        return
+
+    first_categories = [name.strip() for name in args.categories.split(",") if name.strip()]
+    try:
+        summary = import_files(args.paths, args.out, args.workers, chunk_size, first_categories, args.format)
+    except (QuestionImportError, OSError) as error:
+        print("Import failed:", error)
+        return
+
+    print("Imported", summary["imported"], "questions from", summary["files"], "files into", args.out)
+    for index, (name, count) in enumerate(summary["categories"]):
+        print("  category", index, "-", name + ":", count, "questions")
+    for reason, count in sorted(summary["skipped"].items()):
+        print("  skipped", count, reason, "questions")
+    if summary["invalid"]:
+        print("  skipped", summary["invalid"], "invalid questions, for example:")
+        for problem in summary["problems"]:
+            print("    " + problem)
+    for name in summary["missing_categories"]:
+        print("  warning: no questions in category", repr(name))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# instrumentation.py - UI Latency Instrumentation Module
+# This module measures where time goes in the Tk interface. It is opt-in:
+# nothing here runs unless main.py is started with --instrument (or
+# Instrumentation.install is called).
+#
+# What is measured:
+#   - the time taken by the App/QuizPage callbacks (show_frame,
+#     show_current_question, go_to_next_question, restart_quiz)
+#   - event loop lag: how late a timer that should fire every `interval`
+#     milliseconds actually fires (a busy or stalled event loop shows up here)
+#   - time to idle: how long after the timer it takes before Tk runs its idle
+#     callbacks (pending redraws and geometry work)
+#
+# Every measurement goes into a LatencyHistogram: a fixed list of counters
+# with logarithmic buckets, so recording is a few arithmetic operations and
+# memory never grows. Histograms can be written to a JSON file or served on a
+# small local HTTP endpoint, and a cProfile capture can be taken alongside.
+
+import cProfile
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram buckets: 4 per power of two, from 1 microsecond to about 1 hour
+SUB_BUCKETS = 4
+MIN_SECONDS = 1e-6
+BUCKET_COUNT = SUB_BUCKETS * 32
+
+# The callbacks that are timed, as (class attribute path, metric name)
+INSTRUMENTED_METHODS = [
+    ("app.App.show_frame", "show_frame"),
+    ("quiz_components.QuizPage.show_current_question", "show_current_question"),
+    ("quiz_components.QuizPage.go_to_next_question", "go_to_next_question"),
+    ("quiz_components.QuizPage.restart_quiz", "restart_quiz"),
+]
+
+
+class LatencyHistogram:
+    """Counts of latencies in logarithmic buckets"""
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def record(self, seconds):
+        """Add one latency (in seconds)"""
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+        self.counts[bucket_index(seconds)] += 1
+
+    def percentile(self, fraction):
+        """Return an upper bound (in seconds) for the given fraction of samples"""
+        if self.count == 0:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(bucket_upper_bound(index), self.maximum)
+        return self.maximum
+
+    def to_dict(self):
+        """Summary and non-empty buckets, for export"""
+        return {
+            "count": self.count,
+            "mean_ms": (self.total / self.count) * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(0.50) * 1000,
+            "p90_ms": self.percentile(0.90) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.maximum * 1000,
+            "buckets_ms": {format(bucket_upper_bound(index) * 1000, ".4g"): bucket_count
+                           for index, bucket_count in enumerate(self.counts) if bucket_count},
+        }
+
+
+def bucket_index(seconds):
+    """Return the histogram bucket for a latency"""
+    if seconds <= MIN_SECONDS:
+        return 0
+    index = int(math.log2(seconds / MIN_SECONDS) * SUB_BUCKETS) + 1
+    return min(index, BUCKET_COUNT - 1)
+
+
+def bucket_upper_bound(index):
+    """Return the largest latency (in seconds) that falls into a bucket"""
+    return MIN_SECONDS * 2 ** (index / SUB_BUCKETS)
+
+
+def resolve(path):
+    """Return (class, method name) for a path like "app.App.show_frame" """
+    module_name, class_name, method_name = path.split(".")
+    module = __import__(module_name)
+    return getattr(module, class_name), method_name
+
+
+class Instrumentation:
+    """
+    Collects latency histograms for the Tk UI.
+
+    Usage:
+        instrumentation = Instrumentation()
+        app = App(instrumentation=instrumentation)   (installs it)
+        app.mainloop()
+        instrumentation.export_json("metrics.json")
+    """
+
+    def __init__(self, interval_ms=100):
+        self.interval_ms = interval_ms
+        self.histograms = {}
+        self.original_methods = []
+        self.app = None
+        self.probe_id = None
+        self.profiler = None
+        self.metrics_server = None
+
+    def histogram(self, name):
+        """Return the histogram with the given name (created on first use)"""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = LatencyHistogram()
+            self.histograms[name] = histogram
+        return histogram
+
+    def timed(self, name, function):
+        """Return a wrapper around `function` that records each call's duration"""
+        histogram = self.histogram(name)
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            before = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.record(perf_counter() - before)
+        wrapper.__name__ = function.__name__
+        wrapper.__doc__ = function.__doc__
+        return wrapper
+
+    def install(self, app):
+        """
+        Start timing the UI callbacks and probing the event loop of `app`.
+        Install before the app builds its pages (App does this when given
+        instrumentation=...): a button keeps the method it was bound to when
+        it was built, so pages built earlier are not timed.
+        """
+        self.app = app
+        for path, name in INSTRUMENTED_METHODS:
+            owner, method_name = resolve(path)
+            original = owner.__dict__[method_name]
+            self.original_methods.append((owner, method_name, original))
+            setattr(owner, method_name, self.timed(name, original))
+        self.schedule_probe()
+
+    def uninstall(self):
+        """Put the original callbacks back and stop probing"""
+        for owner, method_name, original in reversed(self.original_methods):
+            setattr(owner, method_name, original)
+        self.original_methods = []
+        if self.probe_id is not None and self.app is not None:
+            try:
+                self.app.after_cancel(self.probe_id)
+            except Exception:
+                pass
+        self.probe_id = None
+
+    def schedule_probe(self):
+        """Arrange for the next event loop probe"""
+        expected = time.perf_counter() + self.interval_ms / 1000
+        self.probe_id = self.app.after(self.interval_ms, self.probe, expected)
+
+    def probe(self, expected):
+        """Timer callback: record how late it fired and how long until Tk is idle"""
+        now = time.perf_counter()
+        self.histogram("event_loop_lag").record(max(now - expected, 0.0))
+        idle_histogram = self.histogram("time_to_idle")
+        self.app.after_idle(lambda: idle_histogram.record(time.perf_counter() - now))
+        self.schedule_probe()
+
+    def snapshot(self):
+        """Return all histograms as one dictionary"""
+        return {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())}
+
+    def export_json(self, path):
+        """Write the histograms to a JSON file"""
+        with open(path, "w", encoding="utf-8") as metrics_file:
+            json.dump(self.snapshot(), metrics_file, indent=2)
+
+    def serve_metrics(self, port, host="127.0.0.1"):
+        """Serve the histograms as JSON on http://host:port/metrics from a background thread"""
+        instrumentation = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = json.dumps(instrumentation.snapshot()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Keep the terminal quiet
+                pass
+
+        self.metrics_server = ThreadingHTTPServer((host, port), MetricsHandler)
+        thread = threading.Thread(target=self.metrics_server.serve_forever, name="metrics", daemon=True)
+        thread.start()
+        return self.metrics_server
+
+    def start_profile(self):
+        """Start a cProfile capture of everything the app does"""
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop_profile(self, path):
+        """Stop the cProfile capture and save it (open with pstats or snakeviz)"""
+        if self.profiler is None:
+            return
+        self.profiler.disable()
+        self.profiler.dump_stats(path)
+        self.profiler = None
+
+    def close(self):
+        """Stop the metrics endpoint and uninstall"""
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+            self.metrics_server = None
+        self.uninstall()
@@ -0,0 +1,319 @@
+# item_analysis.py - Streaming Item Analysis Module
+# This module computes statistics for every question from the attempts in
+# the results log (results_log.py):
+#
+#   - difficulty (p-value): fraction of students who answered correctly
+#   - discrimination: point-biserial correlation between getting this
+#     question right and the student's score on the rest of the paper
+#   - distractor frequencies: how often each choice was picked
+#   - completion time: mean seconds spent on the question
+#
+# Only running sums are kept for each question (a fixed handful of numbers
+# plus one counter per choice), and the state file remembers how far into the
+# log it has read. Each update reads only the attempts added since the last
+# run, in one pass, and never reloads the history.
+#
+# Usage:
+#     python item_analysis.py update              (read new attempts from results.wal)
+#     python item_analysis.py report --out items.csv
+
+import argparse
+import csv
+import json
+import math
+import os
+
+from grading import answer_index, answer_key_for
+from question_bank import load_quiz_data
+from results_log import DEFAULT_LOG_PATH, read_records
+from sampling import rebuild_paper
+
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "item_stats.json")
+
+# Thresholds used to flag questions in the report
+MIN_RESPONSES = 30  # Do not judge a question on fewer answers than this
+TOO_HARD = 0.2  # p-value below this
+TOO_EASY = 0.95  # p-value above this
+LOW_DISCRIMINATION = 0.1  # point-biserial below this
+
+
+class ItemStats:
+    """Running sums for one question"""
+
+    __slots__ = ("responses", "correct", "unanswered", "rest_sum", "rest_sum_correct",
+                 "rest_squares", "seconds_sum", "choice_counts")
+
+    def __init__(self, choice_count=0):
+        self.responses = 0  # Attempts that included this question
+        self.correct = 0  # ... and answered it correctly
+        self.unanswered = 0  # ... and left it unanswered
+        self.rest_sum = 0.0  # Sum of rest scores (fraction correct on the other questions)
+        self.rest_sum_correct = 0.0  # Same, only for students who got this question right
+        self.rest_squares = 0.0  # Sum of squared rest scores
+        self.seconds_sum = 0.0  # Time spent on the question
+        self.choice_counts = [0] * choice_count  # Picks per original choice
+
+    def add(self, chosen, is_correct, rest_score, seconds):
+        """Add one response"""
+        self.responses += 1
+        if is_correct:
+            self.correct += 1
+            self.rest_sum_correct += rest_score
+        self.rest_sum += rest_score
+        self.rest_squares += rest_score * rest_score
+        self.seconds_sum += seconds
+        if chosen < 0:
+            self.unanswered += 1
+        else:
+            while len(self.choice_counts) <= chosen:
+                self.choice_counts.append(0)
+            self.choice_counts[chosen] += 1
+
+    def p_value(self):
+        """Fraction of responses that were correct"""
+        return self.correct / self.responses if self.responses else 0.0
+
+    def point_biserial(self):
+        """
+        Correlation between answering this question correctly and the rest
+        score, computed from the running sums. None when it is undefined
+        (everyone right, everyone wrong or no spread in rest scores).
+        """
+        n = self.responses
+        n_correct = self.correct
+        if n < 2 or n_correct == 0 or n_correct == n:
+            return None
+        mean = self.rest_sum / n
+        variance = self.rest_squares / n - mean * mean
+        if variance <= 1e-12:
+            return None
+        mean_correct = self.rest_sum_correct / n_correct
+        mean_wrong = (self.rest_sum - self.rest_sum_correct) / (n - n_correct)
+        p = n_correct / n
+        return (mean_correct - mean_wrong) / math.sqrt(variance) * math.sqrt(p * (1 - p))
+
+    def mean_seconds(self):
+        """Mean time spent on the question"""
+        return self.seconds_sum / self.responses if self.responses else 0.0
+
+    def to_list(self):
+        """Save the sums as a list (for the state file)"""
+        return [self.responses, self.correct, self.unanswered, self.rest_sum, self.rest_sum_correct,
+                self.rest_squares, self.seconds_sum, self.choice_counts]
+
+    @classmethod
+    def from_list(cls, values):
+        """Load sums saved by to_list"""
+        stats = cls()
+        (stats.responses, stats.correct, stats.unanswered, stats.rest_sum, stats.rest_sum_correct,
+         stats.rest_squares, stats.seconds_sum, stats.choice_counts) = values
+        return stats
+
+
+class ItemAnalysis:
+    """
+    Item statistics for every question of the bank, updated incrementally
+    from the results log.
+    """
+
+    def __init__(self, quiz_data, state_path=DEFAULT_STATE_PATH):
+        self.quiz_data = quiz_data
+        self.state_path = state_path
+
+        # (category index, question index) -> ItemStats
+        self.items = {}
+
+        # Byte offset in the results log up to which attempts were counted
+        self.log_offset = 0
+        self.attempts = 0
+
+        # Per category: the answer key, and the number of choices of every
+        # question looked at so far. Reading a question from a bank file
+        # decodes it, so this is done once per question, not once per answer.
+        self.answer_keys = {}
+        self.choice_counts = {}
+        self.load_state()
+
+    def load_state(self):
+        """Load the running sums saved by a previous run, if any"""
+        if not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, "r", encoding="utf-8") as state_file:
+            state = json.load(state_file)
+        self.log_offset = state["log_offset"]
+        self.attempts = state["attempts"]
+        for key, values in state["items"].items():
+            category_index, question_index = key.split(":")
+            self.items[(int(category_index), int(question_index))] = ItemStats.from_list(values)
+
+    def save_state(self):
+        """Save the running sums (written to a temporary file, then moved into place)"""
+        state = {
+            "log_offset": self.log_offset,
+            "attempts": self.attempts,
+            "items": {str(category) + ":" + str(question): stats.to_list()
+                      for (category, question), stats in self.items.items()},
+        }
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as state_file:
+            json.dump(state, state_file, separators=(",", ":"))
+        os.replace(temp_path, self.state_path)
+
+    def choice_count(self, category_index, question_index):
+        """Return the number of choices of a pool question (decoded once, then cached)"""
+        counts = self.choice_counts.setdefault(category_index, {})
+        count = counts.get(question_index)
+        if count is None:
+            count = len(self.quiz_data[category_index][question_index]["choices"])
+            counts[question_index] = count
+        return count
+
+    def add_attempt(self, record):
+        """Add one finished attempt (a results log record)"""
+        category_index = record["category"]
+        answers = record["answers"]
+        if category_index is None or category_index >= len(self.quiz_data) or not answers:
+            return
+        pool = self.quiz_data[category_index]
+        answer_key = self.answer_keys.get(category_index)
+        if answer_key is None:
+            answer_key = answer_key_for(pool)
+            self.answer_keys[category_index] = answer_key
+
+        # Work out which pool question each answer belongs to, and which
+        # original choice was picked (sampled papers shuffle both)
+        paper = None
+        if record.get("paper"):
+            paper = rebuild_paper(pool, record["paper"])
+
+        question_indexes = []
+        chosen_choices = []
+        correct_flags = []
+        for position, shown_choice in enumerate(answers):
+            if paper is not None:
+                question_index = paper.pool_index(position)
+                order = paper.choice_order(position, self.choice_count(category_index, question_index))
+                chosen = order[shown_choice] if shown_choice >= 0 else -1
+            else:
+                question_index = position
+                chosen = shown_choice
+            question_indexes.append(question_index)
+            chosen_choices.append(chosen)
+            correct_flags.append(chosen == answer_key[question_index])
+
+        seconds = record.get("question_seconds") or [0.0] * len(answers)
+        total_correct = sum(correct_flags)
+        others = max(len(answers) - 1, 1)
+        for position, question_index in enumerate(question_indexes):
+            key = (category_index, question_index)
+            stats = self.items.get(key)
+            if stats is None:
+                stats = ItemStats(self.choice_count(category_index, question_index))
+                self.items[key] = stats
+            rest_score = (total_correct - correct_flags[position]) / others
+            stats.add(chosen_choices[position], correct_flags[position], rest_score, seconds[position])
+        self.attempts += 1
+
+    def update_from_log(self, log_path=DEFAULT_LOG_PATH, batch_size=10000):
+        """
+        Read the attempts added to the log since the last update, in one pass,
+        saving the state after every batch. Returns how many attempts were added.
+        """
+        added = 0
+        in_batch = 0
+        for offset, record in read_records(log_path, self.log_offset):
+            self.add_attempt(record)
+            self.log_offset = offset
+            added += 1
+            in_batch += 1
+            if in_batch == batch_size:
+                self.save_state()
+                in_batch = 0
+        self.save_state()
+        return added
+
+    def report_rows(self):
+        """Return one dict per question with its statistics and flags"""
+        rows = []
+        for (category_index, question_index) in sorted(self.items):
+            stats = self.items[(category_index, question_index)]
+            question = self.quiz_data[category_index][question_index]
+            p_value = stats.p_value()
+            discrimination = stats.point_biserial()
+
+            flags = []
+            if stats.responses >= MIN_RESPONSES:
+                if p_value < TOO_HARD:
+                    flags.append("too hard")
+                if p_value > TOO_EASY:
+                    flags.append("too easy")
+                if discrimination is not None and discrimination < 0:
+                    flags.append("negative discrimination")
+                elif discrimination is not None and discrimination < LOW_DISCRIMINATION:
+                    flags.append("low discrimination")
+                correct_index = answer_index(question)
+                correct_picks = stats.choice_counts[correct_index]
+                for choice_index, count in enumerate(stats.choice_counts):
+                    if choice_index == correct_index:
+                        continue
+                    if count == 0:
+                        flags.append("distractor " + str(choice_index) + " never chosen")
+                    elif count > correct_picks:
+                        flags.append("distractor " + str(choice_index) + " chosen more than the answer")
+
+            rows.append({
+                "category": category_index,
+                "question": question_index,
+                "text": question["question"],
+                "responses": stats.responses,
+                "p_value": round(p_value, 4),
+                "point_biserial": None if discrimination is None else round(discrimination, 4),
+                "choice_counts": " ".join(str(count) for count in stats.choice_counts),
+                "unanswered": stats.unanswered,
+                "mean_seconds": round(stats.mean_seconds(), 2),
+                "flags": "; ".join(flags),
+            })
+        return rows
+
+    def write_report(self, path):
+        """Write the report as CSV"""
+        rows = self.report_rows()
+        fields = ["category", "question", "text", "responses", "p_value", "point_biserial",
+                  "choice_counts", "unanswered", "mean_seconds", "flags"]
+        with open(path, "w", newline="", encoding="utf-8") as report_file:
+            writer = csv.DictWriter(report_file, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+        return rows
+
+
+def main():
+    """Update the statistics from the results log and/or write the report"""
+    parser = argparse.ArgumentParser(description="Item analysis of recorded attempts")
+    parser.add_argument("--bank", default=None, help="question bank file")
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH, help="file with the running sums")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    update = subparsers.add_parser("update", help="read new attempts from the results log")
+    update.add_argument("--log", default=DEFAULT_LOG_PATH)
+
+    report = subparsers.add_parser("report", help="update, then write a CSV report flagging bad items")
+    report.add_argument("--log", default=DEFAULT_LOG_PATH)
+    report.add_argument("--out", default="item_report.csv")
+
+    args = parser.parse_args()
+
+    analysis = ItemAnalysis(load_quiz_data(args.bank), args.state)
+    added = analysis.update_from_log(args.log)
+    print("Added", added, "attempts (" + str(analysis.attempts) + " in total).")
+
+    if args.command == "report":
+        rows = analysis.write_report(args.out)
+        flagged = [row for row in rows if row["flags"]]
+        print("Wrote", len(rows), "questions to", args.out + ";", len(flagged), "flagged.")
+        for row in flagged:
+            print("  category", row["category"], "question", row["question"], "-", row["flags"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+# leaderboard.py - Leaderboard Module
+# This module keeps a live ranking of the best attempts for every quiz
+# category, keyed by the category's page key from quiz_data.QUIZ_PAGES
+# ("SoftwareQuiz", ...; categories without a page get "Category<n>").
+#
+# Each board is a bounded min-heap holding at most `capacity` students (their
+# best attempt each), so a finished attempt is added in O(log capacity) and an
+# attempt that cannot make the board is rejected after one comparison, however
+# many millions of attempts there have been. A student who improves replaces
+# their old entry, which is left in the heap marked as stale and dropped later.
+#
+# Reading a board goes through a small LRU cache of rendered views (the first
+# k rows as text). A view is keyed by the board's version, which changes only
+# when the board does, so repeated reads of the top 100 just return the cached
+# rows, and a changed board is rendered again in O(capacity log k).
+#
+# The boards are saved to a state file together with the position reached in
+# the results log (results_log.py), so a restart only reads the attempts added
+# since then.
+#
+# Usage:
+#     python leaderboard.py show SoftwareQuiz --top 10
+#     python leaderboard.py rebuild            (from the whole results log)
+
+import argparse
+import heapq
+import json
+import os
+from collections import OrderedDict
+
+from quiz_data import QUIZ_PAGES
+from results_log import DEFAULT_LOG_PATH, read_records
+
+# Students kept per board, and rendered views kept in the cache
+DEFAULT_CAPACITY = 1000
+DEFAULT_VIEW_CACHE_SIZE = 64
+
+
+def leaderboard_state_path(log_path):
+    """Return the state file kept next to a results log (results.wal -> results.leaderboards.json)"""
+    return os.path.splitext(log_path)[0] + ".leaderboards.json"
+
+
+DEFAULT_STATE_PATH = leaderboard_state_path(DEFAULT_LOG_PATH)
+
+
+def board_key(category_index):
+    """Return the leaderboard key of a category (its page key from QUIZ_PAGES)"""
+    for key, title, index in QUIZ_PAGES:
+        if index == category_index:
+            return key
+    return "Category" + str(category_index)
+
+
+class Leaderboard:
+    """
+    The best attempts of one category, one entry per student.
+
+    Heap entries are lists:
+        [percent, -seconds, -sequence, student_id, name, score, total, seconds, stale]
+    so the smallest entry is the weakest: lowest percentage, then slowest,
+    then latest to reach that result.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.heap = []
+        self.entries = {}  # student ID -> their live heap entry
+        self.stale_count = 0
+        self.sequence = 0
+        self.version = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, student_id, name, score, total, seconds):
+        """Add a finished attempt; returns True if the board changed"""
+        if not total:
+            return False
+        self.sequence = self.sequence + 1
+        entry = [score / total, -seconds, -self.sequence, student_id, name, score, total, seconds, False]
+
+        old = self.entries.get(student_id)
+        if old is not None:
+            # Only a better attempt replaces the student's entry
+            if entry[:2] <= old[:2]:
+                return False
+            old[8] = True
+            self.stale_count = self.stale_count + 1
+        elif len(self.entries) >= self.capacity:
+            self.drop_stale_top()
+            if entry[:3] <= self.heap[0][:3]:
+                return False
+
+        heapq.heappush(self.heap, entry)
+        self.entries[student_id] = entry
+
+        # Keep at most `capacity` students
+        while len(self.entries) > self.capacity:
+            weakest = heapq.heappop(self.heap)
+            if not weakest[8]:
+                del self.entries[weakest[3]]
+            else:
+                self.stale_count = self.stale_count - 1
+        self.drop_stale_top()
+
+        # Do not let replaced entries pile up
+        if self.stale_count > self.capacity:
+            self.heap = [entry for entry in self.heap if not entry[8]]
+            heapq.heapify(self.heap)
+            self.stale_count = 0
+
+        self.version = self.version + 1
+        return True
+
+    def drop_stale_top(self):
+        """Remove replaced entries from the top of the heap"""
+        while self.heap and self.heap[0][8]:
+            heapq.heappop(self.heap)
+            self.stale_count = self.stale_count - 1
+
+    def top(self, k):
+        """Return the best k entries, best first"""
+        return heapq.nlargest(k, (entry for entry in self.heap if not entry[8]), key=lambda entry: entry[:3])
+
+    def to_list(self):
+        """Save the live entries (for the state file)"""
+        return [entry[:8] for entry in self.heap if not entry[8]]
+
+    def load_list(self, entries):
+        """Load entries saved by to_list"""
+        self.heap = [list(entry) + [False] for entry in entries]
+        heapq.heapify(self.heap)
+        self.entries = {entry[3]: entry for entry in self.heap}
+        self.sequence = max([-entry[2] for entry in self.heap], default=0)
+        self.stale_count = 0
+        self.version = self.version + 1
+
+
+def render_row(rank, entry):
+    """Format one leaderboard row for display"""
+    seconds = int(entry[7])
+    return (str(rank) + ". " + entry[4] + " - " + str(entry[5]) + "/" + str(entry[6])
+            + " (" + str(seconds // 60) + ":" + format(seconds % 60, "02d") + ")")
+
+
+class Leaderboards:
+    """
+    Every category's Leaderboard plus an LRU cache of rendered views.
+
+    Parameters:
+    - capacity: students kept per board
+    - view_cache_size: rendered views kept in the cache
+    - state_path: file the boards are saved to (None to keep them in memory only)
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, view_cache_size=DEFAULT_VIEW_CACHE_SIZE,
+                 state_path=DEFAULT_STATE_PATH):
+        self.capacity = capacity
+        self.view_cache_size = view_cache_size
+        self.state_path = state_path
+        self.boards = {}
+        self.views = OrderedDict()  # (key, k, version) -> rendered rows
+        self.view_hits = 0
+        self.view_misses = 0
+
+        # Byte offset in the results log up to which attempts were added
+        self.log_offset = 0
+        if state_path is not None:
+            self.load_state()
+
+    def board(self, key):
+        """Return the board for a key (created on first use)"""
+        board = self.boards.get(key)
+        if board is None:
+            board = Leaderboard(self.capacity)
+            self.boards[key] = board
+        return board
+
+    def add_attempt(self, record):
+        """Add one finished attempt (a results log record); returns True if a board changed"""
+        student = record.get("student") or {}
+        if record.get("category") is None or record.get("score") is None or not student.get("id"):
+            return False
+        seconds = 0.0
+        if record.get("finished_at") and record.get("started_at"):
+            seconds = max(record["finished_at"] - record["started_at"], 0.0)
+        return self.board(board_key(record["category"])).add(
+            student["id"], student.get("name", ""), record["score"], record["total"], seconds)
+
+    def view(self, key, k=100):
+        """Return the rendered top k rows of a board (cached until the board changes)"""
+        board = self.board(key)
+        cache_key = (key, k, board.version)
+        rows = self.views.get(cache_key)
+        if rows is not None:
+            self.views.move_to_end(cache_key)
+            self.view_hits = self.view_hits + 1
+            return rows
+
+        self.view_misses = self.view_misses + 1
+        rows = [render_row(rank, entry) for rank, entry in enumerate(board.top(k), 1)]
+        self.views[cache_key] = rows
+        if len(self.views) > self.view_cache_size:
+            self.views.popitem(last=False)
+        return rows
+
+    def update_from_log(self, log_path=DEFAULT_LOG_PATH):
+        """Add the attempts written to the results log since the last update; returns how many"""
+        # A log that is shorter than before was replaced: start again from scratch
+        if os.path.exists(log_path) and os.path.getsize(log_path) < self.log_offset:
+            self.boards = {}
+            self.views.clear()
+            self.log_offset = 0
+        added = 0
+        for offset, record in read_records(log_path, self.log_offset):
+            self.add_attempt(record)
+            self.log_offset = offset
+            added = added + 1
+        return added
+
+    def load_state(self):
+        """Load the boards saved by a previous run, if any"""
+        if not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, "r", encoding="utf-8") as state_file:
+            state = json.load(state_file)
+        self.log_offset = state["log_offset"]
+        for key, entries in state["boards"].items():
+            self.board(key).load_list(entries)
+
+    def save_state(self, log_offset=None):
+        """Save the boards (to a temporary file, then moved into place)"""
+        if self.state_path is None:
+            return
+        if log_offset is not None:
+            self.log_offset = log_offset
+        state = {"log_offset": self.log_offset,
+                 "boards": {key: board.to_list() for key, board in self.boards.items()}}
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as state_file:
+            json.dump(state, state_file, separators=(",", ":"))
+        os.replace(temp_path, self.state_path)
+
+
+def benchmark_leaderboards(attempt_count=1000000, reads=10000):
+    """Add many random attempts, then time reading the top 100"""
+    import random
+    import time
+    from benchmark import latency_summary
+
+    rng = random.Random(5)
+    leaderboards = Leaderboards(state_path=None)
+    keys = [key for key, title, index in QUIZ_PAGES]
+
+    before = time.perf_counter()
+    for number in range(attempt_count):
+        leaderboards.board(keys[number % len(keys)]).add(
+            str(rng.randrange(attempt_count)), "Student", rng.randrange(11), 10, rng.uniform(60, 900))
+    add_seconds = time.perf_counter() - before
+
+    timings = []
+    for number in range(reads):
+        # Every 100th read follows a new best attempt on a board
+        if number % 100 == 0:
+            leaderboards.board(keys[number % len(keys)]).add("new" + str(number), "Student", 10, 10,
+                                                             30.0 - number / 1000)
+        before = time.perf_counter()
+        leaderboards.view(keys[number % len(keys)], 100)
+        timings.append(time.perf_counter() - before)
+
+    results = {"attempts": attempt_count, "add_us_per_attempt": add_seconds / attempt_count * 1000000,
+               "view_hits": leaderboards.view_hits, "view_misses": leaderboards.view_misses}
+    for key, value in latency_summary(timings).items():
+        results["top100_" + key] = value
+    return results
+
+
+def main():
+    """Show or rebuild the leaderboards"""
+    parser = argparse.ArgumentParser(description="Quiz leaderboards")
+    parser.add_argument("--log", default=DEFAULT_LOG_PATH)
+    parser.add_argument("--state", default=None, help="state file (default: next to the log)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    show = subparsers.add_parser("show", help="update from the results log and print a board")
+    show.add_argument("key", help="category page key, e.g. SoftwareQuiz")
+    show.add_argument("--top", type=int, default=10)
+
+    subparsers.add_parser("rebuild", help="rebuild every board from the whole results log")
+
+    benchmark = subparsers.add_parser("benchmark", help="time adding attempts and reading the top 100")
+    benchmark.add_argument("--attempts", type=int, default=1000000)
+
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        from benchmark import print_results
+        print_results("Leaderboards", benchmark_leaderboards(args.attempts))
+        return
+
+    state_path = args.state or leaderboard_state_path(args.log)
+    if args.command == "rebuild" and os.path.exists(state_path):
+        os.remove(state_path)
+    leaderboards = Leaderboards(state_path=state_path)
+    added = leaderboards.update_from_log(args.log)
+    leaderboards.save_state()
+    print("Added", added, "attempts from", args.log)
+    if args.command == "show":
+        for row in leaderboards.view(args.key, args.top):
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
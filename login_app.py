@@ -1,27 +1,30 @@
 # login_app.py - Login Application Module
-# This module contains the user's exact login code with logo integration
+# This module contains the login page with logo integration.
+# The login page is a frame inside the main app window (app.App), so logging
+# in and out only switches pages instead of closing and reopening windows.
 
 from tkinter import *
 from tkinter import messagebox
 
+from assets import load_logo
+from students import LoginError, make_student_data
 
-class App(Tk):
-    def __init__(self):
-        super().__init__()
 
-        # Title, icon, size
-        self.title("Greenwich University Project")
-        self.iconbitmap("/Users/diegofoggi/Desktop/Projects/Questionaire/Quiz_Couersework/greenwich_logo.ico")
-        self.geometry("800x600")
+class LoginPage(Frame):
+    """
+    Login page where the student enters their name, email and ID.
+    On success it hands the student data to the controller (app.App),
+    which shows the main menu.
+    """
+
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
 
         # Add logo image (smaller and centered)
         try:
-            # Load the logo image
-            original_logo = PhotoImage(
-                file="/Users/diegofoggi/Desktop/Projects/Questionaire/Quiz_Couersework/greenwich_logo.png"
-            )
-            # Make it smaller (subsample by 3)
-            self.logo_image = original_logo.subsample(3, 3)
+            # Load the shared, already smaller logo image (see assets.py)
+            self.logo_image = load_logo(self)
 
             # Create logo label and center it
             self.logo_label = Label(self, image=self.logo_image)
@@ -41,6 +44,8 @@ class App(Tk):
         # Ask the user to enter data.
         self.info_label = Label(self, text="Enter your student data below.", font=("Arial", 18), padx=5, pady=5)
         self.info_label.pack()
+        if controller.roster is not None:
+            self.info_label.config(text="Enter your student ID - your name and email are filled in.")
 
         # Display the prompts:
         self.prompt_name = Label(self, text="Enter your full name: ", font=("Arial", 14), padx=5, pady=5)
@@ -58,60 +63,60 @@ class App(Tk):
         self.prompt_id.pack()
         self.id_entry.pack()
 
+        # With a roster, leaving the ID field fills in the name and email
+        self.id_entry.bind("<FocusOut>", self.fill_from_roster)
+
         # Add login button
         self.login_button = Button(self, text="Login to Quiz", font=("Arial", 12, "bold"),
                                    command=self.handle_login, padx=10, pady=5)
         self.login_button.pack(pady=20)
 
-        # Store student data
-        self.student_data = {}
-
     def handle_login(self):
         """Handle the login process"""
-        # Get the entered data
-        name = self.name_entry.get().strip()
-        email = self.email_entry.get().strip()
-        student_id = self.id_entry.get().strip()
-
-        # Basic validation
-        if not name or not email or not student_id:
-            messagebox.showerror("Error", "Please fill in all fields.")
+        # Check the entered data
+        try:
+            student_data = make_student_data(self.name_entry.get(),
+                                             self.email_entry.get(),
+                                             self.id_entry.get(),
+                                             self.controller.roster)
+        except LoginError as error:
+            messagebox.showerror("Error", str(error))
             return
 
-        # Store student data
-        self.student_data = {
-            "name": name,
-            "email": email,
-            "id": student_id
-        }
-
         # Show success message
-        messagebox.showinfo("Login Successful", f"Welcome {name}!\nStarting quiz application...")
+        messagebox.showinfo("Login Successful", f"Welcome {student_data['name']}!\nStarting quiz application...")
 
-        # Close login window and start main quiz app
-        self.destroy()
-        self.start_quiz_app()
+        # Switch to the quiz menu in the same window
+        self.controller.login(student_data)
 
-    def start_quiz_app(self):
-        """Start the main quiz application"""
-        try:
-            # Import and start the main quiz application
-            from app import create_app
-            quiz_app = create_app()
-
-            # Pass student data to the quiz app
-            quiz_app.student_data = self.student_data
+    def fill_from_roster(self, event=None):
+        """Fill in the name and email of the entered student ID from the roster"""
+        if self.controller.roster is None:
+            return
+        student = self.controller.roster.lookup(self.id_entry.get())
+        if student is None:
+            return
+        for entry, value in ((self.name_entry, student["name"]), (self.email_entry, student["email"])):
+            entry.delete(0, END)
+            entry.insert(0, value)
 
-            # Start the quiz app
-            quiz_app.mainloop()
+    def clear_form(self):
+        """Empty the entry fields (used after logout)"""
+        for entry in (self.name_entry, self.email_entry, self.id_entry):
+            entry.delete(0, END)
 
-        except ImportError:
-            messagebox.showerror("Error", "Could not load quiz application. Please ensure app.py is available.")
+    def on_show(self):
+        """Called by the app whenever this page is shown"""
+        self.name_entry.focus_set()
 
 
-def create_login_app():
-    """Create and return a login app instance"""
-    return App()
+def create_login_app(**options):
+    """
+    Create and return the app window, starting at the login page.
+    Keyword options are passed on to app.App (for example adaptive_length=20).
+    """
+    from app import create_app
+    return create_app(start_page="LoginPage", **options)
 
 
 def run_login_app():
@@ -122,4 +127,4 @@ def run_login_app():
 
 # If this module is run directly, start the login app
 if __name__ == "__main__":
-    run_login_app()
\ No newline at end of file
+    run_login_app()
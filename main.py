@@ -3,28 +3,91 @@
 main.py - Main Entry Point for Greenwich University Quiz Application
 
 This is the main module that starts the quiz application.
-It first shows the login screen, then launches the quiz application.
+It opens one window that first shows the login page, then the quiz menu.
 
 Module Structure:
 - main.py (this file) - Entry point that starts login app
-- login_app.py - Contains the login form with user's exact code
-- app.py - Contains the App class and quiz data
+- login_app.py - Contains the login page (a frame inside the app window)
+- app.py - Contains the App class (the one window) and page navigation
 - quiz_components.py - Contains MainMenu and QuizPage classes
 
 Usage:
     python main.py
+    python main.py --adaptive 20
+    python main.py --question-model columnar
+    python main.py --instrument --metrics-file metrics.json
+    python main.py --instrument --metrics-port 9100 --profile quiz.prof
+
+The --instrument options are off by default; see instrumentation.py.
 
 Author: Greenwich University Project
 """
 
+import argparse
+
+from compact_questions import QUESTION_MODELS
+
 # Import the login application module
-from login_app import run_login_app
+from login_app import create_login_app
+
+
+def parse_arguments():
+    """Read the optional instrumentation settings from the command line"""
+    parser = argparse.ArgumentParser(description="Greenwich University Quiz Application")
+    parser.add_argument("--adaptive", type=int, default=None, metavar="LENGTH",
+                        help="adaptive quizzes of LENGTH questions picked to suit each student")
+    parser.add_argument("--question-model", choices=QUESTION_MODELS, default="dicts",
+                        help="how questions are held in memory (slots or columnar use less for large banks)")
+    parser.add_argument("--instrument", action="store_true",
+                        help="record latency histograms of the UI callbacks and the event loop")
+    parser.add_argument("--metrics-file", default=None,
+                        help="write the histograms to this JSON file on exit (with --instrument)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve the histograms on http://127.0.0.1:PORT/metrics (with --instrument)")
+    parser.add_argument("--profile", default=None,
+                        help="save a cProfile capture of the session to this file")
+    return parser.parse_args()
+
+
+def run_app(args):
+    """Open the app window at the login page, with instrumentation if asked for"""
+    instrumentation = None
+    if args.instrument or args.profile:
+        # Only import the instrumentation when it is used
+        from instrumentation import Instrumentation
+        instrumentation = Instrumentation()
+
+    # The app installs the instrumentation before it builds any page
+    app = create_login_app(adaptive_length=args.adaptive, question_model=args.question_model,
+                           instrumentation=instrumentation if args.instrument else None)
+
+    if instrumentation is not None:
+        if args.instrument and args.metrics_port:
+            instrumentation.serve_metrics(args.metrics_port)
+            print("Metrics at http://127.0.0.1:" + str(args.metrics_port) + "/metrics")
+        if args.profile:
+            instrumentation.start_profile()
+
+    try:
+        app.mainloop()
+    finally:
+        if instrumentation is not None:
+            if args.profile:
+                instrumentation.stop_profile(args.profile)
+                print("Profile saved to", args.profile)
+            if args.metrics_file:
+                instrumentation.export_json(args.metrics_file)
+                print("Metrics saved to", args.metrics_file)
+            instrumentation.close()
+
 
 def main():
     """
     Main function that starts the application with login.
-    This function calls the login app which then launches the quiz.
+    This function opens the app window at the login page.
     """
+    args = parse_arguments()
+
     print("=" * 50)
     print("Greenwich University Quiz Application")
     print("=" * 50)
@@ -33,8 +96,8 @@ def main():
     print("=" * 50)
 
     # Run the login application
-    # The login app will handle launching the quiz app after successful login
-    run_login_app()
+    # The login page switches to the quiz menu after a successful login
+    run_app(args)
 
     print("=" * 50)
     print("Application session ended.")
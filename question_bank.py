@@ -0,0 +1,445 @@
+# question_bank.py - Question Bank File Module
+# This module reads and writes question banks stored in a compact indexed file.
+#
+# File layout (all numbers little-endian):
+#
+#   Header (24 bytes):
+#       magic "QBNK", format version (u16), flags (u16),
+#       number of categories (u32), offset of the category table (u64)
+#   Question records:
+#       one compact JSON object per question, e.g.
+#       {"question": "...", "choices": [...], "answer": "..."}
+#   For every category, a question table:
+#       (question count + 1) record offsets (u64); the extra last offset marks
+#       where the final record ends, so record i is bytes [off[i], off[i+1])
+#   followed by the category's answer key:
+#       one byte per question with the index of its correct choice
+#       (answers are checked against the choices when the bank is written)
+#   and the question digests (version 3):
+#       CRC-32 of every question record (u32)
+#   Category table:
+#       one entry per category: question table offset (u64), question count (u32),
+#       category digest (u32, the CRC-32 of its question digests; 0 before version 3)
+#
+# The file is memory-mapped, so opening a bank only reads the header. A category
+# is looked up in the category table when it is first used, and a question is
+# decoded only when it is shown. Startup time and memory do not grow with the
+# size of the bank.
+#
+# The digests let a running app reload a bank that was rewritten (see
+# BankWatcher and diff_banks): unchanged categories are recognised by their
+# digest alone, and in a changed one the question digests are compared in
+# blocks, so finding what changed costs little more than the change itself.
+#
+# Usage:
+#     python question_bank.py build questions.qbk    (write the built-in questions)
+#     python question_bank.py info questions.qbk
+#     python question_bank.py export questions.qbk questions.json
+#     python question_bank.py build questions.qbk --from questions.json
+#
+# Moodle XML, GIFT and JSONL exports are turned into bank files by importers.py.
+#
+# To fix a question while the app is running: export the bank, edit the JSON
+# file and build the bank again; running apps reload it within a few seconds.
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from grading import answer_index, compile_answer_key
+
+BANK_MAGIC = b"QBNK"
+BANK_VERSION = 3
+
+# Version 1 files have no stored answer keys and version 2 files no digests;
+# they can still be read
+SUPPORTED_BANK_VERSIONS = (1, 2, 3)
+
+HEADER_FORMAT = struct.Struct("<4sHHIQ")
+CATEGORY_ENTRY_FORMAT = struct.Struct("<QII")
+OFFSET_FORMAT = struct.Struct("<Q")
+DIGEST_SIZE = 4
+
+# Question digests compared at once when looking for changed questions
+DIFF_BLOCK = 1024
+
+# How often a running app checks whether its bank file was rewritten (seconds)
+BANK_CHECK_SECONDS = 2.0
+
+# Bank file used by the app when no other file is given
+DEFAULT_BANK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "questions.qbk")
+
+
+class BankFormatError(ValueError):
+    """Raised when a file is not a valid question bank"""
+
+
+class BankWriter:
+    """
+    Writes a question bank file one question at a time.
+
+    Questions are written straight to disk, so only their offsets are kept in
+    memory (8 bytes per question). The file is written under a temporary name
+    and moved into place when close() is called, so readers never see a
+    half-written bank.
+
+    Example:
+        with BankWriter("questions.qbk") as writer:
+            writer.start_category()
+            writer.add_question({"question": "...", "choices": [...], "answer": "..."})
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.temp_path = path + ".tmp"
+        self.file = open(self.temp_path, "wb")
+
+        # Reserve room for the header; it is filled in by close()
+        self.file.write(b"\0" * HEADER_FORMAT.size)
+
+        # Offsets of the records in the category being written
+        self.current_offsets = None
+
+        # Correct choice index of every question in the current category
+        self.current_key = None
+
+        # CRC-32 of every question record in the current category
+        self.current_digests = None
+
+        # (question table offset, question count) for every finished category
+        self.category_entries = []
+
+    def start_category(self):
+        """Finish the current category (if any) and start a new, empty one"""
+        self.finish_category()
+        self.current_offsets = array("Q")
+        self.current_key = bytearray()
+        self.current_digests = array("I")
+
+    def add_question(self, question):
+        """
+        Append one question (a dict) to the current category.
+        Raises grading.AnswerKeyError if its answer is not one of its choices.
+        """
+        answer = answer_index(question)
+        self.add_record(json.dumps(question, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), answer)
+
+    def add_record(self, record, answer):
+        """
+        Append one question that is already encoded (its compact JSON record
+        as bytes) with the index of its correct choice to the current category.
+        """
+        if self.current_offsets is None:
+            self.start_category()
+        self.current_key.append(answer)
+        self.current_offsets.append(self.file.tell())
+        self.current_digests.append(zlib.crc32(record))
+        self.file.write(record)
+
+    def finish_category(self):
+        """Write the question table of the current category"""
+        if self.current_offsets is None:
+            return
+        table_offset = self.file.tell()
+        self.current_offsets.append(table_offset)  # End of the last record
+        if sys.byteorder != "little":
+            self.current_offsets.byteswap()
+            self.current_digests.byteswap()
+        self.file.write(self.current_offsets.tobytes())
+        self.file.write(self.current_key)
+        digests = self.current_digests.tobytes()
+        self.file.write(digests)
+        self.category_entries.append((table_offset, len(self.current_offsets) - 1, zlib.crc32(digests)))
+        self.current_offsets = None
+        self.current_key = None
+        self.current_digests = None
+
+    def close(self):
+        """Write the category table and header, then move the file into place"""
+        if self.file is None:
+            return
+        self.finish_category()
+
+        category_table_offset = self.file.tell()
+        for table_offset, count, digest in self.category_entries:
+            self.file.write(CATEGORY_ENTRY_FORMAT.pack(table_offset, count, digest))
+
+        self.file.seek(0)
+        self.file.write(HEADER_FORMAT.pack(BANK_MAGIC, BANK_VERSION, 0,
+                                           len(self.category_entries), category_table_offset))
+        self.file.close()
+        self.file = None
+        os.replace(self.temp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # Something went wrong; throw the partial file away
+            self.file.close()
+            self.file = None
+            os.remove(self.temp_path)
+
+
+def write_bank(path, categories):
+    """Write a list of categories (each a list of question dicts) to a bank file"""
+    with BankWriter(path) as writer:
+        for questions in categories:
+            writer.start_category()
+            for question in questions:
+                writer.add_question(question)
+
+
+class BankCategory:
+    """
+    One category of a memory-mapped bank.
+    Behaves like a read-only list of question dicts; each question is decoded
+    from the file when it is accessed.
+    """
+
+    def __init__(self, bank, table_offset, count, digest):
+        self.bank = bank
+        self.table_offset = table_offset
+        self.count = count
+        self.digest = digest  # None before version 3
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index = index + self.count
+        if index < 0 or index >= self.count:
+            raise IndexError("question index out of range")
+        return json.loads(self.record_bytes(index))
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def record_bytes(self, index):
+        """Return the raw encoded record of question `index`"""
+        position = self.table_offset + index * OFFSET_FORMAT.size
+        start, end = struct.unpack_from("<QQ", self.bank.data, position)
+        return self.bank.data[start:end]
+
+    def answer_key(self):
+        """Return the stored answer key (correct choice index per question) as bytes"""
+        if self.bank.version < 2:
+            return compile_answer_key(self)
+        key_offset = self.table_offset + (self.count + 1) * OFFSET_FORMAT.size
+        return self.bank.data[key_offset:key_offset + self.count]
+
+    def question_digests(self, start, end):
+        """Return the stored digests of questions start..end-1 as raw bytes (version 3)"""
+        digests_offset = self.table_offset + (self.count + 1) * OFFSET_FORMAT.size + self.count
+        return self.bank.data[digests_offset + start * DIGEST_SIZE:digests_offset + end * DIGEST_SIZE]
+
+
+class QuestionBank:
+    """
+    A question bank file opened with mmap.
+    Behaves like a read-only list of categories, so it can be used anywhere
+    the app expects quiz_data (quiz_data[category][question]).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as bank_file:
+            self.data = mmap.mmap(bank_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.data) < HEADER_FORMAT.size:
+            raise BankFormatError(path + " is too small to be a question bank")
+        magic, version, flags, category_count, category_table_offset = \
+            HEADER_FORMAT.unpack_from(self.data, 0)
+        if magic != BANK_MAGIC:
+            raise BankFormatError(path + " is not a question bank file")
+        if version not in SUPPORTED_BANK_VERSIONS:
+            raise BankFormatError(path + " has unsupported bank version " + str(version))
+
+        self.version = version
+        self.category_count = category_count
+        self.category_table_offset = category_table_offset
+
+        # Categories are only looked up when they are first used
+        self.categories = {}
+
+    def __len__(self):
+        return self.category_count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index = index + self.category_count
+        if index < 0 or index >= self.category_count:
+            raise IndexError("category index out of range")
+        category = self.categories.get(index)
+        if category is None:
+            position = self.category_table_offset + index * CATEGORY_ENTRY_FORMAT.size
+            table_offset, count, digest = CATEGORY_ENTRY_FORMAT.unpack_from(self.data, position)
+            if self.version < 3:
+                digest = None
+            category = BankCategory(self, table_offset, count, digest)
+            self.categories[index] = category
+        return category
+
+    def __iter__(self):
+        for index in range(self.category_count):
+            yield self[index]
+
+    def close(self):
+        """Unmap the file"""
+        self.categories = {}
+        self.data.close()
+
+
+def changed_questions(old_category, new_category):
+    """
+    Return the indexes of the questions that differ between two versions of
+    a category (including questions added or removed at the end). Digests
+    are compared DIFF_BLOCK at a time, and only a block that differs is
+    looked at question by question.
+    """
+    common = min(len(old_category), len(new_category))
+    changed = []
+    for start in range(0, common, DIFF_BLOCK):
+        end = min(start + DIFF_BLOCK, common)
+        old_block = old_category.question_digests(start, end)
+        new_block = new_category.question_digests(start, end)
+        if old_block == new_block:
+            continue
+        for index in range(start, end):
+            position = (index - start) * DIGEST_SIZE
+            if old_block[position:position + DIGEST_SIZE] != new_block[position:position + DIGEST_SIZE]:
+                changed.append(index)
+    changed.extend(range(common, max(len(old_category), len(new_category))))
+    return changed
+
+
+def diff_banks(old_bank, new_bank):
+    """
+    Compare two versions of a bank. Returns {category index: [changed
+    question indexes]} for every category that was changed, added or
+    removed. Categories with equal digests are skipped without reading their
+    questions; without digests (banks older than version 3) every question
+    of every category counts as changed.
+    """
+    changes = {}
+    for category_index in range(max(len(old_bank), len(new_bank))):
+        if category_index >= len(old_bank):
+            changes[category_index] = list(range(len(new_bank[category_index])))
+            continue
+        if category_index >= len(new_bank):
+            changes[category_index] = list(range(len(old_bank[category_index])))
+            continue
+        old_category = old_bank[category_index]
+        new_category = new_bank[category_index]
+        if old_category.digest is None or new_category.digest is None:
+            changes[category_index] = list(range(max(len(old_category), len(new_category))))
+        elif old_category.digest != new_category.digest or len(old_category) != len(new_category):
+            changes[category_index] = changed_questions(old_category, new_category)
+    return changes
+
+
+class BankWatcher:
+    """
+    Notices when a bank file has been rewritten (BankWriter replaces the
+    file, which changes its inode, size or modification time).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.loaded_stat = self.current_stat()
+
+    def current_stat(self):
+        """(inode, size, modification time) of the file, or None if it is missing"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def changed(self):
+        """Return the file's new stat if it differs from the loaded one, else None"""
+        stat = self.current_stat()
+        if stat is None or stat == self.loaded_stat:
+            return None
+        return stat
+
+    def mark_loaded(self, stat):
+        """Remember the stat of the version that was loaded"""
+        self.loaded_stat = stat
+
+
+def load_quiz_data(bank_path=None):
+    """
+    Return the quiz data the app should use.
+
+    If bank_path is given, that bank file is opened. Otherwise the default
+    questions.qbk is used if it exists, and if it does not, the built-in
+    questions from quiz_data.py are returned in a QuestionStore (so questions
+    shared by several categories are only kept once).
+    """
+    if bank_path is not None:
+        return QuestionBank(bank_path)
+    if os.path.exists(DEFAULT_BANK_PATH):
+        return QuestionBank(DEFAULT_BANK_PATH)
+
+    from question_store import QuestionStore
+    from quiz_data import QUIZ_DATA
+    return QuestionStore.from_quiz_data(QUIZ_DATA)
+
+
+def main():
+    """Command line tool to build and inspect bank files"""
+    parser = argparse.ArgumentParser(description="Question bank file tool")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="write the built-in questions (or a JSON file) to a bank file")
+    build.add_argument("path", nargs="?", default=DEFAULT_BANK_PATH)
+    build.add_argument("--from", dest="source", default=None,
+                       help="JSON file with a list of categories, each a list of questions")
+
+    export = subparsers.add_parser("export", help="write the questions of a bank file to a JSON file")
+    export.add_argument("path")
+    export.add_argument("out")
+
+    info = subparsers.add_parser("info", help="show the categories in a bank file")
+    info.add_argument("path", nargs="?", default=DEFAULT_BANK_PATH)
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if args.source is not None:
+            with open(args.source, "r", encoding="utf-8") as source_file:
+                categories = json.load(source_file)
+        else:
+            from quiz_data import QUIZ_DATA
+            categories = QUIZ_DATA
+        write_bank(args.path, categories)
+        print("Wrote", sum(len(questions) for questions in categories), "questions to", args.path)
+    elif args.command == "export":
+        bank = QuestionBank(args.path)
+        with open(args.out, "w", encoding="utf-8") as out_file:
+            json.dump([list(category) for category in bank], out_file, ensure_ascii=False, indent=1)
+        print("Wrote", len(bank), "categories to", args.out)
+        bank.close()
+    elif args.command == "info":
+        bank = QuestionBank(args.path)
+        print(args.path + ":", len(bank), "categories")
+        for index, category in enumerate(bank):
+            print("  category", index, "-", len(category), "questions")
+        bank.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# question_store.py - Content-Addressed Question Store Module
+# This module keeps every distinct question once, however many categories
+# use it.
+#
+# Each question is stored under a hash of its content (question text, choices
+# and answer), and a category is just a list of those hashes. The same
+# question appearing in several categories (or in banks merged from several
+# courses) is therefore stored once. All strings are interned, so a choice
+# like "All of the above" is one string object across the whole store, and a
+# question's answer is the same object as its matching choice.
+#
+# A QuestionStore behaves like the app's quiz_data (a list of categories,
+# each a list of question dicts), so it can be used in its place.
+#
+# Usage:
+#     python question_store.py report --repeat 1000
+
+import argparse
+import hashlib
+import json
+import sys
+
+from grading import answer_index
+
+
+def question_hash(question):
+    """
+    Return the content hash of a question dict (hex string).
+    The string is interned, so every reference to the same question shares
+    one string object.
+    """
+    canonical = json.dumps([question["question"], list(question["choices"]), question["answer"]],
+                           ensure_ascii=False, separators=(",", ":"))
+    return sys.intern(hashlib.sha1(canonical.encode("utf-8")).hexdigest())
+
+
+class StoreCategory:
+    """
+    One category of a QuestionStore: a list of question hashes that behaves
+    like a read-only list of question dicts.
+    """
+
+    def __init__(self, store, hashes):
+        self.store = store
+        self.hashes = hashes
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.store.questions[digest] for digest in self.hashes[index]]
+        return self.store.questions[self.hashes[index]]
+
+    def __iter__(self):
+        for digest in self.hashes:
+            yield self.store.questions[digest]
+
+    def answer_key(self):
+        """Return the answer key (correct choice index per question) as bytes"""
+        return bytes(self.store.answer_indexes[digest] for digest in self.hashes)
+
+
+class QuestionStore:
+    """
+    Stores each question once by content hash; categories hold references.
+    Questions are checked when added (grading.AnswerKeyError if the answer
+    is not one of the choices).
+    """
+
+    def __init__(self):
+        # Content hash -> question dict (stored once)
+        self.questions = {}
+
+        # Content hash -> index of the correct choice
+        self.answer_indexes = {}
+
+        # One list of content hashes per category
+        self.categories = []
+
+    @classmethod
+    def from_quiz_data(cls, quiz_data):
+        """Build a store from a list of categories of question dicts"""
+        store = cls()
+        for questions in quiz_data:
+            store.add_category(questions)
+        return store
+
+    def add_question(self, question):
+        """Store a question (if it is new) and return its content hash"""
+        digest = question_hash(question)
+        if digest not in self.questions:
+            choices = [sys.intern(choice) for choice in question["choices"]]
+            stored = {
+                "question": sys.intern(question["question"]),
+                "choices": choices,
+                "answer": sys.intern(question["answer"]),
+            }
+            self.answer_indexes[digest] = answer_index(stored)
+            self.questions[digest] = stored
+        return digest
+
+    def add_category(self, questions):
+        """Add a category of question dicts and return its category index"""
+        self.categories.append(StoreCategory(self, [self.add_question(question) for question in questions]))
+        return len(self.categories) - 1
+
+    def reference_count(self):
+        """Return how many question references all categories hold together"""
+        return sum(len(category) for category in self.categories)
+
+    def __len__(self):
+        return len(self.categories)
+
+    def __getitem__(self, index):
+        return self.categories[index]
+
+    def __iter__(self):
+        return iter(self.categories)
+
+
+def deep_size(value, seen):
+    """
+    Return the memory used by a value and everything it contains, in bytes.
+    Objects whose id is already in `seen` are not counted again, so shared
+    objects are only counted once.
+    """
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size = size + deep_size(key, seen) + deep_size(item, seen)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size = size + deep_size(item, seen)
+    return size
+
+
+def copy_question(question):
+    """Return a fresh copy of a question dict with its own string objects"""
+    def fresh(text):
+        # Build a new string object with the same text (no sharing)
+        return (text + ".")[:-1]
+    return {
+        "question": fresh(question["question"]),
+        "choices": [fresh(choice) for choice in question["choices"]],
+        "answer": fresh(question["answer"]),
+    }
+
+
+def savings_report(quiz_data):
+    """
+    Compare the memory of a dict-of-lists bank (every question and string a
+    separate object, as when it is hand-written or parsed from JSON) with the
+    same bank in a QuestionStore. Returns a results dictionary.
+    """
+    separate = [[copy_question(question) for question in questions] for questions in quiz_data]
+    store = QuestionStore.from_quiz_data(separate)
+
+    plain_bytes = deep_size(separate, set())
+
+    # The store's own structures: unique questions, key table and hash lists
+    store_seen = set()
+    store_bytes = deep_size(store.questions, store_seen) + deep_size(store.answer_indexes, store_seen)
+    for category in store.categories:
+        store_bytes = store_bytes + sys.getsizeof(category) + deep_size(category.hashes, store_seen)
+
+    references = store.reference_count()
+    return {
+        "question_references": references,
+        "unique_questions": len(store.questions),
+        "duplicates_removed": references - len(store.questions),
+        "plain_bytes": plain_bytes,
+        "store_bytes": store_bytes,
+        "bytes_saved": plain_bytes - store_bytes,
+        "percent_saved": 100.0 * (plain_bytes - store_bytes) / plain_bytes if plain_bytes else 0.0,
+    }
+
+
+def main():
+    """Print a report of the memory saved by deduplicating a bank"""
+    parser = argparse.ArgumentParser(description="Question store deduplication report")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    report = subparsers.add_parser("report", help="bytes saved by storing each question once")
+    report.add_argument("--bank", default=None, help="question bank file (default: the app's questions)")
+    report.add_argument("--repeat", type=int, default=1,
+                        help="merge the bank with itself this many times, like several courses "
+                             "sharing questions")
+    args = parser.parse_args()
+
+    from benchmark import print_results
+    from question_bank import load_quiz_data
+
+    quiz_data = [list(questions) for questions in load_quiz_data(args.bank)] * args.repeat
+    print_results("Question store report", savings_report(quiz_data))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,12 @@
 import tkinter as tk
 from tkinter import ttk
 
+from assets import load_logo
+from quiz_data import QUIZ_PAGES
+from review import ReviewList
+from quiz_engine import NO_ANSWER, STEP_FINISHED, STEP_UNANSWERED
+from timers import CLOCK_FINISHED, CLOCK_QUESTION_TIMEOUT, ExamClock, format_seconds
+
 
 class MainMenu(tk.Frame):
     """
@@ -26,12 +32,8 @@ class MainMenu(tk.Frame):
         # Try to show logo; if not found, show text fallback
         # Make the logo smaller and centered
         try:
-            # Load the original image
-            original_logo = tk.PhotoImage(
-                file="/Users/diegofoggi/Desktop/Projects/Questionaire/Quiz_Couersework/greenwich_logo.png"
-            )
-            # Subsample to make it smaller (every 3rd pixel)
-            self.img_logo = original_logo.subsample(3, 3)
+            # Load the shared, already smaller logo image (see assets.py)
+            self.img_logo = load_logo(self)
 
             # Create logo label and center it
             logo_label = tk.Label(content_frame, image=self.img_logo)
@@ -48,12 +50,13 @@ class MainMenu(tk.Frame):
                                font=("Arial", 22, "bold"), fg="darkblue")
         title_label.pack(pady=(5, 10))
 
-        # Student info section (if logged in)
+        # Student info section (only shown while a student is logged in)
         self.create_student_info_section(content_frame)
 
         # Buttons container - centered
         buttons_frame = tk.Frame(content_frame)
         buttons_frame.pack(pady=10)
+        self.buttons_frame = buttons_frame
 
         # Create quiz selection buttons
         button_configs = [
@@ -77,52 +80,136 @@ class MainMenu(tk.Frame):
             )
             btn.pack(pady=8)
 
-    def create_student_info_section(self, parent):
-        """Create section to display logged-in student information"""
-        if hasattr(self.controller, 'student_data') and self.controller.student_data:
-            student_data = self.controller.student_data
+        # Live rankings of every category
+        leaderboard_btn = tk.Button(buttons_frame, text="Leaderboards", width=25,
+                                    font=("Arial", 10), bg="lightyellow", fg="darkblue",
+                                    command=lambda: controller.show_frame("LeaderboardPage"))
+        leaderboard_btn.pack(pady=(16, 8))
 
-            # Student info frame
-            info_frame = tk.Frame(parent, bg="lightblue", relief="solid", bd=1)
-            info_frame.pack(pady=(5, 15), padx=20, fill="x")
+        # Show the student info if someone is already logged in
+        self.refresh_student_info()
 
-            # Welcome message
+    def create_student_info_section(self, parent):
+        """
+        Create section to display logged-in student information.
+        The widgets are created once; refresh_student_info fills them in
+        and shows or hides the section when the student changes.
+        """
+        # Student info frame
+        self.info_frame = tk.Frame(parent, bg="lightblue", relief="solid", bd=1)
+
+        # Welcome message
+        self.welcome_label = tk.Label(self.info_frame, text="",
+                                      font=("Arial", 12, "bold"),
+                                      bg="lightblue", fg="darkblue")
+        self.welcome_label.pack(pady=5)
+
+        # Student details
+        self.details_label = tk.Label(self.info_frame, text="",
+                                      font=("Arial", 10),
+                                      bg="lightblue", fg="darkblue")
+        self.details_label.pack(pady=(0, 5))
+
+        # Logout button
+        logout_btn = tk.Button(self.info_frame, text="Logout",
+                               font=("Arial", 9),
+                               bg="lightcoral", fg="darkred",
+                               command=self.logout)
+        logout_btn.pack(pady=5)
+
+    def refresh_student_info(self):
+        """Show the logged-in student's details, or hide the section if nobody is logged in"""
+        student_data = self.controller.student_data
+        if student_data:
             welcome_text = f"Welcome, {student_data.get('name', 'Student')}!"
-            welcome_label = tk.Label(info_frame, text=welcome_text,
-                                     font=("Arial", 12, "bold"),
-                                     bg="lightblue", fg="darkblue")
-            welcome_label.pack(pady=5)
-
-            # Student details
             details_text = f"ID: {student_data.get('id', 'N/A')} | Email: {student_data.get('email', 'N/A')}"
-            details_label = tk.Label(info_frame, text=details_text,
-                                     font=("Arial", 10),
-                                     bg="lightblue", fg="darkblue")
-            details_label.pack(pady=(0, 5))
-
-            # Logout button
-            logout_btn = tk.Button(info_frame, text="Logout",
-                                   font=("Arial", 9),
-                                   bg="lightcoral", fg="darkred",
-                                   command=self.logout)
-            logout_btn.pack(pady=5)
+            self.welcome_label.config(text=welcome_text)
+            self.details_label.config(text=details_text)
+            self.info_frame.pack(pady=(5, 15), padx=20, fill="x", before=self.buttons_frame)
+        else:
+            self.info_frame.pack_forget()
+
+    def on_show(self):
+        """Called by the app whenever the menu is shown"""
+        self.refresh_student_info()
 
     def logout(self):
         """Handle logout functionality"""
-        # Clear student data
-        self.controller.student_data = {}
+        # Clear student data and return to the login page
+        self.controller.logout()
+
+
+class LeaderboardPage(tk.Frame):
+    """
+    Page that shows the best attempts of one category at a time.
+    The rows come from the app's leaderboards (see leaderboard.py), which
+    keep them up to date as attempts finish.
+    """
+
+    # How many rows are shown
+    TOP_ROWS = 100
+
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+
+        # Title
+        title_label = tk.Label(self, text="Leaderboards",
+                               font=("Arial", 18, "bold"), fg="darkblue")
+        title_label.pack(pady=(10, 5))
+
+        # One button per category; the selected one is remembered here
+        self.category_index = tk.IntVar(value=QUIZ_PAGES[0][2])
+        category_frame = tk.Frame(self)
+        category_frame.pack(pady=5)
+        for key, title, idx in QUIZ_PAGES:
+            tk.Radiobutton(category_frame, text=title, variable=self.category_index, value=idx,
+                           indicatoron=False, font=("Arial", 10), padx=8, pady=4,
+                           command=self.refresh_rows).pack(side="left", padx=2)
+
+        # The rows themselves
+        list_frame = tk.Frame(self)
+        list_frame.pack(fill="both", expand=True, padx=20, pady=5)
+        scrollbar = tk.Scrollbar(list_frame)
+        scrollbar.pack(side="right", fill="y")
+        self.rows_list = tk.Listbox(list_frame, font=("Arial", 11), yscrollcommand=scrollbar.set)
+        self.rows_list.pack(side="left", fill="both", expand=True)
+        scrollbar.config(command=self.rows_list.yview)
+
+        # Back to the menu
+        back_btn = tk.Button(self, text="Back to Menu", font=("Arial", 10),
+                             bg="lightgray", command=lambda: controller.show_frame("MainMenu"))
+        back_btn.pack(pady=10)
+
+        # Rows currently in the list, so an unchanged board is not redrawn
+        self.shown_rows = None
+
+    def refresh_rows(self):
+        """Show the selected category's top rows"""
+        rows = self.controller.leaderboard_rows(self.category_index.get(), self.TOP_ROWS)
+        if rows is self.shown_rows:
+            return
+        self.shown_rows = rows
+        self.rows_list.delete(0, "end")
+        if rows:
+            self.rows_list.insert("end", *rows)
+        else:
+            self.rows_list.insert("end", "No finished attempts yet.")
 
-        # Return to login page
-        self.controller.show_frame("LoginPage")
+    def on_show(self):
+        """Called by the app whenever this page is shown"""
+        self.refresh_rows()
 
 
 class QuizPage(tk.Frame):
     """
     Quiz page class that displays questions and handles user interactions.
     This class creates a quiz page that shows questions and lets users answer them.
+    The quiz state itself (current question, answers, score) lives in a
+    quiz_engine.QuizSession; this class only displays it.
     """
 
-    def __init__(self, parent, controller, category_index, title):
+    def __init__(self, parent, controller, category_index, title, pooled_choices=True):
         """
         Initialize the quiz page with all necessary components.
 
@@ -131,6 +218,9 @@ class QuizPage(tk.Frame):
         - controller: The main app that controls navigation between pages
         - category_index: Which category of questions to show (like 0, 1, 2...)
         - title: The title to display at the top of the quiz
+        - pooled_choices: If True, keep a fixed set of radio buttons and
+          reconfigure them for each question instead of destroying and
+          recreating them (much less widget churn on long sessions)
         """
         # Call the parent class constructor to set up the basic frame
         super().__init__(parent)
@@ -139,21 +229,22 @@ class QuizPage(tk.Frame):
         self.controller = controller
         self.category_index = category_index
         self.title_text = title
+        self.pooled_choices = pooled_choices
 
         # Get the questions for this specific category from the main app
         self.questions = controller.quiz_data[category_index]
 
-        # Count how many questions we have total
-        self.total_questions = len(self.questions)
+        # The headless engine keeps track of the current question and answers.
+        # The app decides what kind of attempt it is (all questions, a random
+        # paper or an adaptive quiz; see App.new_session). An unfinished
+        # attempt of the logged-in student (for example after a crash) is
+        # resumed from its checkpoint instead.
+        self.session = controller.restore_session(category_index)
+        if self.session is None:
+            self.session = controller.new_session(category_index)
 
-        # Keep track of which question we're currently showing (starts at 0)
-        self.current_question = 0
-
-        # Create a list to store the user's answers for each question
-        # We start with -1 for each question, which means "no answer selected yet"
-        self.user_answers = []
-        for i in range(self.total_questions):
-            self.user_answers.append(-1)
+        # Version of the question bank this attempt uses (see App.reload_bank)
+        self.bank_version = controller.bank_version
 
         # Create the header section (title and progress)
         self.create_header_section()
@@ -173,8 +264,33 @@ class QuizPage(tk.Frame):
         # Create the final results display area
         self.create_results_section()
 
-        # Show the first question to start the quiz
+        # Timed exams: the clock runs while the page is shown (see on_show)
+        self.clock = None
+        if controller.exam_seconds is not None or controller.question_seconds is not None:
+            self.clock = ExamClock(controller.timer_wheel, self.session, controller.exam_seconds,
+                                   controller.question_seconds, on_change=self.on_clock_change,
+                                   show_countdown=True)
+
+        # Show the first question to start the quiz (or the question the
+        # student had reached)
         self.show_current_question()
+        if self.current_question > 0:
+            self.feedback_message.config(text="Welcome back - your earlier answers were restored.")
+
+    @property
+    def total_questions(self):
+        """How many questions this quiz has"""
+        return self.session.total_questions
+
+    @property
+    def current_question(self):
+        """Index of the question currently shown (starts at 0)"""
+        return self.session.current_question
+
+    @property
+    def user_answers(self):
+        """The user's answers, -1 for questions not answered yet"""
+        return self.session.user_answers
 
     def create_header_section(self):
         """Create the top section with title and progress indicator"""
@@ -192,6 +308,11 @@ class QuizPage(tk.Frame):
                                        font=("Arial", 12), fg="gray")
         self.progress_label.pack(side="right", padx=12)
 
+        # Countdown of a timed exam (stays empty otherwise)
+        self.timer_label = tk.Label(self.header_frame, text="",
+                                    font=("Arial", 12, "bold"), fg="darkred")
+        self.timer_label.pack(side="right", padx=12)
+
     def create_question_section(self):
         """Create the area where the question text is displayed"""
         self.question_text = tk.Label(self, text="", font=("Arial", 14),
@@ -208,9 +329,14 @@ class QuizPage(tk.Frame):
         self.choices_container = tk.Frame(self)
         self.choices_container.pack(fill="x", padx=24)
 
-        # This list will hold references to all the radio buttons
+        # This list will hold references to the radio buttons of the current question
         self.radio_buttons = []
 
+        # Pool of radio buttons that are reused between questions (pooled mode only).
+        # Only the first self.visible_choice_count buttons of the pool are packed.
+        self.choice_pool = []
+        self.visible_choice_count = 0
+
     def create_feedback_section(self):
         """Create the area where error messages are shown"""
         self.feedback_message = tk.Label(self, text="", fg="red", font=("Arial", 11))
@@ -246,13 +372,21 @@ class QuizPage(tk.Frame):
                                     fg="darkgreen")
         self.result_text.pack(pady=(0, 6))
 
+        # Review of every question, shown in place of the question once the
+        # quiz is finished (created the first time it is needed)
+        self.review_list = None
+        self.review_shown = False
+
     def show_current_question(self):
         """
         This method displays the current question and its answer choices.
         It gets called whenever we need to show a new question.
         """
+        # Put the question back if the review was showing (after a restart)
+        self.hide_review()
+
         # Get the data for the question we're currently showing
-        current_q = self.questions[self.current_question]
+        current_q = self.session.current()
 
         # Update the progress indicator (like "Q 1 / 5")
         question_number = self.current_question + 1  # Add 1 because we count from 1, not 0
@@ -262,38 +396,21 @@ class QuizPage(tk.Frame):
         # Update the question text
         self.question_text.config(text=current_q["question"])
 
-        # Remove any old radio buttons from previous questions
-        for widget in self.choices_container.winfo_children():
-            widget.destroy()
-        self.radio_buttons = []  # Clear our list of radio button references
-
         # If the user already answered this question before, show their previous answer
-        self.selected_answer.set(self.user_answers[self.current_question])
+        self.selected_answer.set(self.session.current_answer())
 
-        # Create new radio buttons for each answer choice
-        choice_index = 0
-        for choice_text in current_q["choices"]:
-            radio_button = tk.Radiobutton(
-                self.choices_container,  # Put it in the choices container
-                text=choice_text,  # The text to display
-                variable=self.selected_answer,  # Which variable tracks the selection
-                value=choice_index,  # The value this button represents
-                anchor="w",  # Align text to the left
-                justify="left",  # Justify text to the left
-                wraplength=520,  # Wrap long text
-                font=("Arial", 11),  # Font for choices
-                fg="darkblue"  # Text color
-            )
-            radio_button.pack(fill="x", pady=4, anchor="w")  # Add it to the container
-            self.radio_buttons.append(radio_button)  # Keep a reference to it
-            choice_index = choice_index + 1  # Move to next choice
+        # Show a radio button for each answer choice
+        if self.pooled_choices:
+            self.update_choice_pool(current_q["choices"])
+        else:
+            self.rebuild_choice_buttons(current_q["choices"])
 
         # Clear any old feedback or result messages
         self.feedback_message.config(text="")
         self.result_text.config(text="")
 
         # Update the next button text depending on if this is the last question
-        if self.current_question == self.total_questions - 1:
+        if self.session.is_last_question():
             self.next_button.config(text="Finish")  # Last question gets "Finish"
         else:
             self.next_button.config(text="Next")  # Other questions get "Next"
@@ -304,6 +421,68 @@ class QuizPage(tk.Frame):
         # Make sure all radio buttons are clickable
         self.enable_answer_choices()
 
+    def create_choice_button(self, choice_text, choice_index):
+        """Create one radio button for an answer choice"""
+        return tk.Radiobutton(
+            self.choices_container,  # Put it in the choices container
+            text=choice_text,  # The text to display
+            variable=self.selected_answer,  # Which variable tracks the selection
+            value=choice_index,  # The value this button represents
+            anchor="w",  # Align text to the left
+            justify="left",  # Justify text to the left
+            wraplength=520,  # Wrap long text
+            font=("Arial", 11),  # Font for choices
+            fg="darkblue"  # Text color
+        )
+
+    def rebuild_choice_buttons(self, choices):
+        """
+        Destroy the old radio buttons and create new ones for the given choices.
+        This is the original (non-pooled) behaviour.
+        """
+        # Remove any old radio buttons from previous questions
+        for widget in self.choices_container.winfo_children():
+            widget.destroy()
+        self.radio_buttons = []  # Clear our list of radio button references
+        self.choice_pool = []  # Any pooled buttons were destroyed above too
+        self.visible_choice_count = 0
+
+        # Create new radio buttons for each answer choice
+        choice_index = 0
+        for choice_text in choices:
+            radio_button = self.create_choice_button(choice_text, choice_index)
+            radio_button.pack(fill="x", pady=4, anchor="w")  # Add it to the container
+            self.radio_buttons.append(radio_button)  # Keep a reference to it
+            choice_index = choice_index + 1  # Move to next choice
+
+    def update_choice_pool(self, choices):
+        """
+        Reuse the pooled radio buttons for the given choices.
+        Buttons are only created when a question has more choices than any
+        question before it; extra buttons are hidden instead of destroyed.
+        """
+        # Grow the pool if this question needs more buttons than we have
+        while len(self.choice_pool) < len(choices):
+            self.choice_pool.append(self.create_choice_button("", len(self.choice_pool)))
+
+        # Update the text of the buttons we need
+        choice_index = 0
+        for choice_text in choices:
+            self.choice_pool[choice_index].config(text=choice_text)
+            choice_index = choice_index + 1
+
+        # Show or hide buttons so exactly len(choices) are visible.
+        # The visible buttons are always the first ones of the pool, so packing
+        # them again in pool order keeps the choices in the right order.
+        for radio_button in self.choice_pool[self.visible_choice_count:len(choices)]:
+            radio_button.pack(fill="x", pady=4, anchor="w")
+        for radio_button in self.choice_pool[len(choices):self.visible_choice_count]:
+            radio_button.pack_forget()
+        self.visible_choice_count = len(choices)
+
+        # Only the visible buttons belong to the current question
+        self.radio_buttons = self.choice_pool[:self.visible_choice_count]
+
     def enable_answer_choices(self):
         """Make all radio buttons clickable"""
         for radio_button in self.radio_buttons:
@@ -319,73 +498,146 @@ class QuizPage(tk.Frame):
         Calculate how many questions the user got right.
         Returns the number of correct answers.
         """
-        correct_answers = 0
-
-        # Go through each question and check if the user got it right
-        question_index = 0
-        for question in self.questions:
-            # Get what the user selected for this question
-            user_choice_index = self.user_answers[question_index]
-
-            # Only check if the user actually selected something
-            if user_choice_index != -1:
-                # Get the text of what the user selected
-                user_choice_text = question["choices"][user_choice_index]
-                # Get the correct answer
-                correct_answer = question["answer"]
-                # Check if they match
-                if user_choice_text == correct_answer:
-                    correct_answers = correct_answers + 1
-
-            question_index = question_index + 1
-
-        return correct_answers
+        return self.session.calculate_final_score()
 
     def go_to_next_question(self):
         """
         This method runs when the user clicks the Next or Finish button.
         It either moves to the next question or finishes the quiz.
         """
-        # Check if the user selected an answer
-        selected_choice = self.selected_answer.get()
-        if selected_choice == -1:
+        # Let the engine save the answer and move on
+        answered_index = self.current_question
+        step = self.session.go_to_next_question(self.selected_answer.get())
+
+        if step == STEP_UNANSWERED:
             # If no answer selected, show an error message and don't continue
             self.feedback_message.config(text="Please select an option before continuing.")
-            return
-
-        # Save the user's answer for this question
-        self.user_answers[self.current_question] = selected_choice
-
-        # Check if this is the last question
-        if self.current_question == self.total_questions - 1:
-            # Quiz is finished - calculate and show the final score
-            final_score = self.calculate_final_score()
-            score_text = "Your score: " + str(final_score) + " / " + str(self.total_questions)
-            self.result_text.config(text=score_text)
-
-            # Disable the next button and radio buttons since quiz is done
-            self.next_button.config(state="disabled")
-            self.disable_answer_choices()
+        elif step == STEP_FINISHED:
+            # Quiz is finished - save the attempt and show the final score
+            self.show_final_score()
         else:
-            # Not the last question - move to the next one
-            self.current_question = self.current_question + 1
+            # Not the last question - checkpoint the answer and show the next one
+            self.controller.checkpoint_answer(self.category_index, self.session, answered_index)
+            if self.clock is not None:
+                self.clock.question_started()
+            self.show_current_question()
+
+    def show_final_score(self):
+        """Save the finished attempt and show the final score"""
+        if self.clock is not None:
+            self.clock.stop()
+        self.controller.record_attempt(self.category_index, self.session)
+        score_text = "Your score: " + str(self.session.final_score) + " / " + str(self.total_questions)
+        self.result_text.config(text=score_text)
+
+        # Disable the next button and radio buttons since quiz is done
+        self.next_button.config(state="disabled")
+        self.disable_answer_choices()
+        self.update_timer_label()
+
+        # Show every question with the student's answer and the correct one
+        self.show_review()
+
+    def show_review(self):
+        """Replace the question and choices with the review list"""
+        if self.review_list is None:
+            self.review_list = ReviewList(self)
+        if not self.review_shown:
+            self.question_text.pack_forget()
+            self.choices_container.pack_forget()
+            self.review_list.pack(fill="both", expand=True, padx=16, pady=(12, 0), before=self.feedback_message)
+            self.review_shown = True
+        self.progress_label.config(text="Review")
+        self.review_list.show(self.session)
+
+    def hide_review(self):
+        """Put the question and choices back in place of the review list"""
+        if not self.review_shown:
+            return
+        self.review_list.pack_forget()
+        self.question_text.pack(padx=16, pady=16, anchor="w", before=self.feedback_message)
+        self.choices_container.pack(fill="x", padx=24, before=self.feedback_message)
+        self.review_shown = False
+
+    def on_clock_change(self, event):
+        """Called by the exam clock every second and when time runs out"""
+        if event == CLOCK_FINISHED:
+            self.show_final_score()
+            self.feedback_message.config(text="Time is up - your answers were submitted.")
+        elif event == CLOCK_QUESTION_TIMEOUT:
+            # The question was left unanswered; checkpoint that and show the next one
+            self.controller.checkpoint_answer(self.category_index, self.session, self.current_question - 1)
             self.show_current_question()
+            self.feedback_message.config(text="Time is up for that question - it was left unanswered.")
+        self.update_timer_label()
+
+    def update_timer_label(self):
+        """Show the time left for the exam and for the current question"""
+        if self.clock is None or self.session.finished:
+            self.timer_label.config(text="")
+            return
+        parts = []
+        exam_remaining = self.clock.exam_remaining()
+        if exam_remaining is not None:
+            parts.append("Time left " + format_seconds(exam_remaining))
+        question_remaining = self.clock.question_remaining()
+        if question_remaining is not None:
+            parts.append("Question " + format_seconds(question_remaining))
+        self.timer_label.config(text="  ".join(parts))
 
     def restart_quiz(self):
         """
         Reset the quiz back to the beginning.
         This clears all answers and goes back to the first question.
         """
-        # Go back to the first question
-        self.current_question = 0
+        # Go back to the first question and clear all the user's answers.
+        # If the bank was reloaded since the attempt started, the new
+        # attempt gets the new questions.
+        if self.bank_version != self.controller.bank_version:
+            self.use_session(self.controller.new_session(self.category_index))
+        else:
+            self.session.restart_quiz()
+        self.controller.discard_checkpoint(self.category_index)
 
-        # Clear all the user's answers
-        for i in range(self.total_questions):
-            self.user_answers[i] = -1
+        # A restarted attempt gets the full time again
+        if self.clock is not None:
+            self.clock.start()
 
         # Show the first question again
         self.show_current_question()
 
+    def use_session(self, session):
+        """Switch to a new attempt built from the app's current questions"""
+        if self.clock is not None:
+            self.clock.stop()
+            self.clock.session = session
+        self.session = session
+        self.questions = self.controller.quiz_data[self.category_index]
+        self.bank_version = self.controller.bank_version
+        # The old attempt may have been the last one on a replaced bank file
+        self.controller.close_unused_banks()
+
+    def refresh_questions(self):
+        """
+        Called by the app when this category changed in a reloaded bank.
+        If the student has not started yet, the page switches to the new
+        questions right away; an attempt under way (or a score on screen)
+        is left alone and gets the new questions when it is restarted.
+        Returns True if the page was refreshed.
+        """
+        if self.category_index >= len(self.controller.quiz_data):
+            return False
+        started = (self.session.finished or self.current_question > 0
+                   or self.session.current_answer() != NO_ANSWER)
+        if started:
+            return False
+        clock_running = self.clock is not None and self.clock.running()
+        self.use_session(self.controller.new_session(self.category_index))
+        if clock_running:
+            self.clock.start()
+        self.show_current_question()
+        return True
+
     def go_back_to_menu(self):
         """
         Go back to the main menu.
@@ -393,6 +645,23 @@ class QuizPage(tk.Frame):
         """
         # Reset the quiz so it's clean next time
         self.restart_quiz()
+
+        # The clock only runs while the quiz is on screen
+        if self.clock is not None:
+            self.clock.stop()
+
         # Tell the main app to show the main menu
         self.controller.show_frame("MainMenu")
 
+    def on_show(self):
+        """Called by the app whenever this page is shown: start the exam clock"""
+        if self.clock is not None and not self.clock.running() and not self.session.finished:
+            self.clock.start()
+            self.update_timer_label()
+
+    def destroy(self):
+        """Stop the exam clock when the page is removed (logout or eviction)"""
+        if self.clock is not None:
+            self.clock.stop()
+        super().destroy()
+
@@ -0,0 +1,166 @@
+# quiz_engine.py - Headless Quiz Engine Module
+# This module contains the QuizSession class, which holds the state of one quiz
+# attempt (current question, answers, score) without any tkinter code.
+# QuizPage uses it to drive the window, and servers, command line tools and
+# load tests can use it directly.
+
+import time
+
+from grading import answer_key_for
+
+# Value stored in user_answers for a question that has not been answered yet
+NO_ANSWER = -1
+
+# Results returned by QuizSession.go_to_next_question
+STEP_UNANSWERED = "unanswered"  # No choice was given, nothing changed
+STEP_NEXT = "next"  # Answer saved, moved on to the next question
+STEP_FINISHED = "finished"  # Answer saved on the last question, quiz is over
+
+
+class QuizSession:
+    """
+    One student's attempt at one category of questions.
+
+    `questions` is any list-like object of question dicts with "question",
+    "choices" and "answer" keys (a list from quiz_data.py or a category of a
+    question_bank.QuestionBank both work).
+
+    `answer_key` is the category's compiled key (see grading.py). If it is not
+    given it is compiled from the questions, which also validates them.
+    """
+
+    def __init__(self, questions, answer_key=None):
+        self.questions = questions
+        self.total_questions = len(questions)
+
+        # Index of the correct choice for every question
+        if answer_key is None:
+            answer_key = answer_key_for(questions)
+        self.answer_key = answer_key
+
+        # Keep track of which question we're currently showing (starts at 0)
+        self.current_question = 0
+
+        # One entry per question, NO_ANSWER until the user picks a choice
+        self.user_answers = [NO_ANSWER] * self.total_questions
+
+        # Set once the last question has been answered
+        self.finished = False
+        self.final_score = None
+
+        # Timings: wall-clock start/finish of the attempt, and seconds spent
+        # on each question (time between moving onto it and answering it)
+        self.started_at = time.time()
+        self.finished_at = None
+        self.question_seconds = [0.0] * self.total_questions
+        self.question_shown_at = time.monotonic()
+
+    def current(self):
+        """Return the question dict that is currently being shown"""
+        return self.questions[self.current_question]
+
+    def is_last_question(self):
+        """Return True if the current question is the last one"""
+        return self.current_question == self.total_questions - 1
+
+    def current_answer(self):
+        """Return the saved answer for the current question (or NO_ANSWER)"""
+        return self.user_answers[self.current_question]
+
+    def go_to_next_question(self, choice_index):
+        """
+        Save the answer to the current question and move on.
+
+        Returns STEP_UNANSWERED if choice_index is NO_ANSWER (nothing changes),
+        STEP_FINISHED if this was the last question (the score is calculated and
+        stored in final_score), or STEP_NEXT otherwise.
+        """
+        if self.finished:
+            return STEP_FINISHED
+        if choice_index == NO_ANSWER:
+            return STEP_UNANSWERED
+
+        # Save the user's answer for this question
+        self.user_answers[self.current_question] = choice_index
+
+        # Add the time spent on this question
+        now = time.monotonic()
+        self.question_seconds[self.current_question] += now - self.question_shown_at
+        self.question_shown_at = now
+
+        if self.is_last_question():
+            return self.finish()
+
+        self.current_question = self.current_question + 1
+        return STEP_NEXT
+
+    def skip_question(self):
+        """
+        Move on without an answer (the question's time limit ran out).
+        Returns STEP_FINISHED if this was the last question, else STEP_NEXT.
+        """
+        if self.finished:
+            return STEP_FINISHED
+        now = time.monotonic()
+        self.question_seconds[self.current_question] += now - self.question_shown_at
+        self.question_shown_at = now
+
+        if self.is_last_question():
+            return self.finish()
+        self.current_question = self.current_question + 1
+        return STEP_NEXT
+
+    def finish(self):
+        """
+        End the attempt now (after the last question, or when the exam's time
+        is up) and calculate the score. Unanswered questions count as wrong.
+        """
+        if not self.finished:
+            self.finished = True
+            self.finished_at = time.time()
+            self.final_score = self.calculate_final_score()
+        return STEP_FINISHED
+
+    def restart_quiz(self):
+        """Go back to the first question and clear all answers"""
+        self.current_question = 0
+        for i in range(self.total_questions):
+            self.user_answers[i] = NO_ANSWER
+            self.question_seconds[i] = 0.0
+        self.finished = False
+        self.final_score = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.question_shown_at = time.monotonic()
+
+    def resume(self, answers, started_at):
+        """
+        Put back the saved (choice, seconds) answers of an unfinished attempt
+        (see checkpoints.py); the student continues at the next question.
+        """
+        for question_index, (choice_index, seconds) in enumerate(answers):
+            self.user_answers[question_index] = choice_index
+            self.question_seconds[question_index] = seconds
+        self.current_question = len(answers)
+        self.started_at = started_at
+        self.question_shown_at = time.monotonic()
+
+    def correct_choice(self, index):
+        """Return the index of the correct choice of question `index` (as shown)"""
+        return self.answer_key[index]
+
+    def calculate_final_score(self):
+        """
+        Calculate how many questions the user got right.
+        Returns the number of correct answers.
+        """
+        correct_answers = 0
+
+        # Compare each answer with the correct choice index (no string
+        # comparisons and no need to look at the questions themselves).
+        # Unanswered questions are -1, which never matches the key.
+        for user_choice_index, correct_index in zip(self.user_answers, self.answer_key):
+            if user_choice_index == correct_index:
+                correct_answers = correct_answers + 1
+
+        return correct_answers
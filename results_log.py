@@ -0,0 +1,284 @@
+# results_log.py - Results Write-Ahead Log Module
+# This module stores every finished quiz attempt in an append-only log file,
+# so scores are not lost when the window closes.
+#
+# Each record is written as:
+#     length of the payload (u32), CRC32 of the payload (u32), JSON payload
+# A crash can only leave a partly written record at the very end of the file;
+# when the log is opened again that torn tail is detected by its length or CRC
+# and cut off, and every complete record before it is kept.
+#
+# Writes use group commit: append() hands the record to a single writer
+# thread and returns a Future. The writer takes everything that has queued up
+# (from any number of sessions), writes it with one write() call and one
+# fsync, then completes all of those Futures together. When many students
+# finish at the same moment they share one fsync instead of waiting for one
+# each.
+#
+# Several app windows may log to the same file. Every writer takes an
+# exclusive lock on the file (fcntl.flock) to recover it and to commit a
+# group, so records from different processes never interleave and a writer
+# only ever cuts off bytes it wrote itself or the torn tail of a writer that
+# crashed. Where fcntl is missing (Windows) there is no lock, and only one
+# app at a time may write to a log.
+
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: no locking, one writer per log (see above)
+
+RECORD_HEADER = struct.Struct("<II")
+
+# Default log file, next to this module
+DEFAULT_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.wal")
+
+
+def encode_record(record):
+    """Return the bytes written to the log for one record (a dict)"""
+    payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_records(path, start_offset=0):
+    """
+    Yield (end offset, record) for every complete record in a log file,
+    starting at byte `start_offset` (the end offset of a record read before).
+    Stops at the first torn or corrupt record.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as log_file:
+        log_file.seek(start_offset)
+        offset = start_offset
+        while True:
+            header = log_file.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            length, checksum = RECORD_HEADER.unpack(header)
+            payload = log_file.read(length)
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                return
+            offset = offset + RECORD_HEADER.size + length
+            yield offset, json.loads(payload)
+
+
+def replay(path):
+    """Yield every complete record stored in a log file, oldest first"""
+    for offset, record in read_records(path):
+        yield record
+
+
+def make_attempt_record(student_data, category_index, session):
+    """
+    Build the log record for one finished QuizSession.
+    For a sampled paper only its seed and size are stored ("paper"); the
+    paper can be rebuilt from them with sampling.rebuild_paper.
+    """
+    paper = None
+    if hasattr(session.questions, "params"):
+        paper = session.questions.params()
+    return {
+        "student": student_data,
+        "category": category_index,
+        "answers": list(session.user_answers),
+        "score": session.final_score,
+        "total": session.total_questions,
+        "started_at": session.started_at,
+        "finished_at": session.finished_at,
+        "question_seconds": [round(seconds, 3) for seconds in session.question_seconds],
+        "paper": paper,
+        # Ability estimate of an adaptive attempt (see adaptive.py)
+        "ability": round(session.ability.theta, 4) if hasattr(session, "ability") else None,
+    }
+
+
+class ResultLog:
+    """
+    Append-only, crash-safe log of finished attempts with group commit.
+
+    Parameters:
+    - path: log file
+    - fsync: if True every group commit is fsync'ed before its Futures
+      complete (durable against power loss); if False data is only flushed
+      to the operating system (survives an app crash, not a power cut)
+    - commit_delay: seconds the writer waits after the first record of a
+      group to let more records join it (0 means commit whatever is queued)
+    - max_batch: largest number of records in one group commit
+    """
+
+    def __init__(self, path=DEFAULT_LOG_PATH, fsync=True, commit_delay=0.0, max_batch=1000):
+        self.path = path
+        self.fsync = fsync
+        self.commit_delay = commit_delay
+        self.max_batch = max_batch
+
+        # Unbuffered, so a failed group cannot leave bytes behind in a buffer
+        # that would go out with the next group
+        self.file = open(path, "ab", buffering=0)
+
+        # Recover: count the good records and cut off a torn tail. Under the
+        # lock no other writer is half way through a record, so a torn tail
+        # can only be left by a crash.
+        self.lock()
+        try:
+            self.recovered_count, good_size = self.recover()
+            self.file.truncate(good_size)
+        finally:
+            self.unlock()
+
+        # Size of the file known to hold only complete records; what other
+        # writers append after it is checked before the next group
+        self.checked_size = good_size
+
+        # (start, end) of a failed group that could not be cut off at once
+        self.failed_group = None
+
+        self.pending = queue.Queue()
+        self.closed = False
+        self.writer = threading.Thread(target=self.write_loop, name="results-log-writer", daemon=True)
+        self.writer.start()
+
+    def lock(self):
+        """Take the exclusive lock on the log file (waits for other writers)"""
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+
+    def unlock(self):
+        """Release the lock taken by lock()"""
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+
+    def check_tail(self):
+        """
+        With the lock held: read the records appended since checked_size (by
+        other writers) and cut off a torn tail after them. Returns the new
+        checked_size, where this writer's next group goes.
+        """
+        size = os.fstat(self.file.fileno()).st_size
+        if self.failed_group is not None:
+            # Cut off the failed group, unless other writers have appended
+            # after it (their records must not be cut off with it)
+            start, end = self.failed_group
+            if size == end:
+                self.file.truncate(start)
+                size = start
+            self.failed_group = None
+        if size != self.checked_size:
+            good_size = self.checked_size
+            for offset, record in read_records(self.path, self.checked_size):
+                good_size = offset
+            if good_size < size:
+                self.file.truncate(good_size)
+            self.checked_size = good_size
+        return self.checked_size
+
+    def recover(self):
+        """Return (number of complete records, size of the good part of the file)"""
+        count = 0
+        good_size = 0
+        for offset, record in read_records(self.path):
+            count = count + 1
+            good_size = offset
+        return count, good_size
+
+    def replay(self):
+        """Yield every record that was in the log when it was opened, oldest first"""
+        for index, record in enumerate(replay(self.path)):
+            if index >= self.recovered_count:
+                return
+            yield record
+
+    def append(self, record):
+        """
+        Queue one record for writing and return a Future that completes once
+        it is committed (result() raises if the write failed).
+        """
+        if self.closed:
+            raise ValueError("results log is closed")
+        future = Future()
+        self.pending.put((encode_record(record), future))
+        return future
+
+    def write_loop(self):
+        """Writer thread: commit queued records in groups until closed"""
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            group = [item]
+
+            # Let more records join this group
+            if self.commit_delay:
+                time.sleep(self.commit_delay)
+            while len(group) < self.max_batch:
+                try:
+                    item = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Commit what we have, then stop
+                    self.commit(group)
+                    return
+                group.append(item)
+
+            self.commit(group)
+
+    def commit(self, group):
+        """
+        Write one group of (bytes, Future) pairs and complete the Futures.
+        If the write fails, whatever part of the group reached the file is cut
+        off again, so records reported as failed never show up in the log and
+        later records are not stuck behind a torn one. If even that fails,
+        it is tried again by the next check_tail.
+        """
+        data = memoryview(b"".join(data for data, future in group))
+        group_size = len(data)
+        error = None
+        try:
+            self.lock()
+        except OSError as lock_error:
+            error = lock_error
+        else:
+            group_start = None
+            try:
+                group_start = self.check_tail()
+                while data:
+                    # A raw write may write only part of the data
+                    data = data[self.file.write(data):]
+                if self.fsync:
+                    os.fsync(self.file.fileno())
+                self.checked_size = group_start + group_size
+            except OSError as write_error:
+                error = write_error
+                if group_start is not None:
+                    written = group_size - len(data)
+                    try:
+                        # Only this writer has written since group_start
+                        self.file.truncate(group_start)
+                    except OSError:
+                        self.failed_group = (group_start, group_start + written)
+            finally:
+                self.unlock()
+        for data, future in group:
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+    def close(self):
+        """Commit everything still queued and close the file"""
+        if self.closed:
+            return
+        self.closed = True
+        self.pending.put(None)
+        self.writer.join()
+        self.file.close()
@@ -0,0 +1,189 @@
+# review.py - Answer Review Module
+# This module contains the review list shown at the end of a quiz: one row
+# per question with the student's choice and the correct answer.
+#
+# Exams can have hundreds of questions, so the list is virtualized: it only
+# has enough row widgets to fill the visible area (plus one), placed inside
+# a fixed viewport. Scrolling moves the rows, and a row that scrolls out of
+# view is reused for the question that scrolls in, so the number of widgets,
+# the memory used and the work per scroll step stay the same for 10 or 500
+# questions. Question i always goes into row i % (number of rows), so
+# scrolling by one row only fills in one row; the others just move.
+#
+# The rows are filled in from the session (quiz_engine.QuizSession or
+# adaptive.AdaptiveSession) when they come into view, so questions stored
+# in a bank file are only decoded if the student scrolls to them.
+
+import tkinter as tk
+
+from quiz_engine import NO_ANSWER
+
+# Height of one row in pixels, and rows scrolled by one mouse wheel step
+ROW_HEIGHT = 52
+WHEEL_ROWS = 3
+
+# Longest question text shown in a row (the rest is cut off)
+MAX_TEXT_LENGTH = 200
+
+# Row colours for right and wrong answers
+CORRECT_COLOUR = "#e3f4e3"
+WRONG_COLOUR = "#f8e1e1"
+
+
+def shorten(text, limit=MAX_TEXT_LENGTH):
+    """Cut a long text to `limit` characters, ending with an ellipsis"""
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1] + "…"
+
+
+def review_row(session, index):
+    """
+    Return (question text, the student's choice, the correct choice, correct?)
+    for question `index` of a finished session, with choices as shown to the
+    student (sampled papers shuffle them).
+    """
+    question = session.questions[index]
+    choices = question["choices"]
+    chosen = session.user_answers[index]
+    correct = session.correct_choice(index)
+    chosen_text = choices[chosen] if chosen != NO_ANSWER else "(no answer)"
+    return question["question"], chosen_text, choices[correct], chosen == correct
+
+
+class ReviewList(tk.Frame):
+    """
+    Scrollable list of review rows that only creates widgets for the rows
+    that fit in view.
+
+    Call show(session) to fill it with a finished session.
+    """
+
+    def __init__(self, parent, row_height=ROW_HEIGHT, height=300):
+        super().__init__(parent)
+        self.row_height = row_height
+
+        # The viewport clips the rows; the scrollbar drives the offset
+        self.viewport = tk.Frame(self, height=height, bd=1, relief="sunken")
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.scrollbar = tk.Scrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.session = None
+        self.count = 0
+        self.offset = 0  # Pixels scrolled from the top
+        self.viewport_height = height
+
+        # Reused row widgets, and the question index each one shows (None if empty)
+        self.rows = []
+        self.row_indexes = []
+
+        self.viewport.bind("<Configure>", self.on_resize)
+        self.bind_wheel(self.viewport)
+
+    def bind_wheel(self, widget):
+        """Scroll with the mouse wheel over a widget (Windows/macOS and X11 events)"""
+        widget.bind("<MouseWheel>", self.on_wheel)
+        widget.bind("<Button-4>", lambda event: self.scroll_rows(-WHEEL_ROWS))
+        widget.bind("<Button-5>", lambda event: self.scroll_rows(WHEEL_ROWS))
+
+    def create_row(self):
+        """Create one reusable row: the question on top, the answers below"""
+        row = tk.Frame(self.viewport, bd=0)
+        row.question_label = tk.Label(row, text="", font=("Arial", 10, "bold"), anchor="w", justify="left")
+        row.question_label.pack(fill="x", padx=6, pady=(4, 0))
+        row.answer_label = tk.Label(row, text="", font=("Arial", 10), anchor="w", justify="left")
+        row.answer_label.pack(fill="x", padx=6)
+        for widget in (row, row.question_label, row.answer_label):
+            self.bind_wheel(widget)
+        return row
+
+    def show(self, session):
+        """Show the questions of a finished session, scrolled to the top"""
+        self.session = session
+        self.count = len(session.questions)
+        self.offset = 0
+        for slot, row in enumerate(self.rows):
+            if self.row_indexes[slot] is not None:
+                row.place_forget()
+                self.row_indexes[slot] = None
+        self.redraw()
+
+    def on_resize(self, event):
+        """The viewport changed size: make sure there are enough rows to fill it"""
+        self.viewport_height = event.height
+        self.redraw()
+
+    def max_offset(self):
+        """Largest scroll offset (the last row at the bottom of the view)"""
+        return max(self.count * self.row_height - self.viewport_height, 0)
+
+    def redraw(self):
+        """Place the rows for the current offset, filling in rows that now show another question"""
+        # One more row than fits, for the partly visible rows at both edges
+        needed = min(self.viewport_height // self.row_height + 2, self.count)
+        while len(self.rows) < needed:
+            self.rows.append(self.create_row())
+            self.row_indexes.append(None)
+        slots = max(len(self.rows), 1)
+
+        self.offset = min(max(self.offset, 0), self.max_offset())
+        first = self.offset // self.row_height
+        last = min(first + needed, self.count)
+        showing = set()
+        for index in range(first, last):
+            slot = index % slots
+            showing.add(slot)
+            row = self.rows[slot]
+            if self.row_indexes[slot] != index:
+                self.fill_row(row, index)
+                self.row_indexes[slot] = index
+            row.place(x=0, y=index * self.row_height - self.offset, relwidth=1, height=self.row_height)
+
+        # Rows that are not needed right now are hidden, not destroyed
+        for slot, row in enumerate(self.rows):
+            if slot not in showing and self.row_indexes[slot] is not None:
+                row.place_forget()
+                self.row_indexes[slot] = None
+
+        self.update_scrollbar()
+
+    def fill_row(self, row, index):
+        """Put question `index` into a row widget"""
+        question_text, chosen_text, correct_text, is_correct = review_row(self.session, index)
+        colour = CORRECT_COLOUR if is_correct else WRONG_COLOUR
+        row.config(bg=colour)
+        row.question_label.config(text=str(index + 1) + ". " + shorten(question_text), bg=colour)
+        if is_correct:
+            answer_text = "Your answer: " + shorten(chosen_text) + "  ✔"
+        else:
+            answer_text = "Your answer: " + shorten(chosen_text) + "   Correct: " + shorten(correct_text)
+        row.answer_label.config(text=answer_text, bg=colour, fg="darkgreen" if is_correct else "darkred")
+
+    def update_scrollbar(self):
+        """Show which part of the list is in view"""
+        total = self.count * self.row_height
+        if total <= self.viewport_height:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.viewport_height) / total)
+
+    def scroll_rows(self, rows):
+        """Scroll by a number of rows (negative scrolls up)"""
+        self.offset = self.offset + rows * self.row_height
+        self.redraw()
+
+    def on_wheel(self, event):
+        """Mouse wheel (Windows and macOS report a delta)"""
+        self.scroll_rows(-WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS)
+
+    def yview(self, *args):
+        """Scrollbar callback: ("moveto", fraction) or ("scroll", n, "units"/"pages")"""
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self.count * self.row_height)
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount = amount * max(self.viewport_height // self.row_height - 1, 1)
+            self.offset = self.offset + amount * self.row_height
+        self.redraw()
@@ -0,0 +1,283 @@
+# roster.py - Student Roster Index Module
+# This module checks student IDs at login against the list of enrolled
+# students, and looks up their name and email.
+#
+# The roster comes as a CSV export (columns for the student ID, name and
+# email). It is turned once into an index file, which the app memory-maps:
+#
+#   Header (32 bytes):
+#       magic "QROS", format version (u16), flags (u16),
+#       number of students (u32), number of slots (u32, a power of two),
+#       offset of the slot table (u64), reserved (u64)
+#   Student records:
+#       lengths of the ID, name and email (u16 each), then the three UTF-8 strings
+#   Slot table (a hash table with linear probing, at most half full):
+#       one entry per slot: hash of the student ID (u64), record offset (u64);
+#       offset 0 marks an empty slot
+#
+# Opening the index only reads the header, and a lookup hashes the ID and
+# reads one or two slots and one record, so a login costs the same for 200
+# or 200k students, and nothing is scanned or loaded at startup.
+#
+# Usage:
+#     python roster.py build students.csv        (writes roster.idx)
+#     python roster.py lookup 001234567
+#     python roster.py benchmark --students 200000
+
+import argparse
+import csv
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+
+ROSTER_MAGIC = b"QROS"
+ROSTER_VERSION = 1
+
+HEADER_FORMAT = struct.Struct("<4sHHIIQQ")
+RECORD_LENGTHS = struct.Struct("<HHH")
+SLOT_FORMAT = struct.Struct("<QQ")
+
+# Roster index used by the app when no other file is given
+DEFAULT_ROSTER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "roster.idx")
+
+# Accepted CSV column names (compared in lower case)
+ID_COLUMNS = ("id", "student_id", "student id", "studentid")
+NAME_COLUMNS = ("name", "full_name", "full name")
+EMAIL_COLUMNS = ("email", "e-mail", "email address")
+
+
+class RosterFormatError(ValueError):
+    """Raised when a file is not a valid roster CSV or roster index"""
+
+
+def id_hash(student_id):
+    """Return the 64-bit hash of a student ID (the same on every run, unlike hash())"""
+    digest = hashlib.blake2b(student_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def find_column(fieldnames, names):
+    """Return the CSV column whose name is one of `names`"""
+    for fieldname in fieldnames:
+        if fieldname is not None and fieldname.strip().lower() in names:
+            return fieldname
+    raise RosterFormatError("the roster CSV needs a column named one of: " + ", ".join(names))
+
+
+def read_roster_csv(csv_path):
+    """Yield (student ID, name, email) for every row of a roster CSV export"""
+    with open(csv_path, "r", newline="", encoding="utf-8-sig") as csv_file:
+        reader = csv.DictReader(csv_file)
+        if reader.fieldnames is None:
+            return
+        id_column = find_column(reader.fieldnames, ID_COLUMNS)
+        name_column = find_column(reader.fieldnames, NAME_COLUMNS)
+        email_column = find_column(reader.fieldnames, EMAIL_COLUMNS)
+        for row in reader:
+            student_id = (row[id_column] or "").strip()
+            if student_id:
+                yield student_id, (row[name_column] or "").strip(), (row[email_column] or "").strip()
+
+
+def build_roster(students, index_path=DEFAULT_ROSTER_PATH):
+    """
+    Write a roster index from (student ID, name, email) tuples.
+    Records are streamed to disk; only the ID hashes and offsets are kept in
+    memory to build the slot table. If an ID appears more than once the first
+    row wins. Returns (number of students, number of duplicate rows skipped).
+    """
+    hashes = array("Q")
+    offsets = array("Q")
+    seen = set()
+    duplicates = 0
+
+    temp_path = index_path + ".tmp"
+    with open(temp_path, "wb") as index_file:
+        index_file.write(b"\0" * HEADER_FORMAT.size)
+        offset = HEADER_FORMAT.size
+        for student_id, name, email in students:
+            if student_id in seen:
+                duplicates = duplicates + 1
+                continue
+            seen.add(student_id)
+            parts = [text.encode("utf-8") for text in (student_id, name, email)]
+            record = RECORD_LENGTHS.pack(*[len(part) for part in parts]) + b"".join(parts)
+            index_file.write(record)
+            hashes.append(id_hash(student_id))
+            offsets.append(offset)
+            offset = offset + len(record)
+
+        # At least twice as many slots as students keeps probe sequences short
+        slot_count = 1
+        while slot_count < 2 * len(hashes):
+            slot_count = slot_count * 2
+        slots = array("Q", bytes(16 * slot_count))
+        mask = slot_count - 1
+        for student_hash, record_offset in zip(hashes, offsets):
+            slot = student_hash & mask
+            while slots[2 * slot + 1] != 0:
+                slot = (slot + 1) & mask
+            slots[2 * slot] = student_hash
+            slots[2 * slot + 1] = record_offset
+
+        slot_table_offset = offset
+        index_file.write(slots.tobytes())
+        index_file.seek(0)
+        index_file.write(HEADER_FORMAT.pack(ROSTER_MAGIC, ROSTER_VERSION, 0, len(hashes),
+                                            slot_count, slot_table_offset, 0))
+    os.replace(temp_path, index_path)
+    return len(hashes), duplicates
+
+
+class Roster:
+    """
+    A roster index file opened with mmap.
+    roster.lookup(student_id) returns the student's details or None.
+    """
+
+    def __init__(self, path=DEFAULT_ROSTER_PATH):
+        self.path = path
+        with open(path, "rb") as index_file:
+            self.data = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.data) < HEADER_FORMAT.size:
+            raise RosterFormatError(path + " is too small to be a roster index")
+        magic, version, flags, student_count, slot_count, slot_table_offset, _reserved = \
+            HEADER_FORMAT.unpack_from(self.data, 0)
+        if magic != ROSTER_MAGIC:
+            raise RosterFormatError(path + " is not a roster index file")
+        if version != ROSTER_VERSION:
+            raise RosterFormatError(path + " has unsupported roster version " + str(version))
+
+        self.student_count = student_count
+        self.slot_mask = slot_count - 1
+        self.slot_table_offset = slot_table_offset
+
+    def read_record(self, offset):
+        """Return (ID, name, email) of the record at a file offset"""
+        id_length, name_length, email_length = RECORD_LENGTHS.unpack_from(self.data, offset)
+        start = offset + RECORD_LENGTHS.size
+        name_start = start + id_length
+        email_start = name_start + name_length
+        return (self.data[start:name_start].decode("utf-8"),
+                self.data[name_start:email_start].decode("utf-8"),
+                self.data[email_start:email_start + email_length].decode("utf-8"))
+
+    def lookup(self, student_id):
+        """Return {"id", "name", "email"} for an enrolled student, or None"""
+        student_id = student_id.strip()
+        student_hash = id_hash(student_id)
+        slot = student_hash & self.slot_mask
+        while True:
+            slot_hash, record_offset = SLOT_FORMAT.unpack_from(
+                self.data, self.slot_table_offset + slot * SLOT_FORMAT.size)
+            if record_offset == 0:
+                return None
+            if slot_hash == student_hash:
+                record_id, name, email = self.read_record(record_offset)
+                if record_id == student_id:
+                    return {"id": record_id, "name": name, "email": email}
+            slot = (slot + 1) & self.slot_mask
+
+    def __contains__(self, student_id):
+        return self.lookup(student_id) is not None
+
+    def __len__(self):
+        return self.student_count
+
+    def close(self):
+        """Unmap the file"""
+        self.data.close()
+
+
+def load_roster(roster_path=None):
+    """
+    Return the roster the app should check logins against: the given index
+    file, else roster.idx next to this file if it exists, else None (any
+    student may log in, as before).
+    """
+    if roster_path is not None:
+        return Roster(roster_path)
+    if os.path.exists(DEFAULT_ROSTER_PATH):
+        return Roster(DEFAULT_ROSTER_PATH)
+    return None
+
+
+def synthetic_students(count):
+    """Yield made-up (ID, name, email) rows for benchmarks"""
+    for number in range(count):
+        student_id = format(number * 7919 % 1000000007, "09d")
+        yield student_id, "Student " + str(number), "s" + student_id + "@example.ac.uk"
+
+
+def benchmark_roster(student_count=200000, lookups=100000, index_path="roster_benchmark.idx"):
+    """Time building the index, opening it and looking students up"""
+    import random
+    import time
+    from benchmark import latency_summary
+
+    before = time.perf_counter()
+    count, duplicates = build_roster(synthetic_students(student_count), index_path)
+    build_seconds = time.perf_counter() - before
+
+    before = time.perf_counter()
+    roster = Roster(index_path)
+    open_seconds = time.perf_counter() - before
+
+    ids = [row[0] for row in synthetic_students(student_count)]
+    rng = random.Random(1)
+    timings = []
+    for number in range(lookups):
+        # One in ten lookups is for an ID that is not enrolled
+        if number % 10 == 0:
+            student_id = "X" + str(number)
+        else:
+            student_id = rng.choice(ids)
+        start = time.perf_counter()
+        roster.lookup(student_id)
+        timings.append(time.perf_counter() - start)
+
+    results = {"students": count, "index_mb": os.path.getsize(index_path) / (1024 * 1024),
+               "build_seconds": build_seconds, "open_ms": open_seconds * 1000}
+    for key, value in latency_summary(timings).items():
+        results["lookup_" + key] = value
+    roster.close()
+    os.remove(index_path)
+    return results
+
+
+def main():
+    """Command line tool to build, query and benchmark roster indexes"""
+    parser = argparse.ArgumentParser(description="Student roster index tool")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="build the index from a CSV export")
+    build.add_argument("csv_path")
+    build.add_argument("index_path", nargs="?", default=DEFAULT_ROSTER_PATH)
+
+    lookup = subparsers.add_parser("lookup", help="look up a student ID")
+    lookup.add_argument("student_id")
+    lookup.add_argument("--index", default=DEFAULT_ROSTER_PATH)
+
+    benchmark = subparsers.add_parser("benchmark", help="time building and looking up a large roster")
+    benchmark.add_argument("--students", type=int, default=200000)
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count, duplicates = build_roster(read_roster_csv(args.csv_path), args.index_path)
+        print("Wrote", count, "students to", args.index_path + ";", duplicates, "duplicate rows skipped.")
+    elif args.command == "lookup":
+        roster = Roster(args.index)
+        student = roster.lookup(args.student_id)
+        print(student if student is not None else args.student_id + " is not on the roster")
+        roster.close()
+    elif args.command == "benchmark":
+        from benchmark import print_results
+        print_results("Roster index", benchmark_roster(args.students))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# sampling.py - Seeded Question Sampling Module
+# This module picks k random questions out of a large pool for each student,
+# with the choices of every question shuffled, in a way that can be rebuilt
+# exactly from a seed.
+#
+# The pool is never copied or shuffled. Instead a keyed permutation of the
+# pool indexes (a small Feistel network, using "cycle walking" to stay inside
+# the pool size) maps paper position i straight to a pool index in O(1), so
+# making a paper of k questions costs O(k) time and memory whatever the pool
+# size. The choice order of each question is derived from the same seed and
+# the question's pool index.
+#
+# A session only needs to store the seed and the paper size (see
+# SampledPaper.params); grading or an audit rebuilds the exact same paper with
+# rebuild_paper.
+
+import hashlib
+import random
+import secrets
+
+from compact_questions import Question
+from grading import answer_index
+
+# Number of Feistel rounds (4 is enough to mix the indexes well)
+FEISTEL_ROUNDS = 4
+
+
+def new_paper_seed():
+    """Return a fresh random seed for a student's paper"""
+    return secrets.randbits(64)
+
+
+class KeyedPermutation:
+    """
+    A pseudo-random permutation of range(size) chosen by `seed`.
+    permutation[i] is computed on demand; nothing of size `size` is stored.
+    """
+
+    def __init__(self, size, seed):
+        self.size = size
+        self.key = hashlib.sha256(b"paper-permutation:" + str(seed).encode("ascii")).digest()[:16]
+
+        # The Feistel network works on numbers of an even number of bits
+        bits = max(2, (size - 1).bit_length())
+        if bits % 2:
+            bits = bits + 1
+        self.half_bits = bits // 2
+        self.half_mask = (1 << self.half_bits) - 1
+
+    def round_function(self, round_number, value):
+        """Keyed hash of one half of the number"""
+        digest = hashlib.blake2b(value.to_bytes(8, "little") + bytes([round_number]),
+                                 key=self.key, digest_size=8).digest()
+        return int.from_bytes(digest, "little") & self.half_mask
+
+    def encrypt(self, value):
+        """Apply the Feistel network once (a permutation of all `bits`-bit numbers)"""
+        left = value >> self.half_bits
+        right = value & self.half_mask
+        for round_number in range(FEISTEL_ROUNDS):
+            left, right = right, left ^ self.round_function(round_number, right)
+        return (left << self.half_bits) | right
+
+    def __getitem__(self, index):
+        if index < 0 or index >= self.size:
+            raise IndexError("permutation index out of range")
+        # Cycle walking: results outside range(size) are encrypted again. The
+        # network's domain is less than 4 * size, so this ends after a few steps.
+        value = self.encrypt(index)
+        while value >= self.size:
+            value = self.encrypt(value)
+        return value
+
+    def __len__(self):
+        return self.size
+
+
+def choice_order(seed, pool_index, choice_count):
+    """Return the shuffled order of a question's choices (list of original choice indexes)"""
+    digest = hashlib.sha256(b"choice-order:" + str(seed).encode("ascii") + b":"
+                            + str(pool_index).encode("ascii")).digest()
+    order = list(range(choice_count))
+    random.Random(int.from_bytes(digest[:8], "little")).shuffle(order)
+    return order
+
+
+class SampledPaper:
+    """
+    The k questions one student gets from a pool, in their shuffled order and
+    with shuffled choices. Behaves like a read-only list of questions, so a
+    QuizSession can use it directly; questions are built when accessed.
+    """
+
+    def __init__(self, pool, size, seed, shuffle_choices=True):
+        if size > len(pool):
+            raise ValueError("cannot take " + str(size) + " questions from a pool of " + str(len(pool)))
+        self.pool = pool
+        self.size = size
+        self.seed = seed
+        self.shuffle_choices = shuffle_choices
+        self.permutation = KeyedPermutation(len(pool), seed)
+
+    def params(self):
+        """Everything needed (with the pool) to rebuild this paper"""
+        return {"seed": self.seed, "size": self.size, "pool_size": len(self.pool),
+                "shuffle_choices": self.shuffle_choices}
+
+    def pool_index(self, index):
+        """Return the pool index of the question at paper position `index`"""
+        if index < 0 or index >= self.size:
+            raise IndexError("question index out of range")
+        return self.permutation[index]
+
+    def choice_order(self, index, choice_count=None):
+        """
+        Return the original choice indexes of a paper question, in shown order.
+        Pass the question's number of choices if it is known, so the question
+        does not have to be read from the pool.
+        """
+        pool_index = self.pool_index(index)
+        if choice_count is None:
+            choice_count = len(self.pool[pool_index]["choices"])
+        if not self.shuffle_choices:
+            return list(range(choice_count))
+        return choice_order(self.seed, pool_index, choice_count)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.size))]
+        if index < 0:
+            index = index + self.size
+        pool_index = self.pool_index(index)
+        original = self.pool[pool_index]
+        original_choices = original["choices"]
+        if self.shuffle_choices:
+            order = choice_order(self.seed, pool_index, len(original_choices))
+        else:
+            order = list(range(len(original_choices)))
+        choices = tuple(original_choices[choice] for choice in order)
+        return Question(original["question"], choices, order.index(answer_index(original)))
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield self[index]
+
+    def answer_key(self):
+        """Return the answer key of this paper (correct shown-choice index per question)"""
+        return bytes(question.answer_index for question in self)
+
+
+class FixedPaper:
+    """
+    A paper made of given pool questions, in the given order, with the
+    choices unshuffled (used by the adaptive mode, which picks questions one
+    at a time; see adaptive.py). Has the same methods as SampledPaper.
+    """
+
+    def __init__(self, pool, pool_indexes):
+        self.pool = pool
+        self.pool_indexes = pool_indexes
+
+    def params(self):
+        """Everything needed (with the pool) to rebuild this paper"""
+        return {"items": list(self.pool_indexes), "pool_size": len(self.pool)}
+
+    def pool_index(self, index):
+        """Return the pool index of the question at paper position `index`"""
+        return self.pool_indexes[index]
+
+    def choice_order(self, index, choice_count=None):
+        """
+        Return the original choice indexes of a paper question, in shown order
+        (the choices are not shuffled). choice_count works as in SampledPaper.
+        """
+        if choice_count is None:
+            choice_count = len(self.pool[self.pool_indexes[index]]["choices"])
+        return list(range(choice_count))
+
+    def __len__(self):
+        return len(self.pool_indexes)
+
+    def __getitem__(self, index):
+        return self.pool[self.pool_indexes[index]]
+
+    def __iter__(self):
+        for pool_index in self.pool_indexes:
+            yield self.pool[pool_index]
+
+    def answer_key(self):
+        """Return the answer key of this paper (correct choice index per question)"""
+        return bytes(answer_index(question) for question in self)
+
+
+def rebuild_paper(pool, params):
+    """Rebuild the exact paper described by SampledPaper.params() (or FixedPaper.params()) from its pool"""
+    if params["pool_size"] != len(pool):
+        raise ValueError("the pool has changed size since the paper was made")
+    if "items" in params:
+        return FixedPaper(pool, params["items"])
+    return SampledPaper(pool, params["size"], params["seed"], params["shuffle_choices"])
@@ -0,0 +1,369 @@
+# server.py - Exam Server Module
+# This module runs the quiz for a whole cohort from one machine.
+#
+# The server uses asyncio, so one process can hold thousands of open student
+# connections. Each connection is one student. Clients send one JSON object
+# per line and get one JSON object per line back:
+#
+#   {"op": "login", "name": "...", "email": "...", "id": "..."}
+#       -> {"ok": true, "student": {...}}
+#   {"op": "categories"}
+#       -> {"ok": true, "categories": [{"key": ..., "title": ..., "index": ..., "questions": n}]}
+#   {"op": "start", "category": 0}
+#       -> {"ok": true, "total": n}
+#       (with a paper size set, each student gets n random questions from the
+#       category with shuffled choices; see sampling.py)
+#   {"op": "question", "index": 0}
+#       -> {"ok": true, "index": 0, "question": "...", "choices": [...]}
+#   {"op": "submit", "answers": [2, 0, -1, ...]}
+#       -> {"ok": true, "score": 7, "total": 10}
+#       (with an exam time limit set, an attempt that is not submitted in
+#       time is submitted automatically, unanswered; see timers.py)
+#
+# Errors are returned as {"ok": false, "error": "..."}. Grading uses the same
+# QuizSession engine and answer keys as the desktop app. If a results log is
+# configured, the submit reply is only sent once the attempt is committed to
+# it; attempts that finish together share one group commit.
+#
+# Usage:
+#     python server.py serve --port 8765
+#     python server.py load --clients 2000     (starts a local server and load-tests it)
+
+import argparse
+import asyncio
+import json
+import time
+
+from grading import answer_key_for
+from question_bank import load_quiz_data
+from quiz_data import QUIZ_PAGES
+from quiz_engine import NO_ANSWER, QuizSession
+from results_log import ResultLog, make_attempt_record
+from sampling import SampledPaper, new_paper_seed
+from students import LoginError, make_student_data
+from timers import ExamClock, TimerWheel
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class ExamServer:
+    """
+    Serves the quiz categories to many concurrent clients.
+    The question bank and answer keys are loaded once and shared by every
+    connection; each connection only keeps its student data and QuizSession.
+    """
+
+    def __init__(self, bank_path=None, results_log=None, paper_size=None, exam_seconds=None):
+        self.quiz_data = load_quiz_data(bank_path)
+
+        # Number of random questions per student (None means the whole category)
+        self.paper_size = paper_size
+
+        # Time allowed per attempt (None means no limit). The deadlines of all
+        # connections share one timer wheel, advanced by one asyncio task.
+        self.exam_seconds = exam_seconds
+        self.timer_wheel = TimerWheel()
+        self.timer_task = None
+
+        # Optional results_log.ResultLog that finished attempts are appended to
+        self.results_log = results_log
+        self.answer_keys = [answer_key_for(questions) for questions in self.quiz_data]
+
+        # Category list sent to clients; it never changes, so encode it once
+        categories = []
+        for key, title, index in QUIZ_PAGES:
+            if index < len(self.quiz_data):
+                categories.append({"key": key, "title": title, "index": index,
+                                   "questions": len(self.quiz_data[index])})
+        self.categories_reply = encode({"ok": True, "categories": categories})
+
+        # Number of connected clients and finished attempts (for logging)
+        self.connected = 0
+        self.submissions = 0
+
+    async def handle_client(self, reader, writer):
+        """Serve one student connection until it closes"""
+        self.connected = self.connected + 1
+        connection = {"student": None, "session": None, "category": None, "clock": None}
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    reply = await self.handle_request(connection, request)
+                except (ValueError, KeyError, TypeError, AttributeError) as error:
+                    reply = encode({"ok": False, "error": str(error)})
+                writer.write(reply)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connected = self.connected - 1
+            if connection["clock"] is not None:
+                connection["clock"].stop()
+            writer.close()
+
+    async def handle_request(self, connection, request):
+        """Handle one request and return the encoded reply"""
+        op = request.get("op")
+
+        if op == "login":
+            try:
+                connection["student"] = make_student_data(request.get("name", ""),
+                                                          request.get("email", ""),
+                                                          request.get("id", ""))
+            except LoginError as error:
+                return encode({"ok": False, "error": str(error)})
+            return encode({"ok": True, "student": connection["student"]})
+
+        # Everything else needs a logged-in student
+        if connection["student"] is None:
+            return encode({"ok": False, "error": "Please log in first."})
+
+        if op == "categories":
+            return self.categories_reply
+
+        if op == "start":
+            index = int(request["category"])
+            if index < 0 or index >= len(self.quiz_data):
+                return encode({"ok": False, "error": "Unknown category."})
+            questions = self.quiz_data[index]
+            if self.paper_size is not None and self.paper_size < len(questions):
+                session = QuizSession(SampledPaper(questions, self.paper_size, new_paper_seed()))
+            else:
+                session = QuizSession(questions, self.answer_keys[index])
+            if connection["clock"] is not None:
+                connection["clock"].stop()
+                connection["clock"] = None
+            connection["session"] = session
+            connection["category"] = index
+            if self.exam_seconds is not None:
+                connection["clock"] = ExamClock(
+                    self.timer_wheel, session, self.exam_seconds,
+                    on_change=lambda event, student=connection["student"], index=index, session=session:
+                    self.time_up(student, index, session))
+                connection["clock"].start()
+            return encode({"ok": True, "total": session.total_questions})
+
+        session = connection["session"]
+        if session is None:
+            return encode({"ok": False, "error": "Please choose a category first."})
+
+        if op == "question":
+            index = int(request["index"])
+            if index < 0 or index >= session.total_questions:
+                return encode({"ok": False, "error": "Unknown question."})
+            question = session.questions[index]
+            return encode({"ok": True, "index": index, "question": question["question"],
+                           "choices": question["choices"]})
+
+        if op == "submit":
+            if session.finished:
+                return encode({"ok": False, "error": "Time is up - the attempt was submitted automatically."})
+            answers = request["answers"]
+            if len(answers) != session.total_questions:
+                return encode({"ok": False, "error": "Expected " + str(session.total_questions) + " answers."})
+            for position, choice_index in enumerate(answers):
+                # bool is a subclass of int, but true/false are not choices
+                if (not isinstance(choice_index, int) or isinstance(choice_index, bool)
+                        or choice_index < NO_ANSWER
+                        or choice_index >= len(session.questions[position]["choices"])):
+                    return encode({"ok": False, "error": "Invalid answer " + repr(choice_index) + "."})
+            if connection["clock"] is not None:
+                connection["clock"].stop()
+                connection["clock"] = None
+            session.user_answers = list(answers)
+            score = session.calculate_final_score()
+            session.finished = True
+            session.finished_at = time.time()
+            session.final_score = score
+            self.submissions = self.submissions + 1
+
+            # Wait for the group commit without blocking other connections
+            if self.results_log is not None:
+                record = make_attempt_record(connection["student"], connection["category"], session)
+                await asyncio.wrap_future(self.results_log.append(record))
+            return encode({"ok": True, "score": score, "total": session.total_questions})
+
+        return encode({"ok": False, "error": "Unknown op " + repr(op) + "."})
+
+    def time_up(self, student, category_index, session):
+        """Timer callback: the attempt's deadline passed, so it was submitted as it is"""
+        self.submissions = self.submissions + 1
+        if self.results_log is not None:
+            self.results_log.append(make_attempt_record(student, category_index, session))
+
+    async def drive_timers(self):
+        """Advance the timer wheel every tick (one task for all connections)"""
+        while True:
+            await asyncio.sleep(self.timer_wheel.tick_seconds)
+            self.timer_wheel.advance()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start listening and return the asyncio server"""
+        if self.exam_seconds is not None and self.timer_task is None:
+            self.timer_task = asyncio.ensure_future(self.drive_timers())
+        return await asyncio.start_server(self.handle_client, host, port, backlog=4096)
+
+
+def encode(message):
+    """Encode a reply as one line of JSON"""
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+async def serve(host, port, bank_path=None, results_log_path=None, fsync=True, paper_size=None,
+                exam_seconds=None):
+    """Run the exam server until interrupted"""
+    results_log = None
+    if results_log_path is not None:
+        results_log = ResultLog(results_log_path, fsync=fsync)
+        print("Results log", results_log_path, "has", results_log.recovered_count, "attempts")
+    exam_server = ExamServer(bank_path, results_log, paper_size, exam_seconds)
+    server = await exam_server.start(host, port)
+    print("Exam server listening on", host + ":" + str(port))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if results_log is not None:
+            results_log.close()
+
+
+# ===== LOAD GENERATOR =====
+
+async def simulated_student(host, port, number, latencies, category_count):
+    """
+    Play one student: login, list categories, start a quiz, fetch every
+    question, submit. Every request's round trip is added to `latencies`
+    under its op name.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def call(message):
+        before = time.perf_counter()
+        writer.write(encode(message))
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+        latencies[message["op"]].append(time.perf_counter() - before)
+        if not reply["ok"]:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    try:
+        await call({"op": "login", "name": "Student " + str(number),
+                    "email": "student" + str(number) + "@example.ac.uk", "id": str(number)})
+        await call({"op": "categories"})
+        started = await call({"op": "start", "category": number % category_count})
+        answers = []
+        for index in range(started["total"]):
+            question = await call({"op": "question", "index": index})
+            answers.append(number % len(question["choices"]))
+        await call({"op": "submit", "answers": answers})
+    finally:
+        writer.close()
+
+
+async def run_load_test(clients, host=None, port=None, bank_path=None, results_log=None):
+    """
+    Run `clients` simulated students at the same time and return a results
+    dictionary with per-op latency percentiles and overall throughput.
+    If no port is given a server is started in this process (using
+    `results_log`, if given).
+    """
+    from benchmark import latency_summary
+
+    server = None
+    if port is None:
+        exam_server = ExamServer(bank_path, results_log)
+        server = await exam_server.start(DEFAULT_HOST, 0)
+        host = DEFAULT_HOST
+        port = server.sockets[0].getsockname()[1]
+        category_count = len(exam_server.quiz_data)
+    else:
+        category_count = len(load_quiz_data(bank_path))
+
+    latencies = {"login": [], "categories": [], "start": [], "question": [], "submit": []}
+    before = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *[simulated_student(host, port, number, latencies, category_count) for number in range(clients)],
+        return_exceptions=True)
+    elapsed = time.perf_counter() - before
+
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+
+    errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    all_latencies = [value for values in latencies.values() for value in values]
+    results = {
+        "clients": clients,
+        "failed_clients": len(errors),
+        "seconds": elapsed,
+        "requests_per_second": len(all_latencies) / elapsed if elapsed else 0.0,
+        "students_per_second": (clients - len(errors)) / elapsed if elapsed else 0.0,
+    }
+    for op, values in latencies.items():
+        summary = latency_summary(values)
+        results[op + "_p50_ms"] = summary["p50_ms"]
+        results[op + "_p99_ms"] = summary["p99_ms"]
+    overall = latency_summary(all_latencies)
+    results["all_p50_ms"] = overall["p50_ms"]
+    results["all_p99_ms"] = overall["p99_ms"]
+    if errors:
+        results["first_error"] = repr(errors[0])
+    return results
+
+
+def main():
+    """Parse the command line and run the server or the load generator"""
+    parser = argparse.ArgumentParser(description="Greenwich University exam server")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="run the exam server")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--bank", default=None, help="question bank file")
+    serve_parser.add_argument("--results-log", default=None, help="append finished attempts to this log")
+    serve_parser.add_argument("--no-fsync", action="store_true", help="do not fsync the results log")
+    serve_parser.add_argument("--paper-size", type=int, default=None,
+                              help="give each student this many random questions per category")
+    serve_parser.add_argument("--exam-minutes", type=float, default=None,
+                              help="submit attempts automatically after this many minutes")
+
+    load_parser = subparsers.add_parser("load", help="run the local load generator")
+    load_parser.add_argument("--clients", type=int, default=1000)
+    load_parser.add_argument("--host", default=DEFAULT_HOST)
+    load_parser.add_argument("--port", type=int, default=None,
+                             help="port of a running server (default: start one in-process)")
+    load_parser.add_argument("--bank", default=None, help="question bank file")
+    load_parser.add_argument("--results-log", default=None,
+                             help="log attempts of the in-process server to this file")
+    load_parser.add_argument("--no-fsync", action="store_true", help="do not fsync the results log")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        try:
+            exam_seconds = args.exam_minutes * 60 if args.exam_minutes is not None else None
+            asyncio.run(serve(args.host, args.port, args.bank, args.results_log, not args.no_fsync,
+                              args.paper_size, exam_seconds))
+        except KeyboardInterrupt:
+            print("Exam server stopped.")
+    elif args.command == "load":
+        from benchmark import print_results
+        results_log = None
+        if args.results_log is not None:
+            results_log = ResultLog(args.results_log, fsync=not args.no_fsync)
+        try:
+            results = asyncio.run(run_load_test(args.clients, args.host, args.port, args.bank, results_log))
+        finally:
+            if results_log is not None:
+                results_log.close()
+        print_results("Exam server load test", results)
+
+
+if __name__ == "__main__":
+    main()
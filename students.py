@@ -0,0 +1,39 @@
+# students.py - Student Data Module
+# This module checks and builds the student data collected at login.
+# It has no tkinter imports so the login window and the exam server share it.
+
+
+class LoginError(ValueError):
+    """Raised when the login details are not acceptable"""
+
+
+def make_student_data(name, email, student_id, roster=None):
+    """
+    Check the login fields and return the student data dictionary.
+    Raises LoginError with a message for the user if a field is missing.
+
+    If a roster (roster.Roster) is given, the ID must belong to an enrolled
+    student, and the name and email are taken from the roster.
+    """
+    # Remove spaces around the entered data
+    name = name.strip()
+    email = email.strip()
+    student_id = student_id.strip()
+
+    if roster is not None:
+        if not student_id:
+            raise LoginError("Please enter your student ID.")
+        student = roster.lookup(student_id)
+        if student is None:
+            raise LoginError("Student ID " + student_id + " is not on the roster.")
+        return student
+
+    # Basic validation
+    if not name or not email or not student_id:
+        raise LoginError("Please fill in all fields.")
+
+    return {
+        "name": name,
+        "email": email,
+        "id": student_id
+    }
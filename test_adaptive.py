@@ -0,0 +1,82 @@
+# test_adaptive.py - Tests for the adaptive item selection
+# Selection is vectorized with numpy when it is installed and uses cached
+# rankings without it; both paths are tested (numpy is switched off with
+# monkeypatch for the pure-Python one).
+
+import pytest
+
+import adaptive
+from adaptive import GRID, WARM_ORDER, ItemPool, item_information, prepare_item_pools
+
+
+def make_pool(size):
+    """A pool with varied (made up) parameters"""
+    return ItemPool([0.5 + (item % 7) / 5 for item in range(size)],
+                    [-3.0 + (item * 37 % 600) / 100 for item in range(size)],
+                    [(item % 4) / 20 for item in range(size)])
+
+
+@pytest.fixture
+def without_numpy(monkeypatch):
+    monkeypatch.setattr(adaptive, "numpy", None)
+
+
+def test_rankings_are_warmed_from_the_middle_in_slices(without_numpy):
+    pools = [make_pool(2000), make_pool(500)]
+    slices = 0
+    while prepare_item_pools(pools, seconds=0):
+        slices = slices + 1
+        if slices == 1:
+            # The first slice computes the ranking every attempt starts with
+            assert list(pools[0].rankings) == [WARM_ORDER[0]]
+            assert GRID[WARM_ORDER[0]] == 0.0
+    # One ranking per slice when the time is up at once
+    assert slices == 2 * len(GRID)
+    assert all(len(pool.rankings) == len(GRID) for pool in pools)
+
+    fresh = make_pool(2000)
+    for grid_index in range(len(GRID)):
+        assert pools[0].rankings[grid_index] == fresh.ranking(grid_index)
+
+
+def test_warm_pool_selects_like_a_cold_one(without_numpy):
+    warm = make_pool(1000)
+    warm.prepare()
+    cold = make_pool(1000)
+    used = set()
+    for theta in (0.0, 1.3, -2.05, 3.9, -4.5):
+        item = warm.select(theta, used)
+        assert item == cold.select(theta, used)
+        used.add(item)
+
+
+def test_vectorized_selection_picks_the_most_informative_unused_item():
+    pytest.importorskip("numpy")
+    pool = make_pool(3000)
+    assert pool.vectors is not None
+    assert not prepare_item_pools([pool])  # Nothing to warm
+    used = set()
+    for theta in (0.0, 1.3, -2.05, 3.9, -4.5, 0.7):
+        information = [item_information(theta, pool.a[item], pool.b[item], pool.c[item])
+                       for item in range(len(pool))]
+        item = pool.select(theta, used)
+        assert item not in used
+        best = max(information[other] for other in range(len(pool)) if other not in used)
+        assert information[item] == pytest.approx(best)
+        used.add(item)
+
+
+def test_both_paths_pick_the_same_items_on_an_uncalibrated_pool(monkeypatch):
+    pytest.importorskip("numpy")
+
+    def picks(pool):
+        used = set()
+        order = []
+        for theta in (0.0, 2.0, -1.0, 0.0):
+            order.append(pool.select(theta, used))
+            used.add(order[-1])
+        return order
+
+    vectorized = picks(ItemPool.uncalibrated(300))
+    monkeypatch.setattr(adaptive, "numpy", None)
+    assert picks(ItemPool.uncalibrated(300)) == vectorized
@@ -0,0 +1,48 @@
+# test_collusion.py - Tests for the collusion report
+# A results log mixing sampled and adaptive attempts must encode every
+# attempt over its category's pool questions.
+
+from adaptive import AdaptiveSession, ItemPool
+from collusion import find_collusion, load_attempts
+from quiz_data import QUIZ_DATA
+from quiz_engine import QuizSession
+from results_log import ResultLog, make_attempt_record
+from sampling import SampledPaper
+
+
+def answer(session, wrong_positions=()):
+    """Answer every question, correctly except at the given positions"""
+    for position in range(session.total_questions):
+        choice = session.correct_choice(position)
+        if position in wrong_positions:
+            choice = (choice + 1) % len(session.current()["choices"])
+        session.go_to_next_question(choice)
+    return session
+
+
+def test_log_with_sampled_and_adaptive_attempts(tmp_path):
+    pool = QUIZ_DATA[0]
+    sessions = []
+    for number in range(6):
+        if number % 2:
+            session = AdaptiveSession(pool, ItemPool.uncalibrated(len(pool)), 5)
+        else:
+            session = QuizSession(SampledPaper(pool, 5, seed=number))
+        sessions.append(answer(session, wrong_positions={number % 5}))
+
+    log_path = str(tmp_path / "results.wal")
+    log = ResultLog(log_path, fsync=False)
+    for number, session in enumerate(sessions):
+        log.append(make_attempt_record({"id": str(number), "name": "S" + str(number)}, 0, session)).result()
+    log.close()
+
+    vectors = load_attempts(QUIZ_DATA, log_path)[0]
+    assert [vector.student_id for vector in vectors] == [str(number) for number in range(6)]
+    for session, vector in zip(sessions, vectors):
+        pool_indexes = [session.questions.pool_index(position) for position in range(5)]
+        answered = sum(1 << pool_index for pool_index in pool_indexes)
+        assert vector.answered == answered
+        assert bin(vector.correct).count("1") == 4
+        assert vector.wrong_count == 1
+    # The report runs over the whole log
+    find_collusion({0: vectors}, workers=1)
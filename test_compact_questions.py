@@ -0,0 +1,101 @@
+# test_compact_questions.py - Tests for the compact question models
+# The same bank is loaded as dicts, Question objects and a ColumnarBank; the
+# sessions the app builds on each must show and grade the same questions.
+
+import pytest
+
+from compact_questions import (QUESTION_MODELS, ColumnarBank, QuestionList, compact_quiz_data,
+                               update_compact_quiz_data)
+from grading import answer_key_for
+from question_bank import QuestionBank, write_bank
+from quiz_data import QUIZ_DATA
+from quiz_engine import QuizSession
+from sampling import SampledPaper
+
+
+def answer_everything(session):
+    """Pick the correct choice of every question, returning the questions shown"""
+    shown = []
+    for index in range(session.total_questions):
+        question = session.current()
+        shown.append((question["question"], list(question["choices"]), question["answer"]))
+        session.go_to_next_question(session.correct_choice(index))
+    return shown
+
+
+@pytest.mark.parametrize("question_model", QUESTION_MODELS)
+def test_sessions_grade_the_same_in_every_model(tmp_path, question_model):
+    path = str(tmp_path / "questions.qbk")
+    write_bank(path, QUIZ_DATA)
+    bank = QuestionBank(path)
+    quiz_data = compact_quiz_data(bank, question_model)
+
+    assert len(quiz_data) == len(QUIZ_DATA)
+    for category_index, questions in enumerate(quiz_data):
+        answer_key = answer_key_for(questions)
+        assert bytes(answer_key) == bytes(answer_key_for(QUIZ_DATA[category_index]))
+
+        session = QuizSession(questions, answer_key)
+        shown = answer_everything(session)
+        assert shown == [(question["question"], question["choices"], question["answer"])
+                         for question in QUIZ_DATA[category_index]]
+        assert session.final_score == len(questions)
+
+        paper = SampledPaper(questions, 3, seed=7)
+        session = QuizSession(paper)
+        answer_everything(session)
+        assert session.final_score == 3
+    bank.close()
+
+
+def test_compact_models_use_their_own_answer_keys():
+    assert all(isinstance(questions, QuestionList) for questions in compact_quiz_data(QUIZ_DATA, "slots"))
+    columnar = compact_quiz_data(QUIZ_DATA, "columnar")
+    assert isinstance(columnar, ColumnarBank)
+    assert columnar[1].answer_key() == bytes(answer_key_for(QUIZ_DATA[1]))
+    assert compact_quiz_data(QUIZ_DATA, "dicts") is QUIZ_DATA
+
+
+def test_unknown_question_model():
+    with pytest.raises(ValueError):
+        compact_quiz_data(QUIZ_DATA, "tuples")
+
+
+@pytest.mark.parametrize("question_model", ["slots", "columnar"])
+def test_reload_converts_only_changed_categories(tmp_path, question_model):
+    path = str(tmp_path / "questions.qbk")
+    write_bank(path, QUIZ_DATA)
+    old_bank = QuestionBank(path)
+    compact = compact_quiz_data(old_bank, question_model)
+    old_categories = list(compact)
+
+    # Category 1 is edited and a fourth category is added
+    changed_data = [list(questions) for questions in QUIZ_DATA] + [QUIZ_DATA[0][:2]]
+    changed_data[1] = [dict(changed_data[1][0], question="Edited?")] + changed_data[1][1:]
+    write_bank(path, changed_data)
+    new_bank = QuestionBank(path)
+    updated = update_compact_quiz_data(compact, new_bank, {1: [0], 3: [0, 1]}, question_model)
+
+    assert len(updated) == 4
+    # Unchanged categories are reused (for columnar: views of the old bank)
+    for category_index in (0, 2):
+        if question_model == "columnar":
+            assert updated[category_index].bank is compact
+            assert updated[category_index].first == old_categories[category_index].first
+        else:
+            assert updated[category_index] is old_categories[category_index]
+    if question_model == "columnar":
+        assert updated[1].bank is not compact
+    assert updated[1][0]["question"] == "Edited?"
+    assert [question["question"] for question in updated[3]] == [question["question"]
+                                                                 for question in QUIZ_DATA[0][:2]]
+    for category_index, questions in enumerate(updated):
+        assert bytes(answer_key_for(questions)) == bytes(answer_key_for(changed_data[category_index]))
+    old_bank.close()
+    new_bank.close()
+
+
+def test_reload_drops_removed_categories():
+    compact = compact_quiz_data(QUIZ_DATA, "slots")
+    updated = update_compact_quiz_data(compact, QUIZ_DATA[:2], {2: [0]}, "slots")
+    assert updated == compact[:2]
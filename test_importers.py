@@ -0,0 +1,129 @@
+# test_importers.py - Tests for the question importers
+# Every file is imported once as a single chunk and then cut into many tiny
+# chunks, so chunk boundaries land everywhere, including inside CDATA
+# sections and comments that quote question XML. Both imports must give the
+# same bank.
+
+import pytest
+
+from importers import import_files
+from question_bank import QuestionBank
+
+MOODLE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<quiz>
+<!-- question: 0 <question type="multichoice"> in a comment -->
+  <question type="category">
+    <category><text>$course$/top/Markup</text></category>
+  </question>
+  <question type="multichoice">
+    <name><text>quotes a question</text></name>
+    <questiontext format="html"><text><![CDATA[<p>Which tag starts a question?
+<question type="multichoice"><name><text>x</text></name></question>
+<!-- not a comment --> ]] > ]]]]></text></questiontext>
+    <single>true</single>
+    <answer fraction="100" format="html"><text><![CDATA[<p>&lt;question&gt;</p>]]></text></answer>
+    <answer fraction="0" format="html"><text><![CDATA[<p>&lt;quiz&gt;</p>]]></text></answer>
+  </question>
+<!-- question: 2 -->
+  <question type="truefalse">
+    <questiontext format="plain_text"><text>The text &lt;question type="x"&gt; is escaped here.</text></questiontext>
+    <answer fraction="100"><text>true</text></answer>
+    <answer fraction="0"><text>false</text></answer>
+  </question>
+  <question type="essay"><questiontext><text><![CDATA[<question type="essay">]]></text></questiontext></question>
+  <question type="multichoice">
+    <questiontext format="html"><text><![CDATA[<p>Ünïcode — and a comment opener <!-- with no end</p>]]></text></questiontext>
+    <answer fraction="100"><text>Ja</text></answer>
+    <answer fraction="0"><text>Nein</text></answer>
+  </question>
+  <question type="category">
+    <category><text>$course$/top/Other</text></category>
+  </question>
+  <question type="multichoice">
+    <questiontext format="html"><text><![CDATA[</question></quiz>]]></text></questiontext>
+    <answer fraction="100"><text>a</text></answer>
+    <answer fraction="0"><text>b</text></answer>
+  </question>
+</quiz>
+"""
+
+GIFT = r"""// a comment with {=not ~a question}
+::Q1:: What is 2+2? {=4 ~3 ~5#too big}
+
+$CATEGORY: $course$/top/Logic
+
+::Q2:: [html]<p>Is <i>this</i> true?</p> {T}
+
+
+::Q3:: Escapes \{ \= \~ \: work {
+  =a\=b
+  ~a\~b
+  ~%50%half
+}
+
+Two equals one is {F#no} really.
+
+::Q4:: Essay {}
+"""
+
+JSONL = """{"category": "A", "question": "q1", "choices": ["x", "y"], "answer": "y"}
+
+{"question": "q2 \\u00fc", "choices": ["x", "y"], "answer": 0}
+not json
+{"category": "A", "question": "q3", "choices": ["x", "y"], "answer": "z"}
+"""
+
+
+def bank_contents(path):
+    """Return every category's questions and answer key"""
+    bank = QuestionBank(path)
+    contents = [(list(category), bytes(category.answer_key())) for category in bank]
+    bank.close()
+    return contents
+
+
+@pytest.mark.parametrize("name, text", [("moodle.xml", MOODLE_XML), ("questions.gift", GIFT),
+                                        ("questions.jsonl", JSONL)], ids=["moodle", "gift", "jsonl"])
+def test_tiny_chunks_match_one_chunk(tmp_path, name, text):
+    source = tmp_path / name
+    source.write_text(text, encoding="utf-8")
+    size = source.stat().st_size
+
+    expected = import_files([str(source)], str(tmp_path / "one.qbk"), workers=1, chunk_size=size + 1)
+    assert expected["imported"] > 0
+    expected_bank = bank_contents(str(tmp_path / "one.qbk"))
+
+    for chunk_size in list(range(1, 40)) + list(range(40, size + 1, 7)):
+        summary = import_files([str(source)], str(tmp_path / "chunked.qbk"), workers=1, chunk_size=chunk_size)
+        assert summary["categories"] == expected["categories"], chunk_size
+        assert summary["skipped"] == expected["skipped"], chunk_size
+        assert summary["invalid"] == expected["invalid"], chunk_size
+        assert bank_contents(str(tmp_path / "chunked.qbk")) == expected_bank, chunk_size
+
+
+def test_moodle_quoted_markup(tmp_path):
+    source = tmp_path / "moodle.xml"
+    source.write_text(MOODLE_XML, encoding="utf-8")
+    summary = import_files([str(source)], str(tmp_path / "out.qbk"), workers=2, chunk_size=150)
+
+    assert summary["categories"] == [("Markup", 3), ("Other", 1)]
+    assert summary["skipped"] == {"essay": 1}
+    questions = bank_contents(str(tmp_path / "out.qbk"))[0][0]
+    assert questions[0]["choices"] == ["<question>", "<quiz>"]
+    assert questions[1]["question"] == 'The text <question type="x"> is escaped here.'
+
+
+def test_several_files_and_first_categories(tmp_path):
+    paths = []
+    for name, text in (("moodle.xml", MOODLE_XML), ("questions.gift", GIFT), ("questions.jsonl", JSONL)):
+        (tmp_path / name).write_text(text, encoding="utf-8")
+        paths.append(str(tmp_path / name))
+    summary = import_files(paths, str(tmp_path / "out.qbk"), workers=1, chunk_size=64,
+                           first_categories=["Logic", "Missing"])
+
+    names = [name for name, count in summary["categories"]]
+    assert names[0] == "Logic"
+    assert summary["missing_categories"] == ["Missing"]
+    assert summary["invalid"] == 2  # "not json" and the answer that is not a choice
+    bank = bank_contents(str(tmp_path / "out.qbk"))
+    assert [len(questions) for questions, key in bank] == [count for name, count in summary["categories"]]
@@ -0,0 +1,54 @@
+# test_item_analysis.py - Tests for the streaming item analysis
+# Attempts of every kind (all questions, sampled papers and adaptive
+# quizzes) are logged as the app logs them and read back into the sums.
+
+from adaptive import AdaptiveSession, ItemPool
+from grading import answer_key_for
+from item_analysis import ItemAnalysis
+from quiz_data import QUIZ_DATA
+from quiz_engine import QuizSession
+from results_log import ResultLog, make_attempt_record
+from sampling import SampledPaper
+
+
+def answer(session, wrong_positions=()):
+    """Answer every question, correctly except at the given positions"""
+    for position in range(session.total_questions):
+        choice = session.correct_choice(position)
+        if position in wrong_positions:
+            choice = (choice + 1) % len(session.current()["choices"])
+        session.go_to_next_question(choice)
+    return session
+
+
+def write_log(path, sessions):
+    """Log finished sessions of category 0"""
+    log = ResultLog(path, fsync=False)
+    for number, session in enumerate(sessions):
+        log.append(make_attempt_record({"id": str(number), "name": "S" + str(number)}, 0, session)).result()
+    log.close()
+
+
+def test_adaptive_sampled_and_full_attempts(tmp_path):
+    pool = QUIZ_DATA[0]
+    adaptive = answer(AdaptiveSession(pool, ItemPool.uncalibrated(len(pool)), 4), wrong_positions={1})
+    sampled = answer(QuizSession(SampledPaper(pool, 5, seed=3)), wrong_positions={0})
+    full = answer(QuizSession(pool))
+    log_path = str(tmp_path / "results.wal")
+    write_log(log_path, [adaptive, sampled, full])
+
+    analysis = ItemAnalysis(QUIZ_DATA, str(tmp_path / "items.json"))
+    assert analysis.update_from_log(log_path) == 3
+
+    # Every pool question the adaptive attempt was given got its response
+    answer_key = answer_key_for(pool)
+    for position, pool_index in enumerate(adaptive.questions.pool_indexes):
+        stats = analysis.items[(0, pool_index)]
+        assert stats.responses >= 2  # the adaptive attempt and the full one
+        if position == 1:
+            assert stats.correct < stats.responses
+            assert sum(stats.choice_counts) == stats.responses
+            assert stats.choice_counts[answer_key[pool_index]] < stats.responses
+    assert sum(stats.responses for stats in analysis.items.values()) == 4 + 5 + len(pool)
+    assert sum(stats.correct for stats in analysis.items.values()) == 3 + 4 + len(pool)
+    assert len(analysis.report_rows()) == len(pool)
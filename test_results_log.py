@@ -0,0 +1,92 @@
+# test_results_log.py - Tests for the results log with several writers
+# Several app windows may log to one file; each writer must only ever cut
+# off bytes it wrote itself or the torn tail of a writer that crashed.
+
+import threading
+
+from results_log import ResultLog, encode_record, replay
+
+
+class FailingFile:
+    """Wraps a log's file: the next write stores a few bytes, then raises"""
+
+    def __init__(self, file):
+        self.file = file
+        self.fail_next = False
+
+    def write(self, data):
+        if self.fail_next:
+            self.fail_next = False
+            self.file.write(data[:5])
+            raise OSError("disk full")
+        return self.file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def test_two_writers_keep_every_record(tmp_path):
+    path = str(tmp_path / "results.wal")
+    first = ResultLog(path, fsync=False)
+    second = ResultLog(path, fsync=False)
+    for number in range(20):
+        log = first if number % 2 else second
+        log.append({"n": number}).result()
+    first.close()
+    second.close()
+    assert [record["n"] for record in replay(path)] == list(range(20))
+
+
+def test_failed_group_keeps_other_writers_records(tmp_path):
+    path = str(tmp_path / "results.wal")
+    first = ResultLog(path, fsync=False)
+    first.append({"n": 0}).result()
+    second = ResultLog(path, fsync=False)
+    second.append({"n": 1}).result()
+
+    # The first writer's idea of its committed size is now stale
+    first.file = FailingFile(first.file)
+    first.file.fail_next = True
+    failed = first.append({"n": "lost"})
+    assert isinstance(failed.exception(), OSError)
+
+    second.append({"n": 2}).result()
+    first.append({"n": 3}).result()
+    first.close()
+    second.close()
+    assert [record["n"] for record in replay(path)] == [0, 1, 2, 3]
+
+
+def test_torn_tail_of_a_crashed_writer_is_cut_off(tmp_path):
+    path = str(tmp_path / "results.wal")
+    log = ResultLog(path, fsync=False)
+    log.append({"n": 0}).result()
+    # Another writer commits a record, then crashes half way through the next
+    with open(path, "ab") as other:
+        other.write(encode_record({"n": 1}))
+        other.write(encode_record({"n": "torn"})[:7])
+    log.append({"n": 2}).result()
+    log.close()
+    assert [record["n"] for record in replay(path)] == [0, 1, 2]
+
+
+def test_opening_waits_for_a_writer_holding_the_lock(tmp_path):
+    path = str(tmp_path / "results.wal")
+    first = ResultLog(path, fsync=False)
+    first.append({"n": 0}).result()
+    opened = []
+
+    first.lock()
+    opener = threading.Thread(target=lambda: opened.append(ResultLog(path, fsync=False)))
+    opener.start()
+    opener.join(0.2)
+    assert opened == []  # Still waiting for the lock
+    # A record written while the opener waits is recovered, not cut off
+    first.file.write(encode_record({"n": 1}))
+    first.unlock()
+    opener.join()
+
+    second = opened[0]
+    assert second.recovered_count == 2
+    first.close()
+    second.close()
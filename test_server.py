@@ -0,0 +1,48 @@
+# test_server.py - Tests for the exam server's request handling
+# Requests are handled directly (no sockets), one connection at a time.
+
+import asyncio
+import json
+
+from grading import answer_key_for
+from quiz_data import QUIZ_DATA
+from results_log import ResultLog, replay
+from server import ExamServer
+
+
+def request(server, connection, message):
+    """Handle one request and return the decoded reply"""
+    return json.loads(asyncio.run(server.handle_request(connection, message)))
+
+
+def started_connection(server):
+    """A connection that has logged in and started category 0"""
+    connection = {"student": None, "session": None, "category": None, "clock": None}
+    assert request(server, connection, {"op": "login", "name": "Ada Lovelace",
+                                        "email": "ada@example.com", "id": "001234567"})["ok"]
+    assert request(server, connection, {"op": "start", "category": 0})["ok"]
+    return connection
+
+
+def test_submit_rejects_answers_that_are_not_choices(tmp_path):
+    log_path = str(tmp_path / "results.wal")
+    results_log = ResultLog(log_path, fsync=False)
+    server = ExamServer(results_log=results_log)
+    total = len(server.quiz_data[0])
+
+    for bad in (99, len(QUIZ_DATA[0][0]["choices"]), -2, True, False, 1.0, "1"):
+        connection = started_connection(server)
+        answers = [0] * total
+        answers[0] = bad
+        reply = request(server, connection, {"op": "submit", "answers": answers})
+        assert reply == {"ok": False, "error": "Invalid answer " + repr(bad) + "."}
+        assert not connection["session"].finished
+
+    connection = started_connection(server)
+    answers = list(answer_key_for(server.quiz_data[0]))
+    answers[-1] = -1
+    reply = request(server, connection, {"op": "submit", "answers": answers})
+    assert reply == {"ok": True, "score": total - 1, "total": total}
+
+    results_log.close()
+    assert [record["answers"] for record in replay(log_path)] == [answers]
@@ -0,0 +1,109 @@
+# test_timers.py - Tests for the timer wheel
+# The wheel runs on a fake clock, so these tests are exact and fast.
+
+from timers import SLOT_COUNT, TimerWheel
+
+TIMER_COUNT = 10000
+
+
+class FakeClock:
+    """A clock that only moves when the test says so"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def slot_entries(wheel):
+    """Number of timers stored in all slots (including cancelled ones not yet dropped)"""
+    return sum(len(slot) for slot in wheel.slots)
+
+
+def test_ten_thousand_timers_keep_per_tick_work_flat():
+    clock = FakeClock()
+    wheel = TimerWheel(clock=clock)
+    fired = [0]
+
+    # Every timer fires once a second and schedules itself again, like the
+    # countdown of 10k timed sessions; their phases are spread over the ticks
+    def tick():
+        fired[0] = fired[0] + 1
+        wheel.schedule(1.0, tick)
+
+    for number in range(TIMER_COUNT):
+        wheel.schedule(0.05 + (number % 10) / 10, tick)
+
+    per_tick = []
+    for step in range(1, 3001):  # 300 simulated seconds, 0.1 seconds per tick
+        next_slot = wheel.slots[(wheel.current_tick + 1) % SLOT_COUNT]
+        per_tick.append(len(next_slot))
+        # Mid-tick, like a real clock (exact tick edges would round either way)
+        clock.now = (step + 0.5) * wheel.tick_seconds
+        wheel.advance()
+        # Nothing piles up: every timer is in exactly one slot
+        assert len(wheel) == TIMER_COUNT
+        assert slot_entries(wheel) == TIMER_COUNT
+
+    # Each tick only looks at the tenth of the timers that are due in it,
+    # and that does not grow as the simulation goes on
+    assert max(per_tick) <= TIMER_COUNT // 10
+    assert max(per_tick[-100:]) == max(per_tick[100:200])
+    # Rescheduled one second after it ran (in the middle of a tick), each
+    # timer comes round every 11 ticks
+    assert fired[0] >= TIMER_COUNT * (3000 // 11)
+
+
+def test_cancelled_timers_are_dropped_from_their_slots():
+    clock = FakeClock()
+    wheel = TimerWheel(clock=clock)
+    timers = [wheel.schedule(5.0 + (number % 50) / 10, lambda: None) for number in range(TIMER_COUNT)]
+    for timer in timers[::2]:
+        timer.cancel()
+    assert len(wheel) == TIMER_COUNT // 2
+
+    clock.now = 20.0
+    assert wheel.advance() == TIMER_COUNT // 2
+    assert len(wheel) == 0
+    assert slot_entries(wheel) == 0
+
+
+def test_timers_far_ahead_wait_for_their_turn():
+    clock = FakeClock()
+    wheel = TimerWheel(clock=clock)
+    ran = []
+    wheel.schedule(SLOT_COUNT * wheel.tick_seconds * 2.5, ran.append, "late")
+
+    clock.now = SLOT_COUNT * wheel.tick_seconds * 2
+    wheel.advance()
+    assert ran == []
+    clock.now = SLOT_COUNT * wheel.tick_seconds * 3
+    wheel.advance()
+    assert ran == ["late"]
+
+
+def test_failing_callback_does_not_drop_other_timers(capsys):
+    clock = FakeClock()
+    wheel = TimerWheel(clock=clock)
+    ran = []
+
+    def fail(name):
+        ran.append(name)
+        raise RuntimeError("timer failed")
+
+    wheel.schedule(1.0, fail, "a")
+    wheel.schedule(1.0, ran.append, "b")
+    wheel.schedule(1.0, ran.append, "c")
+    wheel.schedule(2.0, ran.append, "d")
+
+    clock.now = 1.5
+    assert wheel.advance() == 3
+    assert ran == ["a", "b", "c"]
+    assert len(wheel) == 1
+    assert "timer failed" in capsys.readouterr().err
+
+    clock.now = 3.0
+    wheel.advance()
+    assert ran == ["a", "b", "c", "d"]
+    assert len(wheel) == 0
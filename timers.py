@@ -0,0 +1,271 @@
+# timers.py - Exam Timer Module
+# This module runs the clocks of timed exams: an overall deadline per attempt
+# and an optional time limit per question, plus the once-a-second countdown
+# updates of the quiz pages.
+#
+# All timers of the process live in one TimerWheel. The wheel is a ring of
+# slots, one per tick (0.1 seconds by default); a timer is put into the slot
+# of the tick it is due in, so scheduling and cancelling cost O(1), and each
+# tick only looks at the timers in one slot. Timers due more than one turn of
+# the wheel ahead simply stay in their slot until their turn comes.
+#
+# One driver advances the wheel: in the app, TkTimerDriver calls it from a
+# single after() loop; a server or a test can call advance() itself. There is
+# never an after() callback per page or per session.
+#
+# ExamClock connects one session (quiz_engine.QuizSession or
+# adaptive.AdaptiveSession) to the wheel: when a question's time runs out it
+# moves on without an answer, and at the deadline it submits the attempt.
+
+import time
+import traceback
+
+from quiz_engine import STEP_FINISHED
+
+# Wheel settings: 0.1 second ticks, 1024 slots (one turn is about 100 seconds)
+TICK_SECONDS = 0.1
+SLOT_COUNT = 1024
+
+# Events passed to an ExamClock's on_change callback
+CLOCK_TICK = "tick"  # A second has passed (update the countdown display)
+CLOCK_QUESTION_TIMEOUT = "question_timeout"  # Moved on without an answer
+CLOCK_FINISHED = "finished"  # The attempt ended (deadline or last question timed out)
+
+
+class Timer:
+    """One scheduled callback; cancel() stops it from running"""
+
+    __slots__ = ("deadline_tick", "callback", "args", "cancelled", "wheel")
+
+    def __init__(self, wheel, deadline_tick, callback, args):
+        self.wheel = wheel
+        self.deadline_tick = deadline_tick
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop the timer (it is dropped from its slot the next time the slot is looked at)"""
+        if not self.cancelled:
+            self.cancelled = True
+            self.wheel.active_count -= 1
+
+
+class TimerWheel:
+    """
+    A hashed timer wheel.
+
+    Parameters:
+    - tick_seconds: resolution of the timers
+    - slot_count: number of slots in the ring
+    - clock: function returning the current time in seconds (time.monotonic;
+      benchmarks pass a fake clock)
+    """
+
+    def __init__(self, tick_seconds=TICK_SECONDS, slot_count=SLOT_COUNT, clock=time.monotonic):
+        self.tick_seconds = tick_seconds
+        self.slot_count = slot_count
+        self.clock = clock
+        self.slots = [[] for i in range(slot_count)]
+        self.start_time = clock()
+        self.current_tick = 0
+        self.active_count = 0
+
+    def tick_at(self, when):
+        """Return the tick number a time falls in (rounded up)"""
+        ticks = (when - self.start_time) / self.tick_seconds
+        tick = int(ticks)
+        if tick < ticks:
+            tick = tick + 1
+        return tick
+
+    def schedule(self, delay, callback, *args):
+        """Run callback(*args) after `delay` seconds; returns the Timer"""
+        deadline_tick = max(self.tick_at(self.clock() + delay), self.current_tick + 1)
+        timer = Timer(self, deadline_tick, callback, args)
+        self.slots[deadline_tick % self.slot_count].append(timer)
+        self.active_count += 1
+        return timer
+
+    def advance(self, now=None):
+        """
+        Run every timer that is due by `now` (default: the clock). Returns how many ran.
+        An exception in a callback is printed and the remaining timers still run.
+        """
+        if now is None:
+            now = self.clock()
+        target_tick = int((now - self.start_time) / self.tick_seconds)
+        fired = 0
+        while self.current_tick < target_tick:
+            self.current_tick = self.current_tick + 1
+            index = self.current_tick % self.slot_count
+            slot = self.slots[index]
+            if not slot:
+                continue
+
+            # Split the slot into due timers and timers for a later turn of
+            # the wheel; cancelled timers are dropped here
+            due = []
+            later = []
+            for timer in slot:
+                if timer.cancelled:
+                    continue
+                if timer.deadline_tick <= self.current_tick:
+                    due.append(timer)
+                else:
+                    later.append(timer)
+            self.slots[index] = later
+
+            for timer in due:
+                if timer.cancelled:
+                    # Cancelled by an earlier callback of this tick
+                    continue
+                timer.cancelled = True
+                self.active_count -= 1
+                fired = fired + 1
+                # A failing callback is reported, but must not stop the
+                # other timers due in this tick from running
+                try:
+                    timer.callback(*timer.args)
+                except Exception:
+                    traceback.print_exc()
+        return fired
+
+    def __len__(self):
+        """Number of timers scheduled and not yet run or cancelled"""
+        return self.active_count
+
+
+class TkTimerDriver:
+    """Advances a TimerWheel from one repeating Tk after() callback"""
+
+    def __init__(self, root, wheel):
+        self.root = root
+        self.wheel = wheel
+        self.interval_ms = max(int(wheel.tick_seconds * 1000), 1)
+        self.after_id = None
+
+    def start(self):
+        """Start driving the wheel"""
+        if self.after_id is None:
+            self.after_id = self.root.after(self.interval_ms, self.run)
+
+    def run(self):
+        """after() callback: schedule the next run first, so a failing timer cannot stop the clock"""
+        self.after_id = self.root.after(self.interval_ms, self.run)
+        self.wheel.advance()
+
+    def stop(self):
+        """Stop driving the wheel"""
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+
+class ExamClock:
+    """
+    The deadline and per-question limit of one session.
+
+    Parameters:
+    - wheel: the process's TimerWheel
+    - session: the attempt to time
+    - exam_seconds: time allowed for the whole attempt, counted from
+      session.started_at (so a resumed attempt keeps its deadline); None for no limit
+    - question_seconds: time allowed per question; None for no limit
+    - on_change: called with CLOCK_TICK, CLOCK_QUESTION_TIMEOUT or
+      CLOCK_FINISHED; None for headless sessions
+    - show_countdown: if True, on_change(CLOCK_TICK) is called every second
+    """
+
+    def __init__(self, wheel, session, exam_seconds=None, question_seconds=None,
+                 on_change=None, show_countdown=False):
+        self.wheel = wheel
+        self.session = session
+        self.exam_seconds = exam_seconds
+        self.question_seconds = question_seconds
+        self.on_change = on_change
+        self.show_countdown = show_countdown
+
+        self.deadline_timer = None
+        self.question_timer = None
+        self.tick_timer = None
+        self.question_deadline = None
+
+    def start(self):
+        """Start (or restart) the timers for the session's current state"""
+        self.stop()
+        if self.session.finished:
+            return
+        if self.exam_seconds is not None:
+            self.deadline_timer = self.wheel.schedule(self.exam_remaining(), self.deadline_reached)
+        self.question_started()
+        if self.show_countdown:
+            self.tick_timer = self.wheel.schedule(1.0, self.tick)
+
+    def question_started(self):
+        """Restart the per-question limit (call whenever a new question is shown)"""
+        if self.question_timer is not None:
+            self.question_timer.cancel()
+            self.question_timer = None
+        if self.question_seconds is not None and not self.session.finished:
+            self.question_deadline = self.wheel.clock() + self.question_seconds
+            self.question_timer = self.wheel.schedule(self.question_seconds, self.question_timed_out)
+
+    def exam_remaining(self):
+        """Seconds left until the deadline (None without a deadline)"""
+        if self.exam_seconds is None:
+            return None
+        return max(self.exam_seconds - (time.time() - self.session.started_at), 0.0)
+
+    def question_remaining(self):
+        """Seconds left for the current question (None without a limit)"""
+        if self.question_timer is None:
+            return None
+        return max(self.question_deadline - self.wheel.clock(), 0.0)
+
+    def tick(self):
+        """Once a second: let the display update"""
+        self.tick_timer = self.wheel.schedule(1.0, self.tick)
+        self.notify(CLOCK_TICK)
+
+    def question_timed_out(self):
+        """The current question's time ran out: move on without an answer"""
+        self.question_timer = None
+        step = self.session.skip_question()
+        if step == STEP_FINISHED:
+            self.stop()
+            self.notify(CLOCK_FINISHED)
+        else:
+            self.question_started()
+            self.notify(CLOCK_QUESTION_TIMEOUT)
+
+    def deadline_reached(self):
+        """The exam's time is up: submit the attempt as it is"""
+        self.deadline_timer = None
+        self.session.finish()
+        self.stop()
+        self.notify(CLOCK_FINISHED)
+
+    def running(self):
+        """Return True if any of this session's timers is scheduled"""
+        return (self.deadline_timer is not None or self.question_timer is not None
+                or self.tick_timer is not None)
+
+    def notify(self, event):
+        """Tell the owner (a QuizPage) what happened"""
+        if self.on_change is not None:
+            self.on_change(event)
+
+    def stop(self):
+        """Cancel all of this session's timers"""
+        for name in ("deadline_timer", "question_timer", "tick_timer"):
+            timer = getattr(self, name)
+            if timer is not None:
+                timer.cancel()
+                setattr(self, name, None)
+
+
+def format_seconds(seconds):
+    """Format a number of seconds as m:ss"""
+    seconds = int(seconds + 0.999)
+    return str(seconds // 60) + ":" + format(seconds % 60, "02d")